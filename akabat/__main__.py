@@ -0,0 +1,46 @@
+"""Command line entry point: ``python -m akabat [preferences.json] [--batch | --serve]``."""
+
+import argparse
+
+from akabat.controller import Controller
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="akabat",
+        description="Advanced Knowledge Aggregator for Bibliometric Analysis and Trends",
+    )
+    parser.add_argument(
+        "preferences",
+        nargs="?",
+        default="preferences.json",
+        help="path to the preferences JSON file (default: preferences.json)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="run the whole pipeline without the interactive menu",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="serve the read-only HTTP/JSON query service over the database",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="with --batch, run every stage even if its output is up to date",
+    )
+    args = parser.parse_args(argv)
+
+    controller = Controller(args.preferences)
+    if args.serve:
+        controller.serve()
+    elif args.batch:
+        controller.run_pipeline(force=args.force)
+    else:
+        controller.start()
+
+
+if __name__ == "__main__":
+    main()
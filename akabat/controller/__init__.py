@@ -1,3 +1,5 @@
 from .controller import Controller
+from .pipeline import Pipeline, PipelineStage
+from .query_service import QueryService
 
-__all__ = ["Controller"]
+__all__ = ["Controller", "Pipeline", "PipelineStage", "QueryService"]
@@ -1,20 +1,44 @@
+import copy
+import hashlib
+import json
+import os
+import time
 import pandas as pd
 
 from akabat.view import ConsoleViewer
+from akabat.controller.pipeline import Pipeline
+from akabat.controller.query_service import QueryService
 
 from akabat.model import (
     Data,
     CheckpointHandler,
+    EditJournal,
+    KeywordLookup,
+    KeywordSearchIndex,
+    NearDuplicateIndex,
     PaperLoader,
+    PaperStream,
     UserPreferences,
     DBHandler,
+    Instrumentation,
     PlotGenerator,
+    QueryCache,
+    QueryTracer,
+    TitleIndex,
+    TREND_METRICS,
+    TrendAnalyzer,
+    instrumented,
 )
 
 
 class Controller:
 
-    def __init__(self, preferences_file_path: str = "preferences.json") -> None:
+    def __init__(
+        self,
+        preferences_file_path: str = "preferences.json",
+        preferences: UserPreferences = None,
+        db_name: str = "Review.db",
+    ) -> None:
         # menu keys are the internal IDs, values are the shown names
         self._menu: dict[str, str] = {
             "exit": "Exit menu",
@@ -28,10 +52,19 @@ class Controller:
             # "generate keywords": "Generate keywords",
             "generate unique keywords": "Generate unique keywords",
             "generate keyword groups": "Generate keywords groups",
+            "sweep distance thresholds": "Sweep distance thresholds",
             "generate database": "Generate database",
+            "group hierarchy": "Build the keyword group hierarchy",
             "generate plots": "Generate plots",
+            "emerging topics": "Rank emerging keyword groups",
+            "run pipeline": "Run the whole pipeline (only stale stages)",
+            "run preview": "Preview the whole pipeline on a sample of the papers",
+            "search keywords": "Search similar keywords and groups",
+            "lookup keywords": "Find keywords and groups by prefix or typo",
             # MERGERS
-            # "merge keyword groups": "Merge keyword groups",
+            "merge keyword groups": "Merge keyword groups",
+            "rename keyword group": "Rename keyword group",
+            "apply merge file": "Merge keyword groups from a JSON file",
             # EXCLUSION
             "exclude keyword": "Ban keyword",
             # "exclude keywords": "Exclude list of keywords",
@@ -42,31 +75,146 @@ class Controller:
             "save preferences": "Save preferences (such as: banned keywords)",
             "save unique keywords": "Save unique keywords",
             "save keyword groups": "Save keywords groups",
+            "save session": "Save working session (binary checkpoints)",
+            "load session": "Load working session (binary checkpoints)",
         }
         self._raw_papers: pd.DataFrame = None
+        self._paper_stream: PaperStream = None
+        self._title_index: TitleIndex = None
+        self._indexed_papers: pd.DataFrame = None
+        self._near_duplicate_index: NearDuplicateIndex = None
+        self._near_duplicate_indexed_papers: pd.DataFrame = None
         self._data: Data = Data()
-        if preferences_file_path:
+        # The "fraction" and "seed" of the papers sampled by a preview run
+        self._sample: dict = None
+        # Returns the papers a preview run samples instead of importing the CSVs
+        self._sample_source = None
+        if preferences is not None:
+            self._preferences: UserPreferences = preferences
+        elif preferences_file_path:
             self._preferences: UserPreferences = UserPreferences(preferences_file_path)
         else:
             self._preferences: UserPreferences = UserPreferences()
 
         self._viewer: ConsoleViewer = ConsoleViewer()
         self._paper_loader: PaperLoader = PaperLoader()
-        self._db_handler: DBHandler = DBHandler()
+        self._db_handler: DBHandler = DBHandler(db_name)
         self._plot_generator: PlotGenerator = PlotGenerator()
+        self._instrumentation: Instrumentation = Instrumentation(
+            enabled=self._preferences.instrumentation_enabled,
+            profile=self._preferences.instrumentation_profile,
+            profile_folder=f"{self._preferences.output_files_folder}/profiles",
+        )
+        self._paper_loader._instrumentation = self._instrumentation
+        self._db_handler._instrumentation = self._instrumentation
+        self._db_handler.tracer = QueryTracer(
+            enabled=self._preferences.db_tracing_enabled,
+            slow_query_threshold_ms=self._preferences.slow_query_threshold_ms,
+            explain=self._preferences.explain_slow_queries,
+        )
+        self._db_handler.query_cache = QueryCache(
+            enabled=self._preferences.query_cache_enabled,
+            max_entries=self._preferences.query_cache_max_entries,
+            max_megabytes=self._preferences.query_cache_max_megabytes,
+        )
+        self._keyword_search_index: KeywordSearchIndex = None
+        self._keyword_search_index_embeddings = None
+        self._group_search_index: KeywordSearchIndex = None
+        self._group_search_index_version: int = None
+        self._journal: EditJournal = EditJournal(
+            f"{self._preferences.output_files_folder}/keyword_groups.journal.jsonl"
+        )
         self._kill_akabat: bool = False
 
     def start(self) -> None:
         self._kill_akabat = False
+        if self._preferences.memory_database_enabled:
+            self.load_database_into_memory()
         while not self._kill_akabat:
             option_id = self._viewer.ask_menu_option(self._menu)
             self.run_menu_option(option_id)
+        self._db_handler.close_memory_database(
+            save=self._preferences.memory_database_write_back
+        )
+        self.write_run_report()
 
+    def serve(self) -> None:
+        """
+        Serves the read-only HTTP/JSON query service over the database until
+        interrupted with Ctrl+C.
+        """
+        if not self.is_database_created():
+            print("ERROR: Database is not created.")
+            return
+        service = QueryService(
+            db_name=self._db_handler._db_name,
+            host=self._preferences.service_host,
+            port=self._preferences.service_port,
+            pool_size=self._preferences.service_pool_size,
+            stream_threshold=self._preferences.service_stream_threshold,
+            response_cache_megabytes=self._preferences.service_response_cache_megabytes,
+            query_cache=QueryCache(
+                enabled=self._preferences.query_cache_enabled,
+                max_entries=self._preferences.query_cache_max_entries,
+                max_megabytes=self._preferences.query_cache_max_megabytes,
+            ),
+            quiet=False,
+        )
+        print(f"Serving {self._db_handler._db_name} on {service.address}")
+        try:
+            service.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.shutdown()
+
+    def load_database_into_memory(self) -> bool:
+        """
+        Copies the database into memory for the analytics session, unless it is
+        bigger than the memory ceiling of the preferences.
+
+        Returns:
+            bool: True if the queries run against the in-memory copy.
+        """
+        if not self.is_database_created():
+            return False
+        if self._db_handler.load_into_memory(
+            max_megabytes=self._preferences.memory_database_max_megabytes
+        ):
+            print("Database loaded into memory.")
+            return True
+        print(
+            "The database exceeds the memory ceiling of "
+            f"{self._preferences.memory_database_max_megabytes} MB, it stays on disk."
+        )
+        return False
+
+    def write_run_report(self) -> None:
+        """
+        Writes the timing, memory and cache statistics recorded during the run as
+        JSON in the output files folder, if the instrumentation is enabled. If the
+        database tracing is enabled, it also writes the slow query log and displays
+        the per-statement timings.
+        """
+        if self._instrumentation.enabled:
+            self._instrumentation.write_report(
+                f"{self._preferences.output_files_folder}/{self._preferences.instrumentation_report_file}"
+            )
+        tracer = self._db_handler.tracer
+        if tracer.enabled:
+            CheckpointHandler.write_to_json_file(
+                tracer.slow_queries,
+                f"{self._preferences.output_files_folder}/{self._preferences.slow_query_log_file}",
+            )
+            self._viewer.display_query_summary(tracer.summary())
+
+    @instrumented()
     def import_all_csvs(self, folder_path: str = None) -> int:
         """
         Imports all CSV files in the folder and stores the result in the
-        self._raw_paper variable. If self._raw_paper exists, then merges
-        the imported CSVs with the self._raw_paper pandas.DataFrame. The
+        self._raw_paper variable. If self._raw_paper exists, then the new
+        papers are appended to it after checking their titles against the
+        title index of the corpus, so an import costs O(new papers). The
         result does not contain duplicated papers, because the merging process.
 
         Args:
@@ -74,7 +222,7 @@ class Controller:
             the folder that contains the CSV files to import. Defaults to None.
 
         Returns:
-            int: Number of duplicated papers removed during the merge process.
+            int: Number of duplicated papers of this import removed during the merge process.
         """
         if not folder_path:
             folder_path: str = self._viewer.ask_folder_path()
@@ -83,16 +231,120 @@ class Controller:
             excluded_keywords_at_csv_import=self._preferences.excluded_keywords_at_csv_import,
             excluded_starting_by_keywords_at_csv_import=self._preferences.excluded_starting_by_keywords_at_csv_import,
             import_columns_names=self._preferences.csv_import_column_names,
+            engine=self._csv_parsing_engine(),
+        )
+        if not csvs:
+            return 0
+        title_index = self._get_title_index()
+        new_papers, duplicated_number = self._paper_loader.merge_csvs(
+            csvs, title_index=title_index
         )
-        if self._raw_papers is not None and not self._raw_papers.empty:
-            csvs.append(self._raw_papers)
-        self._raw_papers, duplicated_number = self._paper_loader.merge_csvs(csvs)
+        if self._preferences.near_duplicates_enabled:
+            papers = self._raw_papers
+            if (
+                self._near_duplicate_index is None
+                or self._near_duplicate_indexed_papers is not papers
+            ):
+                # The corpus is indexed (and its near duplicates removed) once,
+                # then only the new papers are hashed
+                self._near_duplicate_index = self._paper_loader.near_duplicate_index(
+                    similarity_threshold=self._preferences.near_duplicates_similarity_threshold,
+                    num_perm=self._preferences.near_duplicates_num_perm,
+                    bands=self._preferences.near_duplicates_bands,
+                    shingle_size=self._preferences.near_duplicates_shingle_size,
+                )
+                if papers is not None and not papers.empty:
+                    new_papers = pd.concat([papers, new_papers])
+                papers = None
+            self._raw_papers, near_duplicated_number = (
+                self._paper_loader.append_without_near_duplicates(
+                    papers,
+                    new_papers,
+                    self._near_duplicate_index,
+                    title_index=title_index,
+                )
+            )
+            self._near_duplicate_indexed_papers = self._raw_papers
+            duplicated_number += near_duplicated_number
+        elif self._raw_papers is not None and not self._raw_papers.empty:
+            self._raw_papers = pd.concat([self._raw_papers, new_papers])
+        else:
+            self._raw_papers = new_papers
+        self._indexed_papers = self._raw_papers
         return duplicated_number
 
-    def generate_unique_keywords(self) -> None:
-        self._data.unique_keywords = self._paper_loader.get_unique_keywords(
-            self._raw_papers,
+    def _get_title_index(self) -> TitleIndex:
+        """
+        Returns the title index of self._raw_papers, built again only when the
+        papers were replaced (e.g. by loading a session).
+        """
+        if self._title_index is None or self._indexed_papers is not self._raw_papers:
+            self._title_index = TitleIndex(self._raw_papers)
+            self._indexed_papers = self._raw_papers
+        return self._title_index
+
+    def _csv_parsing_engine(self) -> str:
+        engine = self._preferences.csv_parsing_engine
+        if engine not in self._paper_loader.available_csv_engines():
+            print(f"ERROR: CSV engine {engine} is not available, using the C engine.")
+            return "c"
+        return engine
+
+    @instrumented()
+    def stream_import_csvs(self, folder_path: str = None) -> int:
+        """
+        Imports all CSV files in the folder in chunks, for corpora that do not fit
+        in memory. The deduplicated chunks go straight to the database (with their
+        keywords staged until the keyword groups exist) or to a Parquet checkpoint
+        in the session folder, as set in the "streaming_import" preferences. Only
+        the title hashes and the keyword counts are kept in memory.
+
+        Args:
+            folder_path (str, optional): The relative or absolute path to
+            the folder that contains the CSV files to import. Defaults to None.
+
+        Returns:
+            int: Number of duplicated papers removed during the import.
+        """
+        if (
+            self._preferences.streaming_import_sink == "database"
+            and self.is_database_created()
+        ):
+            print("ERROR: Database is already created, delete it first.")
+            return 0
+        if not folder_path:
+            folder_path: str = self._viewer.ask_folder_path()
+
+        stream = self._paper_loader.stream_csvs(
+            folder_path=folder_path,
+            excluded_keywords_at_csv_import=self._preferences.excluded_keywords_at_csv_import,
+            excluded_starting_by_keywords_at_csv_import=self._preferences.excluded_starting_by_keywords_at_csv_import,
+            import_columns_names=self._preferences.csv_import_column_names,
+            chunk_size=self._preferences.streaming_import_chunk_size,
+            engine=self._csv_parsing_engine(),
         )
+        if self._preferences.streaming_import_sink == "checkpoint":
+            os.makedirs(self._session_folder(), exist_ok=True)
+            CheckpointHandler.write_dataframe_chunks(
+                stream, self._streamed_papers_path()
+            )
+        else:
+            self._db_handler.create_database()
+            for chunk in stream:
+                self._db_handler.append_papers(chunk)
+        self._raw_papers = None
+        self._paper_stream = stream
+        return stream.duplicates
+
+    def _streamed_papers_path(self) -> str:
+        return f"{self._session_folder()}/papers.parquet"
+
+    @instrumented()
+    def generate_unique_keywords(self) -> None:
+        if self._raw_papers is None and self._paper_stream is not None:
+            self._data.unique_keywords = self._paper_stream.unique_keywords()
+            return
+        self._data.unique_keywords = self._get_title_index().unique_keywords()
 
     def save_unique_keywords(self) -> None:
         CheckpointHandler.write_to_json_file(
@@ -110,7 +362,15 @@ class Controller:
             return True
         return False
 
+    @instrumented()
     def group_keywords_by_semantic_similarity(self) -> None:
+        groups_version = self._data.groups_version
+        self._group_keywords_by_semantic_similarity()
+        if self._data.groups_version != groups_version:
+            # The new groups are not based on the saved snapshot anymore
+            self._journal.stop()
+
+    def _group_keywords_by_semantic_similarity(self) -> None:
         number_clusters = self._viewer.ask_number_clusters()
         if number_clusters == 0:
             distance_threshold = self._viewer.ask_distance_threshold()
@@ -130,27 +390,246 @@ class Controller:
                 )
             )
 
-    def save_keywords_by_semantic_similarity(self) -> None:
+    def sweep_distance_thresholds(
+        self,
+        distance_thresholds: list[float] = None,
+        n_clusters: list[int] = None,
+    ) -> dict:
+        """
+        Evaluates several distance thresholds and/or numbers of keywords groups
+        in one pass and displays the group count, group size distribution and
+        sampled silhouette score of each candidate.
+
+        Args:
+            distance_thresholds (list[float], optional): Candidate distance thresholds. Asked to the user if neither
+            `distance_thresholds` nor `n_clusters` are given. Defaults to None.
+            n_clusters (list[int], optional): Candidate numbers of keywords groups. Defaults to None.
+
+        Returns:
+            dict: The recommended candidate with the keys "parameter" and "value", or None.
+        """
+        if not self._data.unique_keywords:
+            print("You have to load or generate unique keywords first")
+            return None
+
+        if distance_thresholds is None and n_clusters is None:
+            distance_thresholds = self._viewer.ask_distance_thresholds()
+            n_clusters = self._viewer.ask_cluster_counts()
+
+        df, recommended = self._paper_loader.sweep_distance_thresholds(
+            self._data.unique_keywords,
+            distance_thresholds=distance_thresholds,
+            n_clusters=n_clusters,
+        )
+        self._viewer.display_threshold_sweep(df, recommended)
+        return recommended
+
+    def save_keywords_by_semantic_similarity(self, compact: bool = False) -> None:
+        """
+        Saves the keyword groups. When the groups are based on the saved snapshot,
+        the curation operations are already in the edit journal and the snapshot is
+        only rewritten (compacting the journal) when the journal reaches the
+        `journal_compaction_threshold` preference or `compact` is True.
+
+        Args:
+            compact (bool, optional): Rewrite the snapshot and truncate the journal. Defaults to False.
+        """
+        if (
+            not compact
+            and self._journal.is_active
+            and len(self._journal) < self._preferences.journal_compaction_threshold
+        ):
+            return
+
+        bans_journaled = self._journal.is_active and any(
+            operation.get("op") in ("ban", "unban", "bans")
+            for operation in self._journal.read()[1]
+        )
+
+        file_path = f"{self._preferences.output_files_folder}/keyword_groups.json"
         CheckpointHandler.write_to_json_file(
             self._data.unique_keywords_groups,
-            f"{self._preferences.output_files_folder}/keyword_groups.json",
+            file_path,
             human_readable=True,
         )
+        self._journal.start(CheckpointHandler.file_checksum(file_path))
+        if bans_journaled:
+            # Bans live in the preferences, not in the snapshot, so keep them
+            self._journal.append(
+                "bans", groups=self._preferences.excluded_keywords_in_plot
+            )
 
     def load_keywords_by_semantic_similarity(self) -> bool:
-        loaded_data = CheckpointHandler.load_from_json_file(
-            f"{self._preferences.output_files_folder}/keyword_groups.json",
-        )
+        file_path = f"{self._preferences.output_files_folder}/keyword_groups.json"
+        loaded_data = CheckpointHandler.load_from_json_file(file_path)
         if loaded_data:
             self._data.unique_keywords_groups = loaded_data
+            checksum = CheckpointHandler.file_checksum(file_path)
+            base_checksum, operations = self._journal.read()
+            if base_checksum == checksum:
+                for operation in operations:
+                    self._replay_journal_operation(operation)
+                self._journal.resume(checksum, len(operations))
+            else:
+                if operations:
+                    print(
+                        f"Ignored {len(operations)} journaled edits of another keyword groups file."
+                    )
+                self._journal.start(checksum)
             return True
         return False
 
+    def _replay_journal_operation(self, operation: dict) -> None:
+        op = operation.get("op")
+        if op == "merge" and self._data.all_keys_exist(operation["groups"]):
+            self._data.merge_keyword_groups(operation["groups"], operation["name"])
+        elif op == "rename" and self._data.all_keys_exist([operation["group"]]):
+            self._data.merge_keyword_groups([operation["group"]], operation["name"])
+        elif op == "merge_file":
+            self._data.apply_keyword_group_merges(operation["merges"])
+        elif op == "ban":
+            self._ban_keyword_group(operation["group"])
+        elif op == "unban":
+            self._unban_keyword_group(operation["group"])
+        elif op == "bans":
+            self._preferences.excluded_keywords_in_plot = sorted(operation["groups"])
+
+    def _journal_operation(self, op: str, **arguments) -> None:
+        self._journal.append(op, **arguments)
+        if len(self._journal) >= self._preferences.journal_compaction_threshold:
+            self.save_keywords_by_semantic_similarity(compact=True)
+
+    def _get_search_indexes(self) -> tuple[KeywordSearchIndex, KeywordSearchIndex]:
+        embeddings = self._paper_loader.encode_keywords(self._data.unique_keywords)
+
+        if self._keyword_search_index_embeddings is not embeddings:
+            self._keyword_search_index = KeywordSearchIndex()
+            self._keyword_search_index.build(self._data.unique_keywords, embeddings)
+            self._keyword_search_index_embeddings = embeddings
+            self._group_search_index_version = None
+
+        if not self._data.unique_keywords_groups:
+            self._group_search_index = None
+        elif self._group_search_index_version != self._data.groups_version:
+            self._group_search_index = KeywordSearchIndex()
+            self._group_search_index.build_from_groups(
+                self._data.unique_keywords_groups,
+                self._data.unique_keywords,
+                embeddings,
+            )
+            self._group_search_index_version = self._data.groups_version
+
+        return self._keyword_search_index, self._group_search_index
+
+    def search_similar_keywords(
+        self, query: str = None, k: int = 10
+    ) -> tuple[list[tuple[str, float]], list[tuple[str, float]]]:
+        """
+        Finds the `k` keywords and keyword groups most similar to the query
+        text. The keyword embeddings are reused from the grouping step.
+
+        Args:
+            query (str, optional): The text to search. Asked to the user if not given. Defaults to None.
+            k (int, optional): Number of keywords and of groups returned. Defaults to 10.
+
+        Returns:
+            tuple[list[tuple[str, float]], list[tuple[str, float]]]: The similar keywords and the
+            similar keyword groups as (name, cosine similarity) tuples.
+        """
+        if not self._data.unique_keywords:
+            print("You have to load or generate unique keywords first")
+            return [], []
+
+        if query is None:
+            query = self._viewer.ask_search_query()
+        if not query:
+            return [], []
+
+        keyword_index, group_index = self._get_search_indexes()
+        query_embedding = self._paper_loader.encode_text([query])
+        keyword_results = keyword_index.search(query_embedding, k)[0]
+        group_results = []
+        if group_index is not None:
+            group_results = group_index.search(query_embedding, k)[0]
+        return keyword_results, group_results
+
+    @instrumented()
     def create_and_populate_database(self) -> None:
+        if self._raw_papers is None and self._paper_stream is not None:
+            self._populate_database_from_stream()
+            return
         self._db_handler.create_database()
         self._db_handler.populate_paper_table(self._raw_papers)
+        self._db_handler.populate_title_index()
         self._db_handler.populate_keyword_tables(self._data.unique_keywords_groups)
         self._db_handler.populate_paper_keyword_table(self._raw_papers)
+        if self._preferences.group_hierarchy_enabled:
+            self.build_group_hierarchy()
+
+    def _populate_database_from_stream(self) -> None:
+        if not self._db_handler.has_staged_paper_keywords():
+            # Only the checkpoint sink keeps the streamed papers out of the database
+            papers_path = self._streamed_papers_path()
+            if (
+                self._preferences.streaming_import_sink != "checkpoint"
+                or not os.path.isfile(papers_path)
+            ):
+                print(
+                    "ERROR: The streamed papers are not staged anymore, "
+                    "import the folder again."
+                )
+                return
+            self._db_handler.delete_database()
+            self._db_handler.create_database()
+            for chunk in CheckpointHandler.iter_dataframe_chunks(
+                papers_path,
+                chunk_size=self._preferences.streaming_import_chunk_size,
+            ):
+                self._db_handler.append_papers(chunk)
+        self._db_handler.populate_title_index()
+        self._db_handler.populate_keyword_tables(self._data.unique_keywords_groups)
+        keywords_not_found = self._db_handler.link_staged_paper_keywords()
+        if keywords_not_found:
+            print(f"Keywords not found: {keywords_not_found}")
+        if self._preferences.group_hierarchy_enabled:
+            self.build_group_hierarchy()
+
+    @instrumented()
+    def build_group_hierarchy(self, level_sizes: list[int] = None) -> list[int]:
+        """
+        Builds the upper levels of the keyword groups by cutting a Ward tree of
+        the groups (see `PaperLoader.build_group_hierarchy`) and stores them in
+        the database, so the plots and queries can roll the groups up to any
+        level or drill down into a group.
+
+        Args:
+            level_sizes (list[int], optional): Maximum number of groups of each upper level.
+            Defaults to the "group_hierarchy" preferences.
+
+        Returns:
+            list[int]: The number of groups of every level, starting with the keyword groups.
+        """
+        if not self.is_database_created():
+            print("ERROR: Database is not created.")
+            return []
+        if not self._data.unique_keywords or not self._data.unique_keywords_groups:
+            print("You have to load or generate keywords groups first")
+            return []
+        if level_sizes is None:
+            level_sizes = self._preferences.group_hierarchy_level_sizes
+
+        levels = self._paper_loader.build_group_hierarchy(
+            self._data.unique_keywords,
+            self._data.unique_keywords_groups,
+            level_sizes,
+        )
+        self._db_handler.populate_group_hierarchy(levels)
+        group_counts = [len(self._data.unique_keywords_groups)] + [
+            len(set(parents.values())) for parents in levels
+        ]
+        for level, group_count in enumerate(group_counts):
+            print(f"Level {level}: {group_count} groups")
+        return group_counts
 
     def merge_keyword_groups(self) -> None:
         if not self._data.unique_keywords_groups:
@@ -164,22 +643,435 @@ class Controller:
                 if new_group_name:
                     if self._data.all_keys_exist(keyword_groups):
                         self._data.merge_keyword_groups(keyword_groups, new_group_name)
+                        self._journal_operation(
+                            "merge", groups=keyword_groups, name=new_group_name
+                        )
                     else:
                         print("ERROR: All keys must exist to merge the groups.")
+                        for missing_group in self._data.missing_keys(keyword_groups):
+                            self._viewer.display_suggestions(
+                                missing_group,
+                                self._data.group_lookup.lookup(missing_group),
+                            )
+
+    def apply_merge_file(self, file_path: str = None) -> list[str]:
+        """
+        Applies the merges of a JSON file to the keyword groups. The file maps each
+        new group name to the list of group names to merge, as in
+        {"machine learning": ["ml", "machine learning models"]}. The merges are
+        applied in order, so a merge may use names produced by previous ones.
+
+        Args:
+            file_path (str, optional): Path to the JSON merge file. Asked to the user if
+            not given. Defaults to None.
+
+        Returns:
+            list[str]: The missing group names of the skipped merges.
+        """
+        if not self._data.unique_keywords_groups:
+            print("You have to load or generate keywords first")
+            return []
+
+        if not file_path:
+            file_path = self._viewer.ask_file_path()
+        merges = CheckpointHandler.load_from_json_file(file_path)
+        if not merges:
+            print("Error loading.")
+            return []
+        if not isinstance(merges, dict):
+            print(
+                "ERROR: The merge file must map every new group name to a list of "
+                "group names."
+            )
+            return []
+        invalid_merges = [
+            name
+            for name, group_names in merges.items()
+            if not isinstance(group_names, list)
+            or not all(isinstance(group_name, str) for group_name in group_names)
+        ]
+        for name in invalid_merges:
+            print(
+                f"ERROR: The merge {name} is skipped, its value is not a list of names."
+            )
+            del merges[name]
+        if not merges:
+            return []
+
+        missing_groups = self._data.apply_keyword_group_merges(merges)
+        self._journal_operation("merge_file", merges=merges)
+        for missing_group in dict.fromkeys(missing_groups):
+            self._viewer.display_suggestions(
+                missing_group, self._data.group_lookup.lookup(missing_group)
+            )
+        return missing_groups
+
+    def rename_keyword_group(self) -> None:
+        if not self._data.unique_keywords_groups:
+            print("You have to load or generate keywords first")
+            return
+        group_name = self._viewer.ask_keyword("Enter the keyword group name: ")
+        if not group_name:
+            return
+        if not self._data.all_keys_exist([group_name]):
+            self._viewer.display_suggestions(
+                group_name, self._data.group_lookup.lookup(group_name)
+            )
+            return
+        new_group_name = self._viewer.ask_keyword("Enter the new keyword group name: ")
+        if new_group_name:
+            self._data.merge_keyword_groups([group_name], new_group_name)
+            self._journal_operation("rename", group=group_name, name=new_group_name)
 
     def exclude_keyword(self) -> None:
         excluded_keyword = self._viewer.ask_keyword()
+        if (
+            excluded_keyword
+            and self._data.unique_keywords_groups
+            and excluded_keyword not in self._data.unique_keywords_groups
+        ):
+            print(f"ERROR: The keyword group {excluded_keyword} does not exist.")
+            self._viewer.display_suggestions(
+                excluded_keyword, self._data.group_lookup.lookup(excluded_keyword)
+            )
+        elif self._ban_keyword_group(excluded_keyword):
+            self._journal_operation("ban", group=excluded_keyword)
+
+    def _ban_keyword_group(self, excluded_keyword: str) -> bool:
         if (
             excluded_keyword
             and excluded_keyword not in self._preferences.excluded_keywords_in_plot
         ):
             self._preferences.excluded_keywords_in_plot.append(excluded_keyword)
             self._preferences.excluded_keywords_in_plot.sort()
+            return True
+        return False
 
     def remove_excluded_keyword(self) -> None:
         excluded_keyword = self._viewer.ask_keyword()
+        if self._unban_keyword_group(excluded_keyword):
+            self._journal_operation("unban", group=excluded_keyword)
+        elif excluded_keyword:
+            print(f"ERROR: The keyword {excluded_keyword} is not banned.")
+            excluded_lookup = KeywordLookup(self._preferences.excluded_keywords_in_plot)
+            self._viewer.display_suggestions(
+                excluded_keyword, excluded_lookup.lookup(excluded_keyword)
+            )
+
+    def _unban_keyword_group(self, excluded_keyword: str) -> bool:
         if excluded_keyword in self._preferences.excluded_keywords_in_plot:
             self._preferences.excluded_keywords_in_plot.remove(excluded_keyword)
+            return True
+        return False
+
+    def lookup_keyword(
+        self, query: str = None, limit: int = 10
+    ) -> tuple[list[str], list[str]]:
+        """
+        Finds the keywords and keyword group names that start with the query
+        or are within two typos of it.
+
+        Args:
+            query (str, optional): The beginning of a name or a misspelled name. Asked
+            to the user if not given. Defaults to None.
+            limit (int, optional): Maximum number of keywords and of groups returned. Defaults to 10.
+
+        Returns:
+            tuple[list[str], list[str]]: The matching keywords and the matching group names.
+        """
+        if query is None:
+            query = self._viewer.ask_keyword()
+        if not query:
+            return [], []
+        return (
+            self._data.keyword_lookup.lookup(query, limit=limit),
+            self._data.group_lookup.lookup(query, limit=limit),
+        )
+
+    def run_pipeline(self, force: bool = False) -> dict[str, str]:
+        """
+        Runs the stages import CSVs -> unique keywords -> embeddings -> keyword
+        groups -> database -> plots without user interaction, skipping the stages
+        whose inputs and preferences did not change since the last run.
+
+        Args:
+            force (bool, optional): Run every stage even if its output is up to date. Defaults to False.
+
+        Returns:
+            dict[str, str]: The status of each stage: "cached" or "ran".
+        """
+        status = Pipeline(self, force=force).run()
+        self.write_run_report()
+        return status
+
+    def run_preview(self, force: bool = False) -> dict:
+        """
+        Runs the whole pipeline on a reproducible sample of the papers,
+        stratified by year (see `PaperLoader.stratified_sample`), with the
+        "preview" preferences. The papers already imported by this session or
+        by the last `run_pipeline` are sampled instead of importing the CSV
+        files again. The preview has its own output folder and database, so it
+        never touches the full run, and its stages are cached like the ones of
+        `run_pipeline`. The top groups of every plot of the preferences are
+        compared with the database of the last full run and the report is saved
+        as "preview_report.json" in the preview folder.
+
+        Args:
+            force (bool, optional): Run every stage of the preview even if its output is up to date. Defaults to False.
+
+        Returns:
+            dict: The report, with the keys "fraction", "seed", "papers", "seconds",
+            "stages", "full_run" (None without a full run database) and "plots".
+        """
+        fraction = self._preferences.preview_fraction
+        if not 0 < fraction <= 1:
+            print(f"ERROR: The preview fraction must be in (0, 1], not {fraction}.")
+            return None
+        preview_folder = f"{self._preferences.output_files_folder}/{self._preferences.preview_folder}"
+        os.makedirs(preview_folder, exist_ok=True)
+        preferences = copy.copy(self._preferences)
+        preferences.output_files_folder = preview_folder
+        preview = Controller(
+            preferences=preferences, db_name=f"{preview_folder}/Review.db"
+        )
+        preview._sample = {"fraction": fraction, "seed": self._preferences.preview_seed}
+        preview._sample_source = self._imported_papers
+        # The sentence transformer model is loaded once for both runs
+        preview._paper_loader._transformer_model = self._paper_loader._transformer_model
+
+        start = time.perf_counter()
+        status = preview.run_pipeline(force=force)
+        seconds = time.perf_counter() - start
+        self._paper_loader._transformer_model = preview._paper_loader._transformer_model
+
+        report = {
+            "fraction": fraction,
+            "seed": self._preferences.preview_seed,
+            "papers": int(
+                preview._db_handler.query_papers_per_year()["paper_count"].sum()
+            ),
+            "seconds": seconds,
+            "stages": status,
+            "full_run": None,
+            "plots": [],
+        }
+        if self.is_database_created():
+            report["full_run"] = {
+                "database": self._db_handler._db_name,
+                "papers": int(
+                    self._db_handler.query_papers_per_year()["paper_count"].sum()
+                ),
+            }
+            comparisons = [
+                self._compare_top_groups(preview._db_handler, plot)
+                for plot in self._preferences.plots
+            ]
+            report["plots"] = [plot for plot in comparisons if plot is not None]
+        CheckpointHandler.write_to_json_file(
+            report, f"{preview_folder}/preview_report.json"
+        )
+        self._viewer.display_preview_report(report)
+        return report
+
+    def _imported_papers(self) -> pd.DataFrame:
+        """
+        Returns the papers imported by this session or, if they are up to date,
+        the ones of the last `run_pipeline`, without importing the CSV files.
+        None if there are neither.
+        """
+        if self._raw_papers is not None:
+            return self._raw_papers
+        return Pipeline(self).imported_papers()
+
+    def _compare_top_groups(self, preview_db_handler: DBHandler, plot: dict) -> dict:
+        """
+        Compares the top groups of a plot in a preview database with the same
+        query on the database of the full run. The groups of the preview are
+        clustered from the sampled keywords, so each one is matched with the
+        full run group (at the same level of the group hierarchy) that holds
+        the keyword it is named after (or with the group of the same name). The
+        shares are the fraction of the papers of the years of the plot, so both
+        runs have the same scale. Returns None if the plot needs a group
+        hierarchy or a title index that one of the databases does not have. The
+        database of the full run is only read.
+        """
+        spec = self._plot_spec(plot)
+        if (spec["level"] or spec["parent_group"]) and not (
+            self._db_handler.has_group_hierarchy()
+            and preview_db_handler.has_group_hierarchy()
+        ):
+            print("ERROR: The group hierarchy is not built, the plot is not compared.")
+            return None
+        if spec["title_match"] and not (
+            self._db_handler.has_title_index() and preview_db_handler.has_title_index()
+        ):
+            print("ERROR: The title index is not built, the plot is not compared.")
+            return None
+        arguments = {
+            "year_lower_bound": spec["year_lower_bound"],
+            "year_upper_bound": spec["year_upper_bound"],
+            "excluded_keywords": spec["excluded_keywords"],
+            "level": spec["level"],
+            "parent_group": spec["parent_group"],
+            "title_match": spec["title_match"],
+        }
+
+        def papers(db_handler: DBHandler) -> int:
+            return int(
+                db_handler.query_papers_per_year(
+                    spec["year_lower_bound"], spec["year_upper_bound"]
+                )["paper_count"].sum()
+            )
+
+        df_preview = preview_db_handler.query_top_groups(
+            limit=spec["limit"], **arguments
+        )
+        df_full = self._db_handler.query_top_groups(limit=None, **arguments)
+        preview_papers = papers(preview_db_handler) or 1
+        full_papers = papers(self._db_handler) or 1
+
+        full_ranks = {name: rank for rank, name in enumerate(df_full["name"], start=1)}
+        full_counts = dict(zip(df_full["name"], df_full["unique_paper_count"]))
+        # Upper groups are named after a keyword group, as in "name [level 1]"
+        suffix = f" [level {spec['level']}]" if spec["level"] else ""
+        keywords = [
+            name[: -len(suffix)] if suffix and name.endswith(suffix) else name
+            for name in df_preview["name"]
+        ]
+        keyword_groups = dict(
+            self._db_handler.query_keyword_groups(
+                keywords, level=spec["level"]
+            ).itertuples(index=False)
+        )
+        groups = []
+        for rank, (name, keyword, count) in enumerate(
+            zip(df_preview["name"], keywords, df_preview["unique_paper_count"]),
+            start=1,
+        ):
+            full_group = keyword_groups.get(
+                keyword, name if name in full_ranks else None
+            )
+            groups.append(
+                {
+                    "rank": rank,
+                    "group": name,
+                    "share": count / preview_papers,
+                    "full_group": full_group,
+                    "full_rank": full_ranks.get(full_group),
+                    "full_share": full_counts.get(full_group, 0) / full_papers,
+                }
+            )
+
+        full_top = set(df_full["name"].head(spec["limit"]))
+        return {
+            "limit": spec["limit"],
+            "year_lower_bound": spec["year_lower_bound"],
+            "year_upper_bound": spec["year_upper_bound"],
+            "level": spec["level"],
+            "parent_group": spec["parent_group"],
+            "title_match": spec["title_match"],
+            "overlap": (
+                len({group["full_group"] for group in groups} & full_top)
+                / len(full_top)
+                if full_top
+                else 0.0
+            ),
+            "mean_share_error": (
+                sum(abs(group["share"] - group["full_share"]) for group in groups)
+                / len(groups)
+                if groups
+                else 0.0
+            ),
+            "groups": groups,
+        }
+
+    def _session_folder(self) -> str:
+        return f"{self._preferences.output_files_folder}/session"
+
+    def save_session(self) -> None:
+        """
+        Saves the imported papers, the unique keywords, their embeddings and the
+        keyword groups as binary checkpoints in the "session" folder of the
+        output files folder, so a working session can be restored without
+        importing the CSV files again.
+        """
+        folder = self._session_folder()
+        os.makedirs(folder, exist_ok=True)
+
+        if self._raw_papers is not None:
+            CheckpointHandler.write_dataframe(
+                self._raw_papers,
+                f"{folder}/papers{CheckpointHandler.dataframe_extension()}",
+            )
+        embeddings_saved = False
+        if self._data.unique_keywords is not None:
+            CheckpointHandler.write_to_json_file(
+                self._data.unique_keywords,
+                f"{folder}/unique_keywords.json",
+                human_readable=False,
+            )
+            embeddings_keywords, embeddings = self._paper_loader.cached_embeddings
+            if embeddings is not None and embeddings_keywords == list(
+                self._data.unique_keywords
+            ):
+                CheckpointHandler.write_embeddings(
+                    embeddings, f"{folder}/embeddings.npy"
+                )
+                embeddings_saved = True
+        # Checkpoints of an earlier session must not be paired with this one
+        if not embeddings_saved:
+            CheckpointHandler.remove_checkpoint(f"{folder}/embeddings.npy")
+        if self._data.unique_keywords_groups is not None:
+            CheckpointHandler.write_keyword_groups(
+                self._data.unique_keywords_groups, f"{folder}/keyword_groups.npz"
+            )
+        else:
+            CheckpointHandler.remove_checkpoint(f"{folder}/keyword_groups.npz")
+
+    def load_session(self) -> bool:
+        """
+        Restores the working session saved by `save_session`.
+
+        Returns:
+            bool: True if the papers were restored.
+        """
+        folder = self._session_folder()
+        try:
+            papers = CheckpointHandler.load_dataframe(
+                f"{folder}/papers{CheckpointHandler.dataframe_extension()}"
+            )
+            unique_keywords = CheckpointHandler.load_from_json_file(
+                f"{folder}/unique_keywords.json"
+            )
+            embeddings = CheckpointHandler.load_embeddings(f"{folder}/embeddings.npy")
+            keyword_groups = CheckpointHandler.load_keyword_groups(
+                f"{folder}/keyword_groups.npz"
+            )
+        except ValueError as error:
+            print(f"ERROR: {error}")
+            return False
+
+        if papers is False:
+            return False
+        # Parquet returns the keyword lists as arrays
+        papers["keywords"] = papers["keywords"].map(list)
+        # Sessions saved before the title hashes existed are deduplicated by them
+        self._raw_papers, _ = self._paper_loader.remove_duplicates(
+            self._paper_loader.compact_titles(papers)
+        )
+        if unique_keywords is not False:
+            self._data.unique_keywords = unique_keywords
+            if embeddings is not False and len(embeddings) == len(unique_keywords):
+                self._paper_loader.set_cached_embeddings(unique_keywords, embeddings)
+            elif embeddings is not False:
+                print(
+                    "ERROR: The saved embeddings do not match the saved keywords "
+                    "and are ignored."
+                )
+        if keyword_groups is not False:
+            self._data.unique_keywords_groups = keyword_groups
+            self._journal.stop()
+        return True
 
     def delete_database(self) -> bool:
         return self._db_handler.delete_database()
@@ -190,54 +1082,168 @@ class Controller:
     def save_preferences(self) -> bool:
         self._preferences.save_preferences("test.json")
 
-    def generate_plots(
-        self,
-        limit: int = 10,
-        year_lower_bound: int = 2023,
-        year_upper_bound: int = 2024,
-        width: int = 12,
-        height: int = 8,
-    ) -> None:
-        if self.is_database_created():
-            self._generate_trends_lineplot(
+    @instrumented()
+    def generate_plots(self, plots: list[dict] = None) -> list[str]:
+        """
+        Renders a batch of trends line plots to the plot folder, in parallel and
+        without showing them.
+
+        Args:
+            plots (list[dict], optional): One dict per plot with the keys "limit",
+            "year_lower_bound", "year_upper_bound" and optionally "excluded_keywords",
+            "width", "height", "level", "parent_group" and "title_match". Defaults to the "plots" of the preferences.
+
+        Returns:
+            list[str]: The paths of the saved plots.
+        """
+        if not self.is_database_created():
+            print("ERROR: Database is not created.")
+            return []
+
+        if plots is None:
+            plots = self._preferences.plots
+        if not self._db_handler.has_group_hierarchy() and any(
+            plot.get("level") or plot.get("parent_group") for plot in plots
+        ):
+            print("ERROR: The group hierarchy is not built.")
+            return []
+        if not self._db_handler.has_title_index() and any(
+            plot.get("title_match") for plot in plots
+        ):
+            # Databases created before the title index existed
+            self._db_handler.populate_title_index()
+        # The plots are rendered by worker processes that read the database file
+        if self._db_handler.has_unsaved_changes:
+            if self._preferences.memory_database_write_back:
+                self._db_handler.save_to_disk()
+            else:
+                print(
+                    "WARNING: The plots do not include the database changes made in memory."
+                )
+        os.makedirs(
+            f"{self._preferences.output_files_folder}/{self._preferences.plot_folder}",
+            exist_ok=True,
+        )
+        entries = self._plot_generator.render_trends_plots(
+            db_name=self._db_handler._db_name,
+            specs=[self._plot_spec(plot) for plot in plots],
+            max_workers=self._preferences.max_workers,
+        )
+        save_paths = [
+            f"{self._preferences.output_files_folder}/{self._preferences.plot_folder}/{entry['file']}"
+            for entry in entries
+        ]
+        for save_path, entry in zip(save_paths, entries):
+            if entry["rendered"]:
+                print(f"Plot saved in {save_path}")
+            else:
+                print(f"Plot unchanged: {save_path}")
+        return save_paths
+
+    def analyze_emerging_topics(self) -> pd.DataFrame:
+        """
+        Ranks the keyword groups by how much their share of the papers grows
+        (see TrendAnalyzer), with the "emerging_topics" preferences. The ranking
+        is saved as "emerging_topics.csv" in the output folder and its top groups
+        are plotted as "emerging_topics.png" in the plot folder.
+
+        Returns:
+            pd.DataFrame: The ranking, or None if there is no database.
+        """
+        if not self.is_database_created():
+            print("ERROR: Database is not created.")
+            return None
+        rank_by = self._preferences.emerging_topics_rank_by
+        if rank_by not in TREND_METRICS:
+            print(
+                f"ERROR: Unknown emerging topics metric {rank_by}, use one of: {', '.join(TREND_METRICS)}."
+            )
+            return None
+
+        df_counts = self._db_handler.query_group_year_counts(
+            excluded_keywords=self._preferences.excluded_keywords_in_plot
+        )
+        df_ranking = TrendAnalyzer(
+            window=self._preferences.emerging_topics_window,
+            min_papers=self._preferences.emerging_topics_min_papers,
+        ).analyze(
+            df_counts,
+            papers_per_year=self._db_handler.query_papers_per_year(),
+            rank_by=rank_by,
+        )
+
+        limit = self._preferences.emerging_topics_limit
+        self._viewer.display_emerging_topics(df_ranking.head(limit), rank_by)
+        output_folder = self._preferences.output_files_folder
+        plot_folder = f"{output_folder}/{self._preferences.plot_folder}"
+        os.makedirs(plot_folder, exist_ok=True)
+        df_ranking.to_csv(f"{output_folder}/emerging_topics.csv", index=False)
+        if not df_ranking.empty:
+            self._plot_generator.generate_emerging_topics_barplot(
+                df_ranking,
+                title=f"Top {limit} Emerging Groups of Keywords",
+                metric=rank_by,
                 limit=limit,
-                year_lower_bound=year_lower_bound,
-                year_upper_bound=year_upper_bound,
-                width=width,
-                height=height,
+                save_file_path=f"{plot_folder}/emerging_topics.png",
+                show=False,
             )
-        else:
-            print("ERROR: Database is not created.")
+            print(f"Plot saved in {plot_folder}/emerging_topics.png")
+        return df_ranking
 
-    def _generate_trends_lineplot(
-        self,
-        limit: int = 10,
-        year_lower_bound: int = 2023,
-        year_upper_bound: int = 2024,
-        width: int = 12,
-        height: int = 8,
-    ) -> None:
-        filename = f"n{limit}_trends_in_{year_lower_bound}-{year_upper_bound}.png"
-        save_path = f"{self._preferences.output_files_folder}/{self._preferences.plot_folder}/{filename}"
-
-        df_top = self._db_handler.query_top_groups(
-            limit=limit,
-            year_lower_bound=year_lower_bound,
-            year_upper_bound=year_upper_bound,
-            excluded_keywords=self._preferences.excluded_keywords_in_plot,
+    def _plot_spec(self, plot: dict) -> dict:
+        """
+        Builds the `render_trends_plot` arguments of a plot of the preferences.
+        Plots with excluded keywords get a hash of the exclusions in their file
+        name, so changing the exclusions never overwrites another plot. Plots
+        with a "level" of the group hierarchy roll the groups up, and plots with
+        a "parent_group" drill down into the groups below it. Plots with a
+        "title_match" only count the papers whose title has those terms.
+        """
+        limit = plot.get("limit", 10)
+        year_lower_bound = plot.get("year_lower_bound", 2023)
+        year_upper_bound = plot.get("year_upper_bound", 2024)
+        excluded_keywords = sorted(
+            plot.get("excluded_keywords", self._preferences.excluded_keywords_in_plot)
         )
-        df_trends = self._db_handler.query_trends_of_groups(df_top)
+        level = plot.get("level", 0)
+        parent_group = plot.get("parent_group", None)
+        title_match = plot.get("title_match", None)
+        filename = f"n{limit}_trends_in_{year_lower_bound}-{year_upper_bound}"
+        if level:
+            filename += f"_level{level}"
+        if parent_group:
+            parent_hash = hashlib.sha256(parent_group.encode("utf-8")).hexdigest()
+            filename += f"_below{parent_hash[:8]}"
+        if title_match:
+            title_hash = hashlib.sha256(title_match.encode("utf-8")).hexdigest()
+            filename += f"_t{title_hash[:8]}"
+        if excluded_keywords:
+            exclusions_hash = hashlib.sha256(
+                json.dumps(excluded_keywords).encode("utf-8")
+            ).hexdigest()
+            filename += f"_x{exclusions_hash[:8]}"
+        filename += ".png"
         year_title = self._get_years_title(year_lower_bound, year_upper_bound)
-        self._plot_generator.generate_trends_lineplot(
-            df=df_trends,
-            title=f"Trends of Top {limit} Groups of Keywords {year_title} Over the Years",
-            x_label="Publication Year",
-            y_label="Number of Papers",
-            excluded_keywords=self._preferences.excluded_keywords_in_plot,
-            save_file_path=save_path,
-            width=width,
-            height=height,
-        )
+        groups_title = "Groups of Keywords"
+        if level:
+            groups_title = f"Level {level} {groups_title}"
+        if parent_group:
+            groups_title += f" of {parent_group}"
+        if title_match:
+            groups_title += f' in "{title_match}" Papers'
+        return {
+            "save_file_path": f"{self._preferences.output_files_folder}/{self._preferences.plot_folder}/{filename}",
+            "title": f"Trends of Top {limit} {groups_title} {year_title} Over the Years",
+            "limit": limit,
+            "year_lower_bound": year_lower_bound,
+            "year_upper_bound": year_upper_bound,
+            "excluded_keywords": excluded_keywords,
+            "width": plot.get("width", 12),
+            "height": plot.get("height", 8),
+            "level": level,
+            "parent_group": parent_group,
+            "title_match": title_match,
+        }
 
     def _get_years_title(
         self, year_lower_bound: int, year_upper_bound: int = None
@@ -255,10 +1261,17 @@ class Controller:
             if option_name == "exit":
                 self._kill_akabat = True
             elif option_name == "import all csvs":
-                duplicated_papers_removed = self.import_all_csvs()
-                print(
-                    f"Removed {duplicated_papers_removed} and loaded {len(self._raw_papers)} papers."
-                )
+                if self._preferences.streaming_import_enabled:
+                    duplicated_papers_removed = self.stream_import_csvs()
+                    if self._paper_stream is not None:
+                        print(
+                            f"Removed {duplicated_papers_removed} and streamed {self._paper_stream.rows} papers."
+                        )
+                else:
+                    duplicated_papers_removed = self.import_all_csvs()
+                    print(
+                        f"Removed {duplicated_papers_removed} and loaded {len(self._raw_papers)} papers."
+                    )
             elif option_name == "import unique keywords":
                 loaded = self.load_unique_keywords()
                 if loaded:
@@ -275,13 +1288,40 @@ class Controller:
                 self.generate_unique_keywords()
             elif option_name == "generate keyword groups":
                 self.group_keywords_by_semantic_similarity()
+            elif option_name == "sweep distance thresholds":
+                self.sweep_distance_thresholds()
             elif option_name == "generate database":
-                if not self.is_database_created():
+                if (
+                    not self.is_database_created()
+                    or self._db_handler.has_staged_paper_keywords()
+                ):
                     self.create_and_populate_database()
+                    if self._preferences.memory_database_enabled:
+                        self.load_database_into_memory()
+            elif option_name == "group hierarchy":
+                self.build_group_hierarchy()
             elif option_name == "generate plots":
                 self.generate_plots()
+            elif option_name == "emerging topics":
+                self.analyze_emerging_topics()
+            elif option_name == "search keywords":
+                keyword_results, group_results = self.search_similar_keywords()
+                self._viewer.display_search_results(keyword_results, group_results)
+            elif option_name == "lookup keywords":
+                keywords, groups = self.lookup_keyword()
+                self._viewer.display_lookup_results(keywords, groups)
+            elif option_name == "run preview":
+                self.run_preview()
+            elif option_name == "run pipeline":
+                self.run_pipeline()
+                if self._preferences.memory_database_enabled:
+                    self.load_database_into_memory()
             elif option_name == "merge keyword groups":
                 self.merge_keyword_groups()
+            elif option_name == "rename keyword group":
+                self.rename_keyword_group()
+            elif option_name == "apply merge file":
+                self.apply_merge_file()
             elif option_name == "exclude keyword":
                 self.exclude_keyword()
             elif option_name == "remove excluded keyword":
@@ -294,5 +1334,12 @@ class Controller:
                 self.save_unique_keywords()
             elif option_name == "save keyword groups":
                 self.save_keywords_by_semantic_similarity()
+            elif option_name == "save session":
+                self.save_session()
+            elif option_name == "load session":
+                if self.load_session():
+                    print(f"Loaded {len(self._raw_papers)} papers.")
+                else:
+                    print("Error loading.")
             else:
                 self._viewer.display_non_valid_option(self._menu)
@@ -0,0 +1,430 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+
+from akabat.model import (
+    CheckpointHandler,
+    PaperLoader,
+    PlotManifest,
+    render_trends_plot,
+)
+
+
+class PipelineStage:
+
+    def __init__(
+        self,
+        name: str,
+        dependencies: list[str],
+        parameters=None,
+        outputs=None,
+        run=None,
+        load=None,
+        task=None,
+        done=None,
+        fingerprint=None,
+    ) -> None:
+        """
+        Initialize a PipelineStage.
+
+        Args:
+            name (str): The stage name.
+            dependencies (list[str]): Names of the stages whose outputs this stage uses.
+            parameters (Callable[[], dict], optional): Returns the preferences the stage output depends on. Defaults to None.
+            outputs (Callable[[], list[str]], optional): Returns the files the stage writes. Defaults to None.
+            run (Callable[[], None], optional): Runs the stage in the main process. Defaults to None.
+            load (Callable[[], bool], optional): Loads the cached output of the stage into the controller. Defaults to None.
+            task (Callable[[], tuple], optional): Returns a (function, kwargs) tuple that runs the stage
+            in a worker process instead of `run`. Defaults to None.
+            done (Callable[[Any], None], optional): Receives the result of the worker `task`
+            in the main process. Defaults to None.
+            fingerprint (Callable[[], dict], optional): Returns a description of the stage output that
+            is not captured by its inputs (e.g. manual curation), used in the keys of the dependent stages.
+            Defaults to None.
+        """
+        self.name: str = name
+        self.dependencies: list[str] = dependencies
+        self.parameters = parameters or (lambda: {})
+        self.outputs = outputs or (lambda: [])
+        self.run = run
+        self.load = load
+        self.task = task
+        self.done = done
+        self.fingerprint = fingerprint
+
+
+class Pipeline:
+
+    def __init__(self, controller, force: bool = False) -> None:
+        """
+        Initialize the Pipeline, the non-interactive runner of the akabat stages:
+        import CSVs -> unique keywords -> embeddings -> keyword groups -> database
+        -> plots. Every stage is keyed by a hash of its parameters and of the keys
+        of the stages it depends on, so only the stale stages run again. Stages
+        whose dependencies are ready run in the same wave, and the plots of a wave
+        are rendered in parallel worker processes.
+
+        Args:
+            controller (Controller): The controller whose preferences and data are used.
+            force (bool, optional): Run every stage even if its output is up to date. Defaults to False.
+        """
+        self._controller = controller
+        self._preferences = controller._preferences
+        self._force: bool = force
+        self._loaded: set[str] = set()
+        self._stages: dict[str, PipelineStage] = {
+            stage.name: stage for stage in self._build_stages()
+        }
+
+    @property
+    def _output_folder(self) -> str:
+        return self._preferences.output_files_folder
+
+    @property
+    def _pipeline_folder(self) -> str:
+        return f"{self._output_folder}/pipeline"
+
+    @property
+    def _state_file_path(self) -> str:
+        return f"{self._pipeline_folder}/state.json"
+
+    @staticmethod
+    def _hash(obj) -> str:
+        content = json.dumps(obj, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+    def _build_stages(self) -> list[PipelineStage]:
+        controller = self._controller
+        preferences = self._preferences
+        papers_path = (
+            f"{self._pipeline_folder}/papers{CheckpointHandler.dataframe_extension()}"
+        )
+        unique_keywords_path = f"{self._output_folder}/unique_keywords.json"
+        embeddings_path = f"{self._pipeline_folder}/embeddings.npy"
+        groups_path = f"{self._output_folder}/keyword_groups.json"
+
+        def csv_files() -> list:
+            folder = preferences.csv_folder
+            if not folder or not os.path.isdir(folder):
+                return []
+            return [
+                (
+                    name,
+                    os.path.getsize(f"{folder}/{name}"),
+                    os.path.getmtime(f"{folder}/{name}"),
+                )
+                for name in PaperLoader.list_import_files(folder)
+            ]
+
+        def run_import() -> None:
+            controller._raw_papers = None
+            if controller._sample and controller._sample_source is not None:
+                controller._raw_papers = controller._sample_source()
+            if controller._raw_papers is None:
+                removed_papers = controller.import_all_csvs(preferences.csv_folder)
+                print(f"duplicated papers removed: {removed_papers}")
+            if controller._sample:
+                controller._raw_papers = controller._paper_loader.stratified_sample(
+                    controller._raw_papers,
+                    fraction=controller._sample["fraction"],
+                    seed=controller._sample["seed"],
+                )
+                print(f"papers sampled: {len(controller._raw_papers)}")
+            CheckpointHandler.write_dataframe(controller._raw_papers, papers_path)
+
+        def load_import() -> bool:
+            papers = self._load_papers(papers_path)
+            if papers is None:
+                return False
+            controller._raw_papers = papers
+            return True
+
+        def run_unique_keywords() -> None:
+            controller.generate_unique_keywords()
+            controller.save_unique_keywords()
+
+        def run_embeddings() -> None:
+            embeddings = controller._paper_loader.encode_keywords(
+                controller._data.unique_keywords
+            )
+            CheckpointHandler.write_embeddings(embeddings, embeddings_path)
+
+        def load_embeddings() -> bool:
+            self._ensure_loaded("unique keywords")
+            embeddings = CheckpointHandler.load_embeddings(embeddings_path)
+            if embeddings is False:
+                return False
+            controller._paper_loader.set_cached_embeddings(
+                controller._data.unique_keywords, embeddings
+            )
+            return True
+
+        def run_groups() -> None:
+            distance_threshold = preferences.distance_threshold
+            if preferences.n_clusters:
+                distance_threshold = None
+            controller._data.unique_keywords_groups = (
+                controller._paper_loader.group_keywords_by_semantic_similarity(
+                    controller._data.unique_keywords,
+                    distance_threshold=distance_threshold,
+                    n_clusters=preferences.n_clusters,
+                )
+            )
+            controller._journal.stop()
+            controller.save_keywords_by_semantic_similarity(compact=True)
+
+        def groups_fingerprint() -> dict:
+            # Curation (merges, renames) changes the groups without changing the inputs
+            journal_path = controller._journal.file_path
+            return {
+                "groups": CheckpointHandler.file_checksum(groups_path),
+                "journal": (
+                    CheckpointHandler.file_checksum(journal_path)
+                    if os.path.isfile(journal_path)
+                    else None
+                ),
+            }
+
+        def run_database() -> None:
+            controller.delete_database()
+            controller.create_and_populate_database()
+
+        stages = [
+            PipelineStage(
+                "import",
+                [],
+                parameters=lambda: {
+                    "csv_files": csv_files(),
+                    "csv_import_column_names": preferences.csv_import_column_names,
+                    "excluded_keywords_at_csv_import": preferences.excluded_keywords_at_csv_import,
+                    "excluded_starting_by_keywords_at_csv_import": preferences.excluded_starting_by_keywords_at_csv_import,
+                    "near_duplicates": (
+                        {
+                            "similarity_threshold": preferences.near_duplicates_similarity_threshold,
+                            "num_perm": preferences.near_duplicates_num_perm,
+                            "bands": preferences.near_duplicates_bands,
+                            "shingle_size": preferences.near_duplicates_shingle_size,
+                        }
+                        if preferences.near_duplicates_enabled
+                        else None
+                    ),
+                    # Only preview runs sample the papers
+                    **({"sample": controller._sample} if controller._sample else {}),
+                },
+                outputs=lambda: [papers_path],
+                run=run_import,
+                load=load_import,
+            ),
+            PipelineStage(
+                "unique keywords",
+                ["import"],
+                outputs=lambda: [unique_keywords_path],
+                run=run_unique_keywords,
+                load=controller.load_unique_keywords,
+            ),
+            PipelineStage(
+                "embeddings",
+                ["unique keywords"],
+                parameters=lambda: {
+                    "model": controller._paper_loader._transformer_model_name
+                },
+                outputs=lambda: [embeddings_path],
+                run=run_embeddings,
+                load=load_embeddings,
+            ),
+            PipelineStage(
+                "keyword groups",
+                ["unique keywords", "embeddings"],
+                parameters=lambda: {
+                    "distance_threshold": preferences.distance_threshold,
+                    "n_clusters": preferences.n_clusters,
+                },
+                outputs=lambda: [groups_path],
+                run=run_groups,
+                load=controller.load_keywords_by_semantic_similarity,
+                fingerprint=groups_fingerprint,
+            ),
+            PipelineStage(
+                "database",
+                ["import", "embeddings", "keyword groups"],
+                parameters=lambda: {
+                    "group_hierarchy": (
+                        preferences.group_hierarchy_level_sizes
+                        if preferences.group_hierarchy_enabled
+                        else None
+                    ),
+                },
+                outputs=lambda: [controller._db_handler._db_name],
+                run=run_database,
+            ),
+        ]
+
+        for plot in preferences.plots:
+            stages.append(self._build_plot_stage(plot))
+
+        return stages
+
+    def _build_plot_stage(self, plot: dict) -> PipelineStage:
+        controller = self._controller
+        preferences = self._preferences
+        spec = controller._plot_spec(plot)
+        plot_folder = os.path.dirname(spec["save_file_path"])
+
+        def task() -> tuple:
+            # A forced run renders again even if the image is up to date
+            cached_entry = None
+            if not self._force:
+                cached_entry = PlotManifest(plot_folder).get(spec["save_file_path"])
+            return render_trends_plot, {
+                "db_name": controller._db_handler._db_name,
+                **spec,
+                "cached_entry": cached_entry,
+            }
+
+        def done(entry: dict) -> None:
+            manifest = PlotManifest(plot_folder)
+            manifest.record(entry)
+            manifest.save()
+
+        return PipelineStage(
+            f"plot {os.path.basename(spec['save_file_path'])}",
+            ["database"],
+            parameters=lambda: {
+                "plot": plot,
+                "excluded_keywords_in_plot": preferences.excluded_keywords_in_plot,
+            },
+            outputs=lambda: [spec["save_file_path"]],
+            task=task,
+            done=done,
+        )
+
+    def _load_papers(self, papers_path: str) -> pd.DataFrame:
+        papers = CheckpointHandler.load_dataframe(papers_path)
+        if papers is False:
+            return None
+        papers["keywords"] = papers["keywords"].map(list)
+        papers, _ = self._controller._paper_loader.remove_duplicates(
+            self._controller._paper_loader.compact_titles(papers)
+        )
+        return papers
+
+    def imported_papers(self) -> pd.DataFrame:
+        """
+        Returns the papers of the import stage if its checkpoint is up to date
+        with the CSV files and the preferences, without running any stage.
+
+        Returns:
+            pd.DataFrame: The papers, or None if the import stage is stale.
+        """
+        stage = self._stages["import"]
+        state = CheckpointHandler.load_from_json_file(self._state_file_path) or {}
+        key = self._hash({"parameters": stage.parameters(), "dependencies": []})
+        if state.get(stage.name) != key or not all(
+            os.path.exists(path) for path in stage.outputs()
+        ):
+            return None
+        return self._load_papers(stage.outputs()[0])
+
+    def _ensure_loaded(self, stage_name: str) -> None:
+        stage = self._stages[stage_name]
+        if stage_name in self._loaded:
+            return
+        if stage.load is not None and not stage.load():
+            raise RuntimeError(
+                f"The output of the stage {stage_name} cannot be loaded."
+            )
+        self._loaded.add(stage_name)
+
+    def _waves(self) -> list[list[PipelineStage]]:
+        levels: dict[str, int] = {}
+        for stage in self._stages.values():
+            levels[stage.name] = 1 + max(
+                (levels[dependency] for dependency in stage.dependencies), default=-1
+            )
+        waves = [[] for _ in range(max(levels.values()) + 1)]
+        for stage in self._stages.values():
+            waves[levels[stage.name]].append(stage)
+        return waves
+
+    def run(self) -> dict[str, str]:
+        """
+        Runs the stale stages of the pipeline.
+
+        Returns:
+            dict[str, str]: The status of each stage: "cached" or "ran".
+        """
+        os.makedirs(self._pipeline_folder, exist_ok=True)
+        os.makedirs(
+            f"{self._output_folder}/{self._preferences.plot_folder}", exist_ok=True
+        )
+        state = CheckpointHandler.load_from_json_file(self._state_file_path) or {}
+        instrumentation = self._controller._instrumentation
+        keys: dict[str, str] = {}
+        status: dict[str, str] = {}
+
+        for wave in self._waves():
+            stale = []
+            for stage in wave:
+                key = self._hash(
+                    {
+                        "parameters": stage.parameters(),
+                        "dependencies": [keys[d] for d in stage.dependencies],
+                    }
+                )
+                keys[stage.name] = key
+                up_to_date = state.get(stage.name) == key and all(
+                    os.path.exists(path) for path in stage.outputs()
+                )
+                if up_to_date and not self._force:
+                    status[stage.name] = "cached"
+                else:
+                    stale.append(stage)
+                instrumentation.cache_event(
+                    "pipeline stages", hit=status.get(stage.name) == "cached"
+                )
+
+            for stage in stale:
+                for dependency in stage.dependencies:
+                    self._ensure_loaded(dependency)
+
+            tasks = [stage for stage in stale if stage.task is not None]
+            if tasks:
+                with instrumentation.stage("Pipeline.worker_tasks"):
+                    with ProcessPoolExecutor(
+                        max_workers=self._preferences.max_workers
+                    ) as executor:
+                        futures = []
+                        for stage in tasks:
+                            function, kwargs = stage.task()
+                            futures.append((stage, executor.submit(function, **kwargs)))
+                        for stage, future in futures:
+                            result = future.result()
+                            if stage.done is not None:
+                                stage.done(result)
+                    instrumentation.count(tasks=len(tasks))
+
+            for stage in stale:
+                if stage.task is None:
+                    with instrumentation.stage(f"Pipeline.{stage.name}"):
+                        stage.run()
+                    self._loaded.add(stage.name)
+
+            for stage in stale:
+                state[stage.name] = keys[stage.name]
+                status[stage.name] = "ran"
+                print(f"[ran] {stage.name}")
+            for stage in wave:
+                if status[stage.name] == "cached":
+                    print(f"[cached] {stage.name}")
+            CheckpointHandler.write_to_json_file(state, self._state_file_path)
+
+            for stage in wave:
+                if stage.fingerprint is not None:
+                    keys[stage.name] = self._hash(
+                        {"key": keys[stage.name], "output": stage.fingerprint()}
+                    )
+
+        return status
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from akabat.model import DBHandler, QueryCache
+
+
+class _ResponseCache:
+
+    def __init__(self, max_megabytes: float = 32) -> None:
+        """
+        Least recently used cache of serialized JSON responses, bounded by
+        memory and keyed by the normalized request and the database version.
+        """
+        self.max_bytes: int = int(max_megabytes * 1024 * 1024)
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key) -> bytes:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return body
+
+    def put(self, key, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else None,
+        }
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _int_parameter(parameters: dict, name: str, default: int = None) -> int:
+    values = parameters.get(name)
+    if not values:
+        return default
+    try:
+        return int(values[-1])
+    except ValueError:
+        raise BadRequest(f"The parameter {name} must be an integer.") from None
+
+
+def _list_parameter(parameters: dict, name: str) -> list[str]:
+    return [value for value in parameters.get(name, []) if value]
+
+
+def _title_parameter(parameters: dict) -> str:
+    title_match = " ".join(_list_parameter(parameters, "title"))
+    if title_match and not title_match.replace("*", "").strip():
+        raise BadRequest("The parameter title has no terms.")
+    return title_match or None
+
+
+class QueryService:
+
+    def __init__(
+        self,
+        db_name: str = "Review.db",
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        pool_size: int = 8,
+        stream_threshold: int = 10_000,
+        response_cache_megabytes: float = 32,
+        query_cache: QueryCache = None,
+        quiet: bool = True,
+    ) -> None:
+        """
+        Initialize the QueryService, a local read-only HTTP/JSON service over the
+        review database, so notebooks and dashboards can query it without
+        loading a Controller. Requests are served by threads that borrow
+        connections from a read-only pool. Responses are cached by request and
+        database version (with ETags), and results with more than
+        `stream_threshold` rows are streamed with chunked transfer encoding.
+
+        Endpoints (GET, JSON records):
+            /health, /stats,
+            /groups/count?limit=,
+            /groups/count-per-year?limit=,
+            /keywords/tendencies?limit=,
+            /groups/top?limit=&from=&to=&exclude=&level=&parent=&title=,
+            /groups/trends?group=&from=&to=&exclude=&level=&title=,
+            /groups/top/trends?limit=&from=&to=&exclude=&level=&parent=&title=,
+            /groups/levels
+
+        Args:
+            db_name (str, optional): Path of the SQLite database. Defaults to "Review.db".
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on (0 picks a free one). Defaults to 8765.
+            pool_size (int, optional): Maximum number of database connections. Defaults to 8.
+            stream_threshold (int, optional): Results with more rows are streamed and not cached. Defaults to 10_000.
+            response_cache_megabytes (float, optional): Memory bound of the response cache. Defaults to 32.
+            query_cache (QueryCache, optional): Cache of the query results. Defaults to a new QueryCache.
+            quiet (bool, optional): Do not log every request. Defaults to True.
+        """
+        self._db_handler: DBHandler = DBHandler(db_name)
+        self._db_handler.use_connection_pool(pool_size)
+        self._db_handler.query_cache = query_cache or QueryCache()
+        self._stream_threshold: int = stream_threshold
+        self._response_cache: _ResponseCache = _ResponseCache(response_cache_megabytes)
+        self._quiet: bool = quiet
+        self._routes: dict = {
+            "/health": self._health,
+            "/stats": self._stats,
+            "/groups/count": self._groups_count,
+            "/groups/count-per-year": self._groups_count_per_year,
+            "/keywords/tendencies": self._keywords_tendencies,
+            "/groups/top": self._groups_top,
+            "/groups/trends": self._groups_trends,
+            "/groups/top/trends": self._groups_top_trends,
+            "/groups/levels": self._groups_levels,
+        }
+        self._server: ThreadingHTTPServer = ThreadingHTTPServer(
+            (host, port), self._handler_class()
+        )
+        self._server.daemon_threads = True
+        self._thread: threading.Thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def start(self) -> None:
+        """Serves in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._db_handler.connection_pool.close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _health(self, parameters: dict):
+        return {
+            "status": "ok",
+            "database": self._db_handler.is_database_created(),
+        }
+
+    def _stats(self, parameters: dict):
+        return {
+            "query_cache": self._db_handler.query_cache.stats(),
+            "response_cache": self._response_cache.stats(),
+            "connection_pool": self._db_handler.connection_pool.stats(),
+        }
+
+    def _groups_count(self, parameters: dict) -> pd.DataFrame:
+        return self._db_handler.query_count_unique_papers_per_group(
+            limit=_int_parameter(parameters, "limit")
+        )
+
+    def _groups_count_per_year(self, parameters: dict) -> pd.DataFrame:
+        return self._db_handler.query_count_unique_papers_per_group_per_year(
+            limit=_int_parameter(parameters, "limit")
+        )
+
+    def _keywords_tendencies(self, parameters: dict) -> pd.DataFrame:
+        return self._db_handler.query_tendencies_of_keywords(
+            limit=_int_parameter(parameters, "limit")
+        )
+
+    def _hierarchy_parameters(self, parameters: dict) -> tuple[int, str]:
+        level = _int_parameter(parameters, "level", 0)
+        parent_group = (_list_parameter(parameters, "parent") or [None])[-1]
+        if (level or parent_group) and not self._db_handler.has_group_hierarchy():
+            raise BadRequest("The group hierarchy is not built.")
+        return level, parent_group
+
+    def _title_parameter(self, parameters: dict) -> str:
+        title_match = _title_parameter(parameters)
+        if title_match and not self._db_handler.has_title_index():
+            raise BadRequest("The title index is not built.")
+        return title_match
+
+    def _groups_top(self, parameters: dict) -> pd.DataFrame:
+        level, parent_group = self._hierarchy_parameters(parameters)
+        return self._db_handler.query_top_groups(
+            limit=_int_parameter(parameters, "limit", 10),
+            year_lower_bound=_int_parameter(parameters, "from", 0),
+            year_upper_bound=_int_parameter(parameters, "to", 3000),
+            excluded_keywords=_list_parameter(parameters, "exclude"),
+            level=level,
+            parent_group=parent_group,
+            title_match=self._title_parameter(parameters),
+        )
+
+    def _groups_trends(self, parameters: dict) -> pd.DataFrame:
+        groups = _list_parameter(parameters, "group")
+        if not groups:
+            raise BadRequest("At least one group parameter is required.")
+        level, _ = self._hierarchy_parameters(parameters)
+        return self._db_handler.query_trends_of_groups(
+            pd.DataFrame({"name": groups}),
+            year_lower_bound=_int_parameter(parameters, "from", 0),
+            year_upper_bound=_int_parameter(parameters, "to", 3000),
+            excluded_keywords=_list_parameter(parameters, "exclude"),
+            level=level,
+            title_match=self._title_parameter(parameters),
+        )
+
+    def _groups_top_trends(self, parameters: dict) -> pd.DataFrame:
+        df_top = self._groups_top(parameters)
+        level, _ = self._hierarchy_parameters(parameters)
+        return self._db_handler.query_trends_of_groups(
+            df_top,
+            year_lower_bound=_int_parameter(parameters, "from", 0),
+            year_upper_bound=_int_parameter(parameters, "to", 3000),
+            level=level,
+            title_match=self._title_parameter(parameters),
+        )
+
+    def _groups_levels(self, parameters: dict) -> pd.DataFrame:
+        if not self._db_handler.has_group_hierarchy():
+            raise BadRequest("The group hierarchy is not built.")
+        return self._db_handler.query_group_levels()
+
+    def _cache_key(self, path: str, parameters: dict) -> tuple:
+        return (
+            path,
+            tuple(sorted((name, tuple(values)) for name, values in parameters.items())),
+            self._db_handler.database_version(),
+        )
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes, which Nagle's algorithm
+            # would delay on keep-alive connections
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args) -> None:
+                if not service._quiet:
+                    super().log_message(format, *args)
+
+            def _send_json(self, status: int, obj, headers: dict = None) -> None:
+                self._send_body(status, json.dumps(obj).encode("utf-8"), headers)
+
+            def _send_body(
+                self, status: int, body: bytes, headers: dict = None
+            ) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_records(self, df: pd.DataFrame, batch_size: int = 5_000):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def write_chunk(data: bytes) -> None:
+                    self.wfile.write(f"{len(data):X}\r\n".encode("ascii"))
+                    self.wfile.write(data + b"\r\n")
+
+                write_chunk(b"[")
+                for start in range(0, len(df), batch_size):
+                    records = df.iloc[start : start + batch_size].to_json(
+                        orient="records"
+                    )[1:-1]
+                    prefix = "," if start else ""
+                    write_chunk((prefix + records).encode("utf-8"))
+                write_chunk(b"]")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self) -> None:
+                url = urlsplit(self.path)
+                route = service._routes.get(url.path.rstrip("/") or "/")
+                if route is None:
+                    self._send_json(404, {"error": f"Unknown endpoint {url.path}."})
+                    return
+                parameters = parse_qs(url.query)
+
+                if url.path.startswith(("/groups", "/keywords")):
+                    if not service._db_handler.is_database_created():
+                        self._send_json(503, {"error": "The database is not created."})
+                        return
+                    key = service._cache_key(url.path, parameters)
+                    etag = (
+                        '"' + hashlib.sha256(repr(key).encode()).hexdigest()[:32] + '"'
+                    )
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    body = service._response_cache.get(key)
+                    if body is None:
+                        try:
+                            df = route(parameters)
+                        except BadRequest as e:
+                            self._send_json(400, {"error": str(e)})
+                            return
+                        except (
+                            sqlite3.Error,
+                            pd.errors.DatabaseError,
+                            TimeoutError,
+                        ) as e:
+                            self._send_json(500, {"error": str(e)})
+                            return
+                        if len(df) > service._stream_threshold:
+                            self._stream_records(df)
+                            return
+                        body = df.to_json(orient="records").encode("utf-8")
+                        service._response_cache.put(key, body)
+                    self._send_body(200, body, {"ETag": etag})
+                else:
+                    self._send_json(200, route(parameters))
+
+            def _method_not_allowed(self) -> None:
+                self._send_json(405, {"error": "The service is read-only."})
+
+            do_POST = do_PUT = do_PATCH = do_DELETE = _method_not_allowed
+
+        return Handler
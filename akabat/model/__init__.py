@@ -1,7 +1,19 @@
 from .data import Data
+from .connection_pool import ConnectionPool
 from .data_handler import CheckpointHandler, PaperLoader, UserPreferences
 from .db_handler import DBHandler
-from .plot_generator import PlotGenerator
+from .edit_journal import EditJournal
+from .instrumentation import Instrumentation, instrumented
+from .keyword_groups import KeywordGroupIndex, UnionFind
+from .keyword_lookup import KeywordLookup
+from .keyword_search import KeywordSearchIndex
+from .near_duplicates import NearDuplicateDetector, NearDuplicateIndex
+from .paper_stream import PaperStream
+from .plot_generator import PlotGenerator, PlotManifest, render_trends_plot
+from .query_cache import QueryCache, cached_query
+from .query_tracer import QueryTracer
+from .trend_analyzer import TREND_METRICS, TrendAnalyzer
+from .title_index import TitleIndex, hash_title, hash_titles, normalize_title
 
 
 __all__ = [
@@ -10,5 +22,27 @@ __all__ = [
     "PaperLoader",
     "CheckpointHandler",
     "DBHandler",
+    "ConnectionPool",
+    "EditJournal",
+    "Instrumentation",
+    "instrumented",
+    "KeywordGroupIndex",
+    "UnionFind",
+    "KeywordLookup",
+    "KeywordSearchIndex",
+    "NearDuplicateDetector",
+    "NearDuplicateIndex",
+    "PaperStream",
     "PlotGenerator",
+    "PlotManifest",
+    "render_trends_plot",
+    "QueryCache",
+    "cached_query",
+    "QueryTracer",
+    "TitleIndex",
+    "TrendAnalyzer",
+    "TREND_METRICS",
+    "hash_title",
+    "hash_titles",
+    "normalize_title",
 ]
@@ -0,0 +1,330 @@
+import re
+
+import pandas as pd
+
+_BIBTEX_ENTRY = re.compile(r"\s*@\s*([A-Za-z]+)\s*([{(])")
+_BIBTEX_FIELD = re.compile(r"\s*,?\s*([A-Za-z][\w:.+-]*)\s*=\s*")
+_BIBTEX_DELIMITERS = re.compile(r'[{}"]')
+_BIBTEX_ENTRY_DELIMITERS = re.compile(r'[{}"()]')
+_BIBTEX_SKIPPED_ENTRIES = {"comment", "preamble", "string"}
+_LATEX_ESCAPED = re.compile(r"\\([&%$#_{}])")
+_LATEX_COMMAND = re.compile(r"\\[A-Za-z]+\s*|\\.")
+_RIS_LINE = re.compile(r"([A-Z][A-Z0-9])  -(?: (.*))?$")
+_RIS_TITLE_TAGS = ("TI", "T1", "CT", "BT")
+_RIS_YEAR_TAGS = ("PY", "Y1", "DA")
+_KEYWORD_SEPARATORS = re.compile(r"[;,]")
+_YEAR = re.compile(r"\d{4}")
+
+
+def _latex_to_text(value: str) -> str:
+    if "\\" not in value and "{" not in value:
+        return " ".join(value.split())
+    value = _LATEX_ESCAPED.sub(r"\1", value)
+    value = _LATEX_COMMAND.sub("", value)
+    return " ".join(value.replace("{", "").replace("}", "").split())
+
+
+def _year(value: str) -> int:
+    year = _YEAR.search(value or "")
+    return int(year.group()) if year else None
+
+
+def _close_entry(
+    line: str, start: int, parenthesized: bool, quotes: bool, state: tuple
+) -> tuple[tuple, int]:
+    """
+    Scans a line of a BibTeX entry from `start`. An entry delimited by braces
+    ends at the brace that closes it, and an entry delimited by parentheses
+    ("@type( ... )") at the parenthesis that closes it outside braced values.
+    Braces and parentheses inside quoted values ("a } b") are not counted.
+
+    Args:
+        line (str): The line.
+        start (int): The position where the scan starts.
+        parenthesized (bool): The entry is delimited by parentheses.
+        quotes (bool): Quotes delimit values (not in @comment blocks).
+        state (tuple): The open parentheses, the open braces and the braces open
+        inside the current quoted value (None outside quoted values), as returned
+        by the previous line. (0, 1, None) or (1, 0, None) for a new entry.
+
+    Returns:
+        tuple[tuple, int]: The state after the line and the position of the closing
+        brace or parenthesis, or -1 if the entry goes on.
+    """
+    parentheses, braces, quoted_braces = state
+    # Quoted values start at the top level of the entry
+    top = 0 if parenthesized else 1
+    for delimiter in _BIBTEX_ENTRY_DELIMITERS.finditer(line, start):
+        character = delimiter.group()
+        if quoted_braces is not None:
+            if character == "{":
+                quoted_braces += 1
+            elif character == "}" and quoted_braces > 0:
+                quoted_braces -= 1
+            elif character == '"' and quoted_braces == 0:
+                quoted_braces = None
+        elif quotes and character == '"' and braces == top:
+            quoted_braces = 0
+        elif character == "{":
+            braces += 1
+        elif character == "}":
+            braces -= 1
+            if not parenthesized and braces == 0:
+                return (0, 0, None), delimiter.start()
+        elif parenthesized and braces == 0 and character == "(":
+            parentheses += 1
+        elif parenthesized and braces == 0 and character == ")":
+            parentheses -= 1
+            if parentheses == 0:
+                return (0, 0, None), delimiter.start()
+    return (parentheses, braces, quoted_braces), -1
+
+
+def _bibtex_value(body: str, position: int) -> tuple[str, int]:
+    """
+    Reads the field value of a BibTeX entry that starts at `position`: a
+    braced value, a quoted value or a bare number or macro, possibly joined
+    with "#".
+
+    Returns:
+        tuple[str, int]: The raw value and the position after it.
+    """
+    parts = []
+    while position < len(body):
+        start = body[position]
+        end = body.find("}", position + 1) if start == "{" else -1
+        if end >= 0 and body.find("{", position + 1, end) < 0:
+            # Most values have no nested braces
+            parts.append(body[position + 1 : end])
+            end += 1
+        elif start in '{"':
+            # The value ends at the closing delimiter outside nested braces
+            depth = 0
+            end = len(body)
+            closing = "}" if start == "{" else '"'
+            for delimiter in _BIBTEX_DELIMITERS.finditer(body, position + 1):
+                character = delimiter.group()
+                if character == "{":
+                    depth += 1
+                elif depth > 0 and character == "}":
+                    depth -= 1
+                elif depth == 0 and character == closing:
+                    end = delimiter.start()
+                    break
+            parts.append(body[position + 1 : end])
+            end += 1
+        else:
+            end = position
+            while end < len(body) and body[end] not in ",#}":
+                end += 1
+            parts.append(body[position:end].strip())
+        position = end
+        while position < len(body) and body[position].isspace():
+            position += 1
+        if position < len(body) and body[position] == "#":
+            position += 1
+            while position < len(body) and body[position].isspace():
+                position += 1
+            continue
+        break
+    return "".join(parts), position
+
+
+def parse_bibtex_entry(body: str) -> dict[str, str]:
+    """
+    Parses the fields of a BibTeX entry, without the "@type{" (or "@type(")
+    prefix.
+
+    Args:
+        body (str): The text of the entry, starting with its citation key.
+
+    Returns:
+        dict[str, str]: The raw values by lowercase field name.
+    """
+    fields = {}
+    # Skip the citation key
+    position = body.find(",")
+    if position < 0:
+        return fields
+    while True:
+        field = _BIBTEX_FIELD.match(body, position)
+        if not field:
+            break
+        value, position = _bibtex_value(body, field.end())
+        fields[field.group(1).lower()] = value
+    return fields
+
+
+def iter_bibtex_records(file_path: str, encoding: str = "utf-8"):
+    """
+    Reads the papers of a BibTeX file one entry at a time, so the memory does
+    not depend on the size of the file. The "title", "year" (or "date") and
+    "keywords" fields are read; LaTeX commands and braces are removed from
+    the titles and the keywords are split at "," and ";". Entries may be
+    delimited by braces or parentheses, and an entry may follow another on
+    its closing line. Entries without title or year, and
+    @comment, @preamble and @string blocks are skipped.
+
+    Args:
+        file_path (str): The BibTeX file.
+        encoding (str, optional): The encoding of the file. Defaults to "utf-8".
+
+    Yields:
+        tuple[str, int, list[str]]: The title, publication year and keywords of every paper.
+    """
+    with open(file_path, encoding=encoding, errors="replace") as file:
+        entry_type = None
+        parenthesized = False
+        lines: list[str] = []
+        state = None
+        for line in file:
+            position = 0
+            while position < len(line):
+                if entry_type is None:
+                    # Entries start a line, or follow another one on its closing line
+                    entry = (_BIBTEX_ENTRY.search if position else _BIBTEX_ENTRY.match)(
+                        line, position
+                    )
+                    if not entry:
+                        break
+                    entry_type = entry.group(1).lower()
+                    parenthesized = entry.group(2) == "("
+                    state = (1, 0, None) if parenthesized else (0, 1, None)
+                    position = entry.end()
+                state, end = _close_entry(
+                    line, position, parenthesized, entry_type != "comment", state
+                )
+                if end < 0:
+                    lines.append(line[position:])
+                    break
+                lines.append(line[position:end])
+                position = end + 1
+
+                body = "".join(lines)
+                lines = []
+                current_type, entry_type = entry_type, None
+                if current_type in _BIBTEX_SKIPPED_ENTRIES:
+                    continue
+                fields = parse_bibtex_entry(body)
+                title = _latex_to_text(fields.get("title", ""))
+                year = _year(fields.get("year") or fields.get("date"))
+                if not title or year is None:
+                    continue
+                keywords = [
+                    keyword.strip()
+                    for keyword in _KEYWORD_SEPARATORS.split(
+                        _latex_to_text(fields.get("keywords", ""))
+                    )
+                    if keyword.strip()
+                ]
+                yield title, year, keywords
+
+
+def iter_ris_records(file_path: str, encoding: str = "utf-8-sig"):
+    """
+    Reads the papers of a RIS file one record at a time, so the memory does
+    not depend on the size of the file. The title is read from the TI tag
+    (or T1, CT, BT), the year from PY (or Y1, DA) and every KW line is a
+    keyword. Untagged lines continue the value of the previous tag. Records
+    without title or year are skipped.
+
+    Args:
+        file_path (str): The RIS file.
+        encoding (str, optional): The encoding of the file. Defaults to "utf-8-sig".
+
+    Yields:
+        tuple[str, int, list[str]]: The title, publication year and keywords of every paper.
+    """
+    with open(file_path, encoding=encoding, errors="replace") as file:
+        # The values of every tag of the record, in order
+        tags: dict[str, list[str]] = {}
+        last_tag = None
+        for line in file:
+            line = line.rstrip("\r\n")
+            field = _RIS_LINE.match(line)
+            if not field:
+                # Long values are wrapped in untagged lines
+                if last_tag is not None and line.strip():
+                    tags[last_tag][-1] = f"{tags[last_tag][-1]} {line.strip()}"
+                continue
+            tag, value = field.group(1), (field.group(2) or "").strip()
+            if tag == "TY":
+                tags, last_tag = {}, None
+            elif tag == "ER":
+                title = next(
+                    (tags[t][0] for t in _RIS_TITLE_TAGS if tags.get(t, [""])[0]), ""
+                )
+                year = next(
+                    (
+                        _year(tags[t][0])
+                        for t in _RIS_YEAR_TAGS
+                        if _year(tags.get(t, [""])[0])
+                    ),
+                    None,
+                )
+                keywords = [
+                    keyword.strip()
+                    for value in tags.get("KW", [])
+                    for keyword in _KEYWORD_SEPARATORS.split(value)
+                    if keyword.strip()
+                ]
+                if title and year is not None:
+                    yield " ".join(title.split()), year, keywords
+                tags, last_tag = {}, None
+            else:
+                tags.setdefault(tag, []).append(value)
+                last_tag = tag
+
+
+BIBLIOGRAPHY_READERS = {
+    ".bib": iter_bibtex_records,
+    ".ris": iter_ris_records,
+}
+
+
+def is_bibliography_file(file_path: str) -> bool:
+    return file_path.lower().endswith(tuple(BIBLIOGRAPHY_READERS))
+
+
+def iter_bibliography_records(file_path: str):
+    """Reads the records of a BibTeX or RIS file, chosen by its extension."""
+    for extension, reader in BIBLIOGRAPHY_READERS.items():
+        if file_path.lower().endswith(extension):
+            return reader(file_path)
+    raise ValueError(f"Unsupported bibliography file: {file_path}")
+
+
+def records_to_frames(
+    records,
+    import_columns_names: dict[str, str],
+    chunk_size: int = 50_000,
+    keyword_separator: str = ";",
+):
+    """
+    Groups the records of a bibliography reader in DataFrames of `chunk_size`
+    rows with the raw CSV columns, so they go through the same normalization
+    and deduplication as a CSV export.
+
+    Args:
+        records (Iterable[tuple[str, int, list[str]]]): The title, year and keywords of the papers.
+        import_columns_names (dict[str, str]): Names of the "title", "publication_year"
+        and "keywords" columns of the DataFrames.
+        chunk_size (int, optional): Number of rows per DataFrame. Defaults to 50_000.
+        keyword_separator (str, optional): The character that joins the keywords. Defaults to ";".
+
+    Yields:
+        pd.DataFrame: The records, `chunk_size` at a time.
+    """
+    columns = [
+        import_columns_names["title"],
+        import_columns_names["publication_year"],
+        import_columns_names["keywords"],
+    ]
+    rows = []
+    for title, year, keywords in records:
+        rows.append((title, year, keyword_separator.join(keywords)))
+        if len(rows) == chunk_size:
+            yield pd.DataFrame(rows, columns=columns)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows, columns=columns)
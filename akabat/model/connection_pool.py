@@ -0,0 +1,113 @@
+import queue
+import sqlite3
+import threading
+
+
+class _PooledConnection(sqlite3.Connection):
+    """
+    Connection owned by a ConnectionPool. Closing it gives it back to the pool
+    instead of closing it, so the DBHandler methods work unchanged.
+    """
+
+    pool: "ConnectionPool" = None
+
+    def close(self) -> None:
+        self.rollback()
+        self.pool.release(self)
+
+    def release(self) -> None:
+        super().close()
+
+
+class ConnectionPool:
+
+    def __init__(self, db_name: str, size: int = 8, timeout: float = 30.0) -> None:
+        """
+        Initialize the ConnectionPool, a fixed-size pool of read-only SQLite
+        connections shared by concurrent readers. Connections are opened
+        lazily, and a reader waits for a free one when all of them are in use.
+
+        Args:
+            db_name (str): Path of the SQLite database.
+            size (int, optional): Maximum number of open connections. Defaults to 8.
+            timeout (float, optional): Seconds a reader waits for a free connection. Defaults to 30.0.
+        """
+        self._db_name: str = db_name
+        self._size: int = size
+        self._timeout: float = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._opened: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _open(self) -> _PooledConnection:
+        conn = sqlite3.connect(
+            f"file:{self._db_name}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            factory=_PooledConnection,
+        )
+        conn.pool = self
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Returns an idle connection, opening a new one if the pool is not full.
+
+        Raises:
+            TimeoutError: If no connection gets free within the timeout.
+        """
+        if self._closed:
+            raise RuntimeError("The connection pool is closed.")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self._size:
+                self._opened += 1
+                open_new = True
+            else:
+                open_new = False
+        if open_new:
+            try:
+                return self._open()
+            except sqlite3.Error:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self._timeout)
+        except queue.Empty:
+            raise TimeoutError("No database connection got free in time.") from None
+
+    def release(self, conn: _PooledConnection) -> None:
+        if self._closed:
+            conn.release()
+            with self._lock:
+                self._opened -= 1
+        else:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        """Closes the idle connections. Busy ones are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.release()
+            with self._lock:
+                self._opened -= 1
+
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "opened": self._opened,
+            "idle": self._idle.qsize(),
+        }
@@ -1,5 +1,8 @@
 import pandas as pd
 
+from .keyword_groups import KeywordGroupIndex
+from .keyword_lookup import KeywordLookup
+
 
 class Data:
 
@@ -7,21 +10,54 @@ class Data:
         self._keywords: pd.Series = None
         self._unique_keywords: list[str] = None
         self._unique_keywords_groups: dict[str, list[str]] = None
+        self._groups_index: KeywordGroupIndex = None
+        self._groups_version: int = 0
+        self._keyword_lookup: KeywordLookup = None
+        self._group_lookup: KeywordLookup = None
 
     def all_keys_exist(self, keyword_groups_names: list[str]) -> bool:
         for key in keyword_groups_names:
-            if key not in self._unique_keywords_groups.keys():
+            if key not in self._groups_index:
                 return False
         return True
 
+    def missing_keys(self, keyword_groups_names: list[str]) -> list[str]:
+        return [key for key in keyword_groups_names if key not in self._groups_index]
+
+    def group_of_keyword(self, keyword: str) -> str:
+        """Returns the name of the keyword group that contains `keyword`, or None."""
+        if self._groups_index is None:
+            return None
+        return self._groups_index.group_of(keyword)
+
     def merge_keyword_groups(
         self, keyword_groups_names: list[str], new_group_name: str
     ) -> None:
-        merged_keywords = []
-        for key in keyword_groups_names:
-            merged_keywords.extend(self._unique_keywords_groups[key])
-            del self._unique_keywords_groups[key]
-        self._unique_keywords_groups[new_group_name] = list(set(merged_keywords))
+        if self._group_lookup is not None:
+            for key in keyword_groups_names:
+                self._group_lookup.remove(key)
+            self._group_lookup.add(new_group_name)
+        self._groups_index.merge(keyword_groups_names, new_group_name)
+        self._unique_keywords_groups = None
+        self._groups_version += 1
+
+    def apply_keyword_group_merges(self, merges: dict[str, list[str]]) -> list[str]:
+        """
+        Applies many merges at once, in order. A merge may use the group names
+        produced by previous merges.
+
+        Args:
+            merges (dict[str, list[str]]): The new group names as keys and the names of
+            the groups to merge as values.
+
+        Returns:
+            list[str]: The missing group names of the skipped merges.
+        """
+        missing = self._groups_index.apply_merges(merges)
+        self._unique_keywords_groups = None
+        self._group_lookup = None
+        self._groups_version += 1
+        return missing
 
     @property
     def keywords(self) -> list[str]:
@@ -38,11 +74,40 @@ class Data:
     @unique_keywords.setter
     def unique_keywords(self, unique_keywords: list[str]):
         self._unique_keywords = unique_keywords
+        self._keyword_lookup = None
 
     @property
     def unique_keywords_groups(self) -> dict[str, list[str]]:
+        if self._unique_keywords_groups is None and self._groups_index is not None:
+            self._unique_keywords_groups = self._groups_index.to_dict()
         return self._unique_keywords_groups
 
     @unique_keywords_groups.setter
     def unique_keywords_groups(self, unique_keywords_groups: dict[str, list[str]]):
         self._unique_keywords_groups = unique_keywords_groups
+        self._groups_index = None
+        if unique_keywords_groups is not None:
+            self._groups_index = KeywordGroupIndex(unique_keywords_groups)
+        self._group_lookup = None
+        self._groups_version += 1
+
+    @property
+    def groups_version(self) -> int:
+        """Counter increased every time the keyword groups change."""
+        return self._groups_version
+
+    @property
+    def keyword_lookup(self) -> KeywordLookup:
+        """Prefix and typo lookup over the unique keywords, built on first use."""
+        if self._keyword_lookup is None:
+            self._keyword_lookup = KeywordLookup(self._unique_keywords or [])
+        return self._keyword_lookup
+
+    @property
+    def group_lookup(self) -> KeywordLookup:
+        """Prefix and typo lookup over the keyword group names, built on first use."""
+        if self._group_lookup is None:
+            self._group_lookup = KeywordLookup(
+                self._groups_index.group_names() if self._groups_index else []
+            )
+        return self._group_lookup
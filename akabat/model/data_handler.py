@@ -1,12 +1,40 @@
+import hashlib
 import json
 
 import re
 import os
+import tempfile
 import unicodedata
+import numpy as np
 import pandas as pd
 
+from concurrent.futures import ThreadPoolExecutor
+from scipy.cluster.hierarchy import fcluster, linkage
 from sentence_transformers import SentenceTransformer
 from sklearn.cluster import AgglomerativeClustering
+from sklearn.metrics import silhouette_score
+
+from .bibliography import (
+    is_bibliography_file,
+    iter_bibliography_records,
+    records_to_frames,
+)
+from .instrumentation import Instrumentation, instrumented
+from .near_duplicates import NearDuplicateDetector, NearDuplicateIndex
+from .paper_stream import PaperStream
+from .title_index import TitleIndex, hash_titles
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet checkpoints and the pyarrow CSV engine are optional
+    pa = None
+    pa_csv = None
+    pq = None
+
+CSV_EXTENSIONS = (".csv", ".csv.gz", ".csv.zst", ".csv.bz2")
+CSV_ENGINES = ("c", "python", "pyarrow")
 
 
 class UserPreferences:
@@ -28,6 +56,49 @@ class UserPreferences:
         self.excluded_keywords_in_plot: list[str] = []
         self.csv_import_column_names: dict[str, str] = {}
         self.csv_column_names: dict[str, str] = {}
+        self.journal_compaction_threshold: int = 1000
+        self.instrumentation_enabled: bool = False
+        self.instrumentation_profile: bool = False
+        self.instrumentation_report_file: str = "run_report.json"
+        self.db_tracing_enabled: bool = False
+        self.slow_query_threshold_ms: float = 100.0
+        self.explain_slow_queries: bool = True
+        self.slow_query_log_file: str = "slow_queries.json"
+        self.query_cache_enabled: bool = True
+        self.query_cache_max_entries: int = 128
+        self.query_cache_max_megabytes: float = 64
+        self.memory_database_enabled: bool = False
+        self.memory_database_max_megabytes: float = 1024
+        self.memory_database_write_back: bool = True
+        self.service_host: str = "127.0.0.1"
+        self.service_port: int = 8765
+        self.service_pool_size: int = 8
+        self.service_stream_threshold: int = 10_000
+        self.service_response_cache_megabytes: float = 32
+        self.streaming_import_enabled: bool = False
+        self.streaming_import_chunk_size: int = 50_000
+        self.streaming_import_sink: str = "database"
+        self.csv_parsing_engine: str = "c"
+        self.emerging_topics_window: int = 5
+        self.emerging_topics_min_papers: int = 5
+        self.emerging_topics_limit: int = 20
+        self.emerging_topics_rank_by: str = "emergence_score"
+        self.group_hierarchy_enabled: bool = False
+        self.group_hierarchy_level_sizes: list[int] = [200, 20]
+        self.preview_fraction: float = 0.05
+        self.preview_seed: int = 0
+        self.preview_folder: str = "preview"
+        self.near_duplicates_enabled: bool = False
+        self.near_duplicates_similarity_threshold: float = 0.8
+        self.near_duplicates_num_perm: int = 64
+        self.near_duplicates_bands: int = 16
+        self.near_duplicates_shingle_size: int = 4
+        self.distance_threshold: float = 1.9
+        self.n_clusters: int = None
+        self.max_workers: int = None
+        self.plots: list[dict] = [
+            {"limit": 10, "year_lower_bound": 2023, "year_upper_bound": 2024}
+        ]
         self.load_preferences(preferences_file_path)
 
     def save_preferences(self, alternative_preferences_file_path: str = None) -> None:
@@ -76,16 +147,202 @@ class UserPreferences:
                     "excluded_keywords_in_plot", []
                 )
 
+            pipeline: dict = self.preferences.get("pipeline", None)
+            if pipeline:
+                self.distance_threshold: float = pipeline.get("distance_threshold", 1.9)
+                self.n_clusters: int = pipeline.get("n_clusters", None)
+                self.max_workers: int = pipeline.get("max_workers", None)
+                self.plots: list[dict] = pipeline.get("plots", self.plots)
+
+            instrumentation: dict = self.preferences.get("instrumentation", None)
+            if instrumentation:
+                self.instrumentation_enabled: bool = instrumentation.get(
+                    "enabled", False
+                )
+                self.instrumentation_profile: bool = instrumentation.get(
+                    "profile", False
+                )
+                self.instrumentation_report_file: str = instrumentation.get(
+                    "report_file", "run_report.json"
+                )
+
+            db_tracing: dict = self.preferences.get("db_tracing", None)
+            if db_tracing:
+                self.db_tracing_enabled: bool = db_tracing.get("enabled", False)
+                self.slow_query_threshold_ms: float = db_tracing.get(
+                    "slow_query_threshold_ms", 100.0
+                )
+                self.explain_slow_queries: bool = db_tracing.get("explain", True)
+                self.slow_query_log_file: str = db_tracing.get(
+                    "slow_query_log_file", "slow_queries.json"
+                )
+
+            query_cache: dict = self.preferences.get("query_cache", None)
+            if query_cache:
+                self.query_cache_enabled: bool = query_cache.get("enabled", True)
+                self.query_cache_max_entries: int = query_cache.get("max_entries", 128)
+                self.query_cache_max_megabytes: float = query_cache.get(
+                    "max_megabytes", 64
+                )
+
+            memory_database: dict = self.preferences.get("memory_database", None)
+            if memory_database:
+                self.memory_database_enabled: bool = memory_database.get(
+                    "enabled", False
+                )
+                self.memory_database_max_megabytes: float = memory_database.get(
+                    "max_megabytes", 1024
+                )
+                self.memory_database_write_back: bool = memory_database.get(
+                    "write_back", True
+                )
+
+            service: dict = self.preferences.get("service", None)
+            if service:
+                self.service_host: str = service.get("host", "127.0.0.1")
+                self.service_port: int = service.get("port", 8765)
+                self.service_pool_size: int = service.get("pool_size", 8)
+                self.service_stream_threshold: int = service.get(
+                    "stream_threshold", 10_000
+                )
+                self.service_response_cache_megabytes: float = service.get(
+                    "response_cache_megabytes", 32
+                )
+
+            streaming_import: dict = self.preferences.get("streaming_import", None)
+            if streaming_import:
+                self.streaming_import_enabled: bool = streaming_import.get(
+                    "enabled", False
+                )
+                self.streaming_import_chunk_size: int = streaming_import.get(
+                    "chunk_size", 50_000
+                )
+                self.streaming_import_sink: str = streaming_import.get(
+                    "sink", "database"
+                )
+
+            csv_parsing: dict = self.preferences.get("csv_parsing", None)
+            if csv_parsing:
+                self.csv_parsing_engine: str = csv_parsing.get("engine", "c")
+
+            emerging_topics: dict = self.preferences.get("emerging_topics", None)
+            if emerging_topics:
+                self.emerging_topics_window: int = emerging_topics.get("window", 5)
+                self.emerging_topics_min_papers: int = emerging_topics.get(
+                    "min_papers", 5
+                )
+                self.emerging_topics_limit: int = emerging_topics.get("limit", 20)
+                self.emerging_topics_rank_by: str = emerging_topics.get(
+                    "rank_by", "emergence_score"
+                )
+
+            group_hierarchy: dict = self.preferences.get("group_hierarchy", None)
+            if group_hierarchy:
+                self.group_hierarchy_enabled: bool = group_hierarchy.get(
+                    "enabled", False
+                )
+                self.group_hierarchy_level_sizes: list[int] = group_hierarchy.get(
+                    "level_sizes", [200, 20]
+                )
+
+            preview: dict = self.preferences.get("preview", None)
+            if preview:
+                self.preview_fraction: float = preview.get("fraction", 0.05)
+                self.preview_seed: int = preview.get("seed", 0)
+                self.preview_folder: str = preview.get("folder", "preview")
+
+            near_duplicates: dict = self.preferences.get("near_duplicates", None)
+            if near_duplicates:
+                self.near_duplicates_enabled: bool = near_duplicates.get(
+                    "enabled", False
+                )
+                self.near_duplicates_similarity_threshold: float = near_duplicates.get(
+                    "similarity_threshold", 0.8
+                )
+                self.near_duplicates_num_perm: int = near_duplicates.get("num_perm", 64)
+                self.near_duplicates_bands: int = near_duplicates.get("bands", 16)
+                self.near_duplicates_shingle_size: int = near_duplicates.get(
+                    "shingle_size", 4
+                )
+
+            checkpoints: dict = self.preferences.get("checkpoints", None)
+            if checkpoints:
+                self.journal_compaction_threshold: int = checkpoints.get(
+                    "journal_compaction_threshold", 1000
+                )
+
 
 class CheckpointHandler:
 
+    @staticmethod
+    def _atomic_write(file_path: str, write) -> None:
+        """
+        Calls `write` with a temporary path in the folder of `file_path` and
+        renames the temporary file to `file_path` once it is fully written, so
+        readers never see a partially written checkpoint.
+
+        Args:
+            file_path (str): Path to the checkpoint file.
+            write (Callable[[str], None]): Function that writes the checkpoint to the given path.
+        """
+        folder = os.path.dirname(os.path.abspath(file_path))
+        fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+        os.close(fd)
+        try:
+            write(temp_path)
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+            with open(temp_path, "r+b") as f:
+                os.fsync(f.fileno())
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _write_checksum(file_path: str) -> None:
+        checksum = CheckpointHandler.file_checksum(file_path)
+
+        def write(temp_path: str) -> None:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(checksum)
+
+        CheckpointHandler._atomic_write(f"{file_path}.sha256", write)
+
+    @staticmethod
+    def _verify_checksum(file_path: str) -> None:
+        """
+        Raises ValueError if the checkpoint does not match its checksum file.
+        Checkpoints without checksum file are not verified.
+        """
+        checksum_path = f"{file_path}.sha256"
+        if not os.path.isfile(checksum_path):
+            return
+        with open(checksum_path, "r", encoding="utf-8") as f:
+            expected_checksum = f.read().strip()
+        if CheckpointHandler.file_checksum(file_path) != expected_checksum:
+            raise ValueError(f"The checkpoint {file_path} is corrupted.")
+
     @staticmethod
     def write_to_json_file(obj, file_path: str, human_readable: bool = True) -> None:
-        with open(file_path, "w", encoding="utf-8") as f:
-            if human_readable:
-                json.dump(obj, f, indent=4)
-            else:
-                json.dump(obj, f)
+        def write(temp_path: str) -> None:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                if human_readable:
+                    json.dump(obj, f, indent=4)
+                else:
+                    json.dump(obj, f)
+
+        CheckpointHandler._atomic_write(file_path, write)
+
+    @staticmethod
+    def file_checksum(file_path: str) -> str:
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(block)
+        return sha256.hexdigest()
 
     @staticmethod
     def load_from_json_file(file_path: str):
@@ -94,11 +351,224 @@ class CheckpointHandler:
                 return json.load(f)
         return False
 
+    @staticmethod
+    def remove_checkpoint(file_path: str) -> None:
+        """
+        Removes a checkpoint and its checksum file, if they exist.
+
+        Args:
+            file_path (str): Path to the checkpoint file.
+        """
+        for path in (file_path, f"{file_path}.sha256"):
+            if os.path.isfile(path):
+                os.remove(path)
+
+    @staticmethod
+    def dataframe_extension() -> str:
+        """
+        Returns the extension of the DataFrame checkpoints: ".parquet" (columnar)
+        when pyarrow is installed and ".pkl" otherwise.
+        """
+        return ".parquet" if pa is not None else ".pkl"
+
+    @staticmethod
+    def write_dataframe(df: pd.DataFrame, file_path: str) -> None:
+        """
+        Writes a pandas.DataFrame checkpoint atomically along with its checksum.
+        The format depends on the extension: Parquet for ".parquet" (requires
+        pyarrow) and pickle for ".pkl".
+
+        Args:
+            df (pd.DataFrame): The DataFrame to save.
+            file_path (str): Path to the checkpoint file.
+        """
+        parquet = file_path.endswith(".parquet")
+        if parquet and pa is None:
+            raise ImportError("pyarrow is required to write Parquet checkpoints.")
+
+        def write(temp_path: str) -> None:
+            if parquet:
+                df.to_parquet(temp_path, index=False)
+            else:
+                df.to_pickle(temp_path, compression=None)
+
+        CheckpointHandler._atomic_write(file_path, write)
+        CheckpointHandler._write_checksum(file_path)
+
+    @staticmethod
+    def load_dataframe(file_path: str, verify: bool = True):
+        """
+        Loads a pandas.DataFrame checkpoint written by `write_dataframe`.
+
+        Args:
+            file_path (str): Path to the checkpoint file.
+            verify (bool, optional): Check the checksum before loading. Defaults to True.
+
+        Returns:
+            pd.DataFrame: The loaded DataFrame, or False if the file does not exist.
+        """
+        if not os.path.isfile(file_path):
+            return False
+        if verify:
+            CheckpointHandler._verify_checksum(file_path)
+        if file_path.endswith(".parquet"):
+            return pd.read_parquet(file_path)
+        return pd.read_pickle(file_path, compression=None)
+
+    @staticmethod
+    def write_dataframe_chunks(chunks, file_path: str) -> int:
+        """
+        Writes a Parquet checkpoint from an iterable of pandas.DataFrame chunks
+        with the same columns, one row group per chunk, so the whole DataFrame
+        is never in memory. The file is written atomically along with its
+        checksum, as in `write_dataframe`.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The chunks to save.
+            file_path (str): Path to the ".parquet" checkpoint file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        if pq is None:
+            raise ImportError("pyarrow is required to write Parquet checkpoints.")
+        rows = 0
+
+        def write(temp_path: str) -> None:
+            nonlocal rows
+            writer = None
+            try:
+                for chunk in chunks:
+                    if writer is None:
+                        table = pa.Table.from_pandas(chunk, preserve_index=False)
+                        writer = pq.ParquetWriter(temp_path, table.schema)
+                    else:
+                        table = pa.Table.from_pandas(
+                            chunk, schema=writer.schema, preserve_index=False
+                        )
+                    writer.write_table(table)
+                    rows += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        CheckpointHandler._atomic_write(file_path, write)
+        CheckpointHandler._write_checksum(file_path)
+        return rows
+
+    @staticmethod
+    def iter_dataframe_chunks(file_path: str, chunk_size: int = 50_000):
+        """
+        Reads a Parquet checkpoint in chunks of at most `chunk_size` rows.
+
+        Yields:
+            pd.DataFrame: The next chunk.
+        """
+        if pq is None:
+            raise ImportError("pyarrow is required to read Parquet checkpoints.")
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+    @staticmethod
+    def write_embeddings(embeddings: np.ndarray, file_path: str) -> None:
+        def write(temp_path: str) -> None:
+            with open(temp_path, "wb") as f:
+                np.save(f, embeddings, allow_pickle=False)
+
+        CheckpointHandler._atomic_write(file_path, write)
+        CheckpointHandler._write_checksum(file_path)
+
+    @staticmethod
+    def load_embeddings(file_path: str, verify: bool = True, mmap: bool = False):
+        """
+        Loads an embeddings matrix written by `write_embeddings` (.npy format).
+
+        Args:
+            file_path (str): Path to the checkpoint file.
+            verify (bool, optional): Check the checksum before loading. Defaults to True.
+            mmap (bool, optional): Memory-map the file instead of reading it. Defaults to False.
+
+        Returns:
+            np.ndarray: The embeddings, or False if the file does not exist.
+        """
+        if not os.path.isfile(file_path):
+            return False
+        if verify:
+            CheckpointHandler._verify_checksum(file_path)
+        return np.load(file_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+
+    @staticmethod
+    def write_keyword_groups(groups: dict[str, list[str]], file_path: str) -> None:
+        """
+        Writes keyword groups in a compact binary format (.npz): the group names
+        and the keywords are stored as NUL separated UTF-8 buffers along with the
+        number of keywords of each group.
+
+        Args:
+            groups (dict[str, list[str]]): Keyword groups with the group name as key
+            and the list of keywords as value.
+            file_path (str): Path to the checkpoint file.
+        """
+        names = "\0".join(groups.keys()).encode("utf-8")
+        keywords = "\0".join(
+            keyword for group_keywords in groups.values() for keyword in group_keywords
+        ).encode("utf-8")
+        group_sizes = np.fromiter(
+            (len(group_keywords) for group_keywords in groups.values()),
+            dtype=np.int64,
+            count=len(groups),
+        )
+
+        def write(temp_path: str) -> None:
+            with open(temp_path, "wb") as f:
+                np.savez(
+                    f,
+                    names=np.frombuffer(names, dtype=np.uint8),
+                    keywords=np.frombuffer(keywords, dtype=np.uint8),
+                    group_sizes=group_sizes,
+                )
+
+        CheckpointHandler._atomic_write(file_path, write)
+        CheckpointHandler._write_checksum(file_path)
+
+    @staticmethod
+    def load_keyword_groups(file_path: str, verify: bool = True):
+        """
+        Loads keyword groups written by `write_keyword_groups`.
+
+        Args:
+            file_path (str): Path to the checkpoint file.
+            verify (bool, optional): Check the checksum before loading. Defaults to True.
+
+        Returns:
+            dict[str, list[str]]: The keyword groups, or False if the file does not exist.
+        """
+        if not os.path.isfile(file_path):
+            return False
+        if verify:
+            CheckpointHandler._verify_checksum(file_path)
+        with np.load(file_path, allow_pickle=False) as checkpoint:
+            group_sizes = checkpoint["group_sizes"]
+            if len(group_sizes) == 0:
+                return {}
+            names = checkpoint["names"].tobytes().decode("utf-8").split("\0")
+            keywords = checkpoint["keywords"].tobytes().decode("utf-8").split("\0")
+        if group_sizes.sum() == 0:
+            keywords = []
+        bounds = np.concatenate([[0], np.cumsum(group_sizes)])
+        return {
+            name: keywords[bounds[i] : bounds[i + 1]] for i, name in enumerate(names)
+        }
+
 
 class PaperLoader:
 
     def __init__(self) -> None:
         self._transformer_model: SentenceTransformer = None
+        self._transformer_model_name: str = "all-mpnet-base-v2"
+        self._embeddings_keywords: list[str] = None
+        self._embeddings: np.ndarray = None
+        self._instrumentation: Instrumentation = Instrumentation()
         self._column_names: dict[str, str] = {
             "title": "title",
             "publication_year": "publication_year",
@@ -110,6 +580,7 @@ class PaperLoader:
             "publication_year": int,
             # "keywords": list[str],
         }
+        self._title_data_type = pd.StringDtype("pyarrow") if pa is not None else str
 
     def get_keyword_counts(
         self, df: pd.DataFrame, excluded_keywords: list[str] = None
@@ -133,6 +604,7 @@ class PaperLoader:
 
         return keyword_counts_filtered
 
+    @instrumented(counters=lambda result, *_, **__: {"keywords": len(result)})
     def get_unique_keywords(
         self, df: pd.DataFrame, excluded_keywords: list[str] = None
     ) -> list[str]:
@@ -148,17 +620,76 @@ class PaperLoader:
             if keyword not in excluded_keywords
         ]
 
+    @instrumented(counters=lambda result, *_, **__: {"keywords": len(result)})
+    def encode_keywords(self, unique_keywords: list[str]) -> np.ndarray:
+        """
+        Encodes the keywords with the sentence transformer model. The result of
+        the last call is cached, so encoding the same keyword list again (e.g.
+        when refitting the groups with another threshold) does not run the model.
+
+        Args:
+            unique_keywords (list[str]): The keywords to encode.
+
+        Returns:
+            np.ndarray: A matrix with one embedding row per keyword.
+        """
+        if self._embeddings is not None and self._embeddings_keywords == list(
+            unique_keywords
+        ):
+            self._instrumentation.cache_event("embeddings", hit=True)
+            return self._embeddings
+        self._instrumentation.cache_event("embeddings", hit=False)
+
+        if not self._transformer_model:
+            self._transformer_model = SentenceTransformer(self._transformer_model_name)
+
+        self._embeddings = self._transformer_model.encode(unique_keywords)
+        self._embeddings_keywords = list(unique_keywords)
+        return self._embeddings
+
+    @property
+    def cached_embeddings(self) -> tuple[list[str], np.ndarray]:
+        """The keywords and embeddings of the last `encode_keywords` call."""
+        return self._embeddings_keywords, self._embeddings
+
+    def set_cached_embeddings(
+        self, unique_keywords: list[str], embeddings: np.ndarray
+    ) -> None:
+        """
+        Restores the embeddings cache, e.g. from a checkpoint, so the keywords
+        are not encoded again.
+        """
+        self._embeddings_keywords = list(unique_keywords)
+        self._embeddings = embeddings
+
+    def encode_text(self, texts: list[str]) -> np.ndarray:
+        """
+        Encodes free text (such as a search query) with the same sentence
+        transformer model used for the keywords, without touching the cache.
+
+        Args:
+            texts (list[str]): The texts to encode.
+
+        Returns:
+            np.ndarray: A matrix with one embedding row per text.
+        """
+        if not self._transformer_model:
+            self._transformer_model = SentenceTransformer(self._transformer_model_name)
+        return self._transformer_model.encode(texts)
+
+    @instrumented(
+        counters=lambda result, unique_keywords, *_, **__: {
+            "keywords": len(unique_keywords),
+            "groups": len(result),
+        }
+    )
     def group_keywords_by_semantic_similarity(
         self,
         unique_keywords: list[str],
         distance_threshold: float = 1.9,
         n_clusters: int = None,
     ):
-        model_name = "all-mpnet-base-v2"
-        if not self._transformer_model:
-            self._transformer_model = SentenceTransformer(model_name)
-
-        embeddings = self._transformer_model.encode(unique_keywords)
+        embeddings = self.encode_keywords(unique_keywords)
         clustering = AgglomerativeClustering(
             n_clusters=n_clusters,
             distance_threshold=distance_threshold,
@@ -167,8 +698,11 @@ class PaperLoader:
             linkage="ward",
         )
         clustering.fit(embeddings)
-        cluster_labels = clustering.labels_
+        return self._groups_from_labels(unique_keywords, clustering.labels_)
 
+    def _groups_from_labels(
+        self, unique_keywords: list[str], cluster_labels: np.ndarray
+    ) -> dict[str, list[str]]:
         groups_key_embeddings = {}
         for i, keyword in enumerate(unique_keywords):
             cluster = cluster_labels[i]
@@ -182,10 +716,269 @@ class PaperLoader:
 
         return groups
 
-    def merge_csvs(self, csvs: list[pd.DataFrame]) -> tuple[pd.DataFrame, int]:
+    @instrumented(counters=lambda result, *_, **__: {"candidates": len(result[0])})
+    def sweep_distance_thresholds(
+        self,
+        unique_keywords: list[str],
+        distance_thresholds: list[float] = None,
+        n_clusters: list[int] = None,
+        silhouette_sample_size: int = 5000,
+        max_workers: int = None,
+        random_state: int = 0,
+    ) -> tuple[pd.DataFrame, dict]:
+        """
+        Evaluates several distance thresholds and/or numbers of clusters in one
+        pass. The Ward tree is built once and cut at every candidate, so each
+        candidate only costs a tree cut and a sampled silhouette score. The
+        candidates are evaluated in parallel.
+
+        Args:
+            unique_keywords (list[str]): The keywords to group.
+            distance_thresholds (list[float], optional): Candidate distance thresholds. Defaults to None.
+            n_clusters (list[int], optional): Candidate numbers of groups. Defaults to None.
+            silhouette_sample_size (int, optional): Number of keywords sampled to compute the silhouette score. Defaults to 5000.
+            max_workers (int, optional): Number of threads used to evaluate the candidates. Defaults to None.
+            random_state (int, optional): Seed of the silhouette sampling. Defaults to 0.
+
+        Returns:
+            tuple[pd.DataFrame, dict]: A pandas.DataFrame with one row per candidate
+            ("parameter", "value", "group_count", "min_group_size", "median_group_size",
+            "mean_group_size", "max_group_size", "singleton_groups" and "silhouette"
+            columns) and the recommended candidate as a dict with the keys
+            "parameter" and "value" (None if no candidate produces at least two groups).
+        """
+        if not distance_thresholds and not n_clusters:
+            distance_thresholds = [1.0, 1.3, 1.6, 1.9, 2.2, 2.5, 3.0]
+
+        candidates = [
+            ("distance_threshold", float(t)) for t in distance_thresholds or []
+        ]
+        candidates += [("n_clusters", int(n)) for n in n_clusters or []]
+
+        embeddings = self.encode_keywords(unique_keywords)
+        tree = linkage(embeddings, method="ward", metric="euclidean")
+
+        def evaluate(candidate: tuple[str, float]) -> dict:
+            parameter, value = candidate
+            if parameter == "distance_threshold":
+                labels = fcluster(tree, t=value, criterion="distance")
+            else:
+                labels = fcluster(tree, t=value, criterion="maxclust")
+            sizes = np.bincount(labels)[1:]
+            sizes = sizes[sizes > 0]
+            group_count = len(sizes)
+
+            silhouette = np.nan
+            if 1 < group_count < len(unique_keywords):
+                silhouette = silhouette_score(
+                    embeddings,
+                    labels,
+                    metric="euclidean",
+                    sample_size=min(silhouette_sample_size, len(unique_keywords)),
+                    random_state=random_state,
+                )
+
+            return {
+                "parameter": parameter,
+                "value": value,
+                "group_count": group_count,
+                "min_group_size": int(sizes.min()),
+                "median_group_size": float(np.median(sizes)),
+                "mean_group_size": float(sizes.mean()),
+                "max_group_size": int(sizes.max()),
+                "singleton_groups": int((sizes == 1).sum()),
+                "silhouette": float(silhouette),
+            }
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(evaluate, candidates))
+
+        df = pd.DataFrame(
+            results,
+            columns=[
+                "parameter",
+                "value",
+                "group_count",
+                "min_group_size",
+                "median_group_size",
+                "mean_group_size",
+                "max_group_size",
+                "singleton_groups",
+                "silhouette",
+            ],
+        )
+
+        recommended = None
+        scored = df.dropna(subset=["silhouette"])
+        if not scored.empty:
+            best = scored.loc[scored["silhouette"].idxmax()]
+            value = best["value"]
+            if best["parameter"] == "n_clusters":
+                value = int(value)
+            else:
+                value = float(value)
+            recommended = {"parameter": best["parameter"], "value": value}
+
+        return df, recommended
+
+    @instrumented(counters=lambda result, *_, **__: {"levels": len(result)})
+    def build_group_hierarchy(
+        self,
+        unique_keywords: list[str],
+        keyword_groups: dict[str, list[str]],
+        level_sizes: list[int],
+    ) -> list[dict[str, str]]:
+        """
+        Builds the upper levels of the keyword groups. The groups are the leaves
+        of a Ward tree over the mean embedding of their keywords, so curated
+        groups (merged or renamed) are kept as they are, and the tree is cut
+        once per level. Cuts of the same Ward tree are nested, so every group
+        of a level has exactly one parent in the next one. The parent groups are
+        named after their largest keyword group and their level, as in
+        "machine learning [level 1]".
+
+        Args:
+            unique_keywords (list[str]): The keywords of the embeddings cache.
+            keyword_groups (dict[str, list[str]]): The keyword groups (level 0).
+            level_sizes (list[int]): Maximum number of groups of each upper level, from the
+            lowest to the highest one. Sizes that do not reduce the previous level are skipped.
+
+        Returns:
+            list[dict[str, str]]: One dict per upper level, mapping the name of every
+            group of the level below to the name of its parent group.
+        """
+        group_names = list(keyword_groups)
+        if len(group_names) < 2:
+            return []
+
+        embeddings = self.encode_keywords(unique_keywords)
+        keyword_rows = {keyword: row for row, keyword in enumerate(unique_keywords)}
+        missing_keywords = [
+            keyword
+            for keywords in keyword_groups.values()
+            for keyword in keywords
+            if keyword not in keyword_rows
+        ]
+        if missing_keywords:
+            missing_keywords = list(dict.fromkeys(missing_keywords))
+            keyword_rows.update(
+                {
+                    keyword: row
+                    for row, keyword in enumerate(
+                        missing_keywords, start=len(embeddings)
+                    )
+                }
+            )
+            embeddings = np.vstack([embeddings, self.encode_text(missing_keywords)])
+
+        group_sizes = np.array([len(keyword_groups[name]) for name in group_names])
+        codes = np.repeat(np.arange(len(group_names)), group_sizes)
+        rows = [
+            keyword_rows[keyword]
+            for name in group_names
+            for keyword in keyword_groups[name]
+        ]
+        centroids = np.zeros((len(group_names), embeddings.shape[1]))
+        np.add.at(centroids, codes, embeddings[rows])
+        centroids /= np.maximum(group_sizes, 1)[:, None]
+        tree = linkage(centroids, method="ward", metric="euclidean")
+
+        levels = []
+        # Name of the group of every leaf at the current level
+        leaf_groups = np.array(group_names, dtype=object)
+        for level_size in sorted(level_sizes, reverse=True):
+            if level_size < 1 or level_size >= len(set(leaf_groups)):
+                continue
+            labels = fcluster(tree, t=level_size, criterion="maxclust")
+            # The parent is named after its largest leaf
+            order = np.lexsort((np.arange(len(group_names)), -group_sizes))
+            representatives = {}
+            for leaf in order:
+                representatives.setdefault(labels[leaf], group_names[leaf])
+            parent_groups = np.array(
+                [
+                    f"{representatives[label]} [level {len(levels) + 1}]"
+                    for label in labels
+                ],
+                dtype=object,
+            )
+            levels.append(dict(zip(leaf_groups, parent_groups)))
+            leaf_groups = parent_groups
+        return levels
+
+    @instrumented(
+        counters=lambda result, *_, **__: {
+            "rows": len(result[0]),
+            "duplicates": result[1],
+        }
+    )
+    def merge_csvs(
+        self, csvs: list[pd.DataFrame], title_index: TitleIndex = None
+    ) -> tuple[pd.DataFrame, int]:
+        """
+        Concatenates the imported CSVs and removes the duplicated papers.
+
+        Args:
+            csvs (list[pd.DataFrame]): The imported CSVs.
+            title_index (TitleIndex, optional): Index of the papers already in the corpus.
+            If given, only the papers that are not in the index are returned, and
+            the index is updated with them. Defaults to None.
+
+        Returns:
+            tuple[pd.DataFrame, int]: The merged papers and the number of duplicates
+            (duplicated titles, or dropped papers if `title_index` is given).
+        """
         concatenated_df = pd.concat(csvs)
+        if title_index is not None:
+            return title_index.add(concatenated_df)
         return self.remove_duplicates(df=concatenated_df)
 
+    def stream_csvs(
+        self,
+        folder_path: str,
+        excluded_keywords_at_csv_import: list[str],
+        excluded_starting_by_keywords_at_csv_import: list[str],
+        import_columns_names: dict[str, str],
+        chunk_size: int = 50_000,
+        keyword_separator: str = ";",
+        separator: str = ",",
+        header: int = 0,
+        title_index: TitleIndex = None,
+        engine: str = "c",
+    ) -> PaperStream:
+        """
+        Streaming alternative to `import_csvs` + `merge_csvs` for corpora that do
+        not fit in memory: the CSV, BibTeX and RIS files are read in chunks of
+        `chunk_size` rows that are normalized and deduplicated one at a time.
+
+        Args:
+            folder_path (str): The folder that contains the CSV files.
+            chunk_size (int, optional): Number of rows read at once. Defaults to 50_000.
+            title_index (TitleIndex, optional): Index of the titles already imported,
+            updated in place. Defaults to None (empty).
+            engine (str, optional): The CSV parser, see `read_csv`. Defaults to "c".
+
+        Returns:
+            PaperStream: An iterable of deduplicated chunks, which also counts the rows,
+            the duplicates and the keywords.
+        """
+        return PaperStream(
+            paper_loader=self,
+            file_paths=[
+                f"{folder_path}/{file_path}"
+                for file_path in self.list_import_files(folder_path)
+            ],
+            excluded_keywords_at_csv_import=excluded_keywords_at_csv_import,
+            excluded_starting_by_keywords_at_csv_import=excluded_starting_by_keywords_at_csv_import,
+            import_columns_names=import_columns_names,
+            chunk_size=chunk_size,
+            keyword_separator=keyword_separator,
+            separator=separator,
+            header=header,
+            title_index=title_index,
+            engine=engine,
+        )
+
     def import_csvs(
         self,
         folder_path: str,
@@ -195,10 +988,21 @@ class PaperLoader:
         keyword_separator: str = ";",
         separator: str = ",",
         header: int = 0,
+        engine: str = "c",
     ) -> list[pd.DataFrame]:
         csvs = []
-        for file_path in os.listdir(folder_path):
-            if file_path.endswith(".csv"):
+        for file_path in self.list_import_files(folder_path):
+            if is_bibliography_file(file_path):
+                csvs.append(
+                    self.import_bibliography(
+                        file_path=f"{folder_path}/{file_path}",
+                        excluded_keywords_at_csv_import=excluded_keywords_at_csv_import,
+                        excluded_starting_by_keywords_at_csv_import=excluded_starting_by_keywords_at_csv_import,
+                        import_columns_names=import_columns_names,
+                        keyword_separator=keyword_separator,
+                    )
+                )
+            else:
                 csvs.append(
                     self.import_csv(
                         file_path=f"{folder_path}/{file_path}",
@@ -208,10 +1012,74 @@ class PaperLoader:
                         keyword_separator=keyword_separator,
                         separator=separator,
                         header=header,
+                        engine=engine,
                     )
                 )
         return csvs
 
+    @staticmethod
+    def list_import_files(folder_path: str) -> list[str]:
+        """
+        The names of the CSV (also compressed, see CSV_EXTENSIONS), BibTeX (.bib)
+        and RIS (.ris) files of a folder, sorted.
+        """
+        return [
+            file_path
+            for file_path in sorted(os.listdir(folder_path))
+            if file_path.lower().endswith(CSV_EXTENSIONS)
+            or is_bibliography_file(file_path)
+        ]
+
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    def import_bibliography(
+        self,
+        file_path: str,
+        excluded_keywords_at_csv_import: list[str],
+        excluded_starting_by_keywords_at_csv_import: list[str],
+        import_columns_names: dict[str, str],
+        keyword_separator: str = ";",
+        chunk_size: int = 50_000,
+    ) -> pd.DataFrame:
+        """
+        Imports a BibTeX or RIS file like a CSV export: its records are parsed
+        one at a time and normalized `chunk_size` at a time.
+
+        Args:
+            file_path (str): The .bib or .ris file.
+            import_columns_names (dict[str, str]): Names of the "title", "publication_year"
+            and "keywords" columns, as in the CSV exports.
+            chunk_size (int, optional): Number of records normalized at once. Defaults to 50_000.
+
+        Returns:
+            pd.DataFrame: The papers, with "title", "publication_year", "keywords" and "title_hash" columns.
+        """
+        chunks = [
+            self.normalize_csv(
+                chunk,
+                excluded_keywords_at_csv_import=excluded_keywords_at_csv_import,
+                excluded_starting_by_keywords_at_csv_import=excluded_starting_by_keywords_at_csv_import,
+                import_columns_names=import_columns_names,
+                keyword_separator=keyword_separator,
+            )
+            for chunk in records_to_frames(
+                iter_bibliography_records(file_path),
+                import_columns_names,
+                chunk_size=chunk_size,
+                keyword_separator=keyword_separator,
+            )
+        ]
+        if not chunks:
+            empty = pd.DataFrame(
+                {
+                    self._column_names["title"]: pd.Series(dtype=str),
+                    self._column_names["publication_year"]: pd.Series(dtype=int),
+                    self._column_names["keywords"]: pd.Series(dtype=object),
+                }
+            )
+            return self.compact_titles(empty)
+        return pd.concat(chunks, ignore_index=True)
+
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
     def import_csv(
         self,
         file_path: str,
@@ -221,22 +1089,205 @@ class PaperLoader:
         keyword_separator: str = ";",
         separator: str = ",",
         header: int = 0,
+        engine: str = "c",
     ) -> pd.DataFrame:
-        csv: pd.DataFrame = pd.read_csv(
+        csv: pd.DataFrame = self.read_csv(
             file_path,
-            sep=separator,
+            import_columns_names=import_columns_names,
+            separator=separator,
             header=header,
-            usecols=list(import_columns_names.values()),
+            engine=engine,
         )
+        return self.normalize_csv(
+            csv,
+            excluded_keywords_at_csv_import=excluded_keywords_at_csv_import,
+            excluded_starting_by_keywords_at_csv_import=excluded_starting_by_keywords_at_csv_import,
+            import_columns_names=import_columns_names,
+            keyword_separator=keyword_separator,
+        )
+
+    @staticmethod
+    def available_csv_engines() -> list[str]:
+        """The CSV engines that can be used, "pyarrow" requires the pyarrow package."""
+        return [
+            engine
+            for engine in CSV_ENGINES
+            if engine != "pyarrow" or pa_csv is not None
+        ]
 
-        csv[self._column_names["keywords"]] = csv.apply(
-            lambda row: self.create_keywords(
-                keyword_list=str(row[import_columns_names["keywords"]]),
+    def _csv_dtypes(self, import_columns_names: dict[str, str]) -> dict:
+        return {
+            import_columns_names["title"]: str,
+            import_columns_names["publication_year"]: "int64",
+            import_columns_names["keywords"]: str,
+        }
+
+    @staticmethod
+    def _open_csv(file_path: str):
+        """
+        Opens a CSV file, decompressing it on the fly when its extension is
+        .gz, .zst or .bz2. Without pyarrow, pandas infers the compression.
+        """
+        if pa is not None:
+            return pa.input_stream(file_path, compression="detect")
+        return open(file_path, "rb")
+
+    def _arrow_csv_options(
+        self,
+        import_columns_names: dict[str, str],
+        separator: str,
+        header: int,
+        block_megabytes: float,
+    ) -> dict:
+        if pa_csv is None:
+            raise ValueError("The pyarrow CSV engine requires the pyarrow package.")
+        return {
+            "read_options": pa_csv.ReadOptions(
+                use_threads=True,
+                skip_rows=header,
+                block_size=int(block_megabytes * 2**20),
+            ),
+            "parse_options": pa_csv.ParseOptions(delimiter=separator),
+            "convert_options": pa_csv.ConvertOptions(
+                include_columns=list(import_columns_names.values()),
+                column_types={
+                    import_columns_names["title"]: pa.string(),
+                    import_columns_names["publication_year"]: pa.int64(),
+                    import_columns_names["keywords"]: pa.string(),
+                },
+                # Empty cells are missing values, as the pandas parsers read them
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=True,
+            ),
+        }
+
+    def _arrow_to_pandas(self, table, import_columns_names: dict[str, str]):
+        df = table.to_pandas()
+        # Missing values as NaN, as the pandas parsers read them
+        for column in (import_columns_names["title"], import_columns_names["keywords"]):
+            df[column] = df[column].astype(object).where(df[column].notna(), np.nan)
+        return df
+
+    def read_csv(
+        self,
+        file_path: str,
+        import_columns_names: dict[str, str],
+        separator: str = ",",
+        header: int = 0,
+        engine: str = "c",
+        block_megabytes: float = 16,
+    ) -> pd.DataFrame:
+        """
+        Reads the imported columns of a CSV file with explicit dtypes. The file
+        may be compressed (.csv.gz, .csv.zst, .csv.bz2), it is decompressed as
+        a stream without writing it to disk.
+
+        Args:
+            file_path (str): The CSV file.
+            import_columns_names (dict[str, str]): Names of the "title", "publication_year"
+            and "keywords" columns in the CSV file.
+            separator (str, optional): The CSV separator. Defaults to ",".
+            header (int, optional): The row of the CSV header. Defaults to 0.
+            engine (str, optional): "c" or "python" for the pandas parsers, or "pyarrow"
+            for the multi-threaded columnar reader of pyarrow. Defaults to "c".
+            block_megabytes (float, optional): Size of the blocks parsed in parallel by
+            the pyarrow engine. Defaults to 16.
+
+        Returns:
+            pd.DataFrame: The imported columns.
+        """
+        if engine not in CSV_ENGINES:
+            raise ValueError(f"Unknown CSV engine: {engine}")
+        with self._open_csv(file_path) as file:
+            if engine == "pyarrow":
+                table = pa_csv.read_csv(
+                    file,
+                    **self._arrow_csv_options(
+                        import_columns_names, separator, header, block_megabytes
+                    ),
+                )
+                return self._arrow_to_pandas(table, import_columns_names)
+            return pd.read_csv(
+                file if pa is not None else file_path,
+                sep=separator,
+                header=header,
+                usecols=list(import_columns_names.values()),
+                dtype=self._csv_dtypes(import_columns_names),
+                engine=engine,
+            )
+
+    def iter_csv_chunks(
+        self,
+        file_path: str,
+        import_columns_names: dict[str, str],
+        chunk_size: int = 50_000,
+        separator: str = ",",
+        header: int = 0,
+        engine: str = "c",
+        block_megabytes: float = 16,
+    ):
+        """
+        Reads a CSV file as `read_csv`, `chunk_size` rows at a time. With the
+        pyarrow engine the chunks are grouped from the parsed blocks, so they
+        may be slightly larger than `chunk_size`.
+
+        Yields:
+            pd.DataFrame: The imported columns of the next rows.
+        """
+        if engine not in CSV_ENGINES:
+            raise ValueError(f"Unknown CSV engine: {engine}")
+        with self._open_csv(file_path) as file:
+            if engine == "pyarrow":
+                reader = pa_csv.open_csv(
+                    file,
+                    **self._arrow_csv_options(
+                        import_columns_names, separator, header, block_megabytes
+                    ),
+                )
+                batches, rows = [], 0
+                for batch in reader:
+                    batches.append(batch)
+                    rows += batch.num_rows
+                    if rows >= chunk_size:
+                        yield self._arrow_to_pandas(
+                            pa.Table.from_batches(batches), import_columns_names
+                        )
+                        batches, rows = [], 0
+                if rows:
+                    yield self._arrow_to_pandas(
+                        pa.Table.from_batches(batches), import_columns_names
+                    )
+                return
+            yield from pd.read_csv(
+                file if pa is not None else file_path,
+                sep=separator,
+                header=header,
+                usecols=list(import_columns_names.values()),
+                dtype=self._csv_dtypes(import_columns_names),
+                engine=engine,
+                chunksize=chunk_size,
+            )
+
+    def normalize_csv(
+        self,
+        csv: pd.DataFrame,
+        excluded_keywords_at_csv_import: list[str],
+        excluded_starting_by_keywords_at_csv_import: list[str],
+        import_columns_names: dict[str, str],
+        keyword_separator: str = ";",
+    ) -> pd.DataFrame:
+        """
+        Turns the raw columns of a CSV export (or of a chunk of it) into the
+        "title", "publication_year" and "keywords" columns, with the keywords
+        parsed into lists.
+        """
+        csv[self._column_names["keywords"]] = csv[import_columns_names["keywords"]].map(
+            lambda keyword_list: self.create_keywords(
+                keyword_list=str(keyword_list),
                 keyword_separator=keyword_separator,
                 excluded_keywords_at_csv_import=excluded_keywords_at_csv_import,
                 excluded_starting_by_keywords_at_csv_import=excluded_starting_by_keywords_at_csv_import,
-            ),
-            axis=1,
+            )
         )
         csv = csv.drop(columns=[import_columns_names["keywords"]])
 
@@ -246,7 +1297,29 @@ class PaperLoader:
         csv.rename(columns=inverted_import_columns_names, inplace=True)
 
         csv = csv.astype(self._column_data_types)
-        return csv
+        return self.compact_titles(csv)
+
+    def compact_titles(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds the "title_hash" column, a fixed-width key of the normalized title
+        (see `hash_title`) used to deduplicate, upsert and join the papers
+        instead of the titles themselves. The titles are stored as Arrow strings
+        when pyarrow is installed, which take a fraction of the memory of one
+        Python object per title. Papers saved before the column existed get it
+        here, and may then need `remove_duplicates`.
+
+        Args:
+            df (pd.DataFrame): The papers, with a "title" column.
+
+        Returns:
+            pd.DataFrame: The papers with the "title_hash" column.
+        """
+        title = self._column_names["title"]
+        if "title_hash" not in df.columns:
+            df = df.assign(title_hash=hash_titles(df[title]))
+        if pa is not None and df[title].dtype != self._title_data_type:
+            df = df.astype({title: self._title_data_type})
+        return df
 
     def create_keywords(
         self,
@@ -305,9 +1378,12 @@ class PaperLoader:
 
     def remove_duplicates(self, df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
         # total_num_records = len(df)
-        title_counts = df[self._column_names["title"]].value_counts()
+        key = (
+            "title_hash" if "title_hash" in df.columns else self._column_names["title"]
+        )
+        title_counts = df[key].value_counts()
         duplicated_num_records = len(title_counts[title_counts > 1])
-        df_unique = df.drop_duplicates(subset=self._column_names["title"])
+        df_unique = df.drop_duplicates(subset=key)
         # total_num_records_after_drop = len(df_unique)
         # expected_unique_papers = total_num_records - duplicated_num_records
 
@@ -321,3 +1397,202 @@ class PaperLoader:
         #     print(f"The initial record count is {total_num_papers}, with {duplicated_num_papers} duplicate entries identified and removed. The new DataFrame record count is {total_num_papers_after_drop}.")
 
         return df_unique, duplicated_num_records
+
+    @instrumented(
+        counters=lambda result, df, *_, **__: {"rows": len(df), "sample": len(result)}
+    )
+    def stratified_sample(
+        self,
+        df: pd.DataFrame,
+        fraction: float,
+        seed: int = 0,
+        column: str = "publication_year",
+    ) -> pd.DataFrame:
+        """
+        Draws a reproducible sample of the papers stratified by year: every
+        year keeps `fraction` of its papers (at least one), so the sample has
+        the same year distribution as the corpus. The papers of a year are
+        ordered by a seeded hash of their title, so a paper is in the sample
+        or not regardless of the rest of the corpus, and importing more papers
+        keeps the previous sample mostly the same.
+
+        Args:
+            df (pd.DataFrame): The papers, with "title" (or "title_hash") and `column` columns.
+            fraction (float): Fraction of the papers of every year, in (0, 1].
+            seed (int, optional): Seed of the title hash. Defaults to 0.
+            column (str, optional): The column of the strata. Defaults to "publication_year".
+
+        Returns:
+            pd.DataFrame: The sampled papers, in the order of `df`.
+        """
+        if not 0 < fraction <= 1:
+            raise ValueError("The sample fraction must be in (0, 1].")
+        if fraction == 1 or df.empty:
+            return df
+
+        title_hashes = (
+            df["title_hash"] if "title_hash" in df.columns else hash_titles(df["title"])
+        )
+        strata = pd.DataFrame(
+            {
+                "stratum": df[column].to_numpy(),
+                "key": pd.util.hash_array(
+                    title_hashes.to_numpy(dtype=np.int64) ^ np.int64(seed)
+                ),
+            }
+        ).sort_values(["stratum", "key"], kind="stable")
+        rank = strata.groupby("stratum").cumcount()
+        size = strata.groupby("stratum")["key"].transform("size")
+        sampled = rank < np.maximum(1, np.round(size * fraction))
+        return df.iloc[np.sort(strata.index[sampled].to_numpy())]
+
+    @instrumented(
+        counters=lambda result, *_, **__: {
+            "rows": len(result[0]),
+            "duplicates": result[1],
+        }
+    )
+    def remove_near_duplicates(
+        self,
+        df: pd.DataFrame,
+        similarity_threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 4,
+    ) -> tuple[pd.DataFrame, int]:
+        """
+        Removes the papers whose title is a near duplicate of a previous one,
+        such as the same paper exported from two databases with different casing,
+        punctuation or accents. The titles are normalized with the keyword
+        normalization rules and compared with MinHash signatures and LSH (see
+        NearDuplicateDetector). The kept paper gets the union of the keywords of
+        its duplicates.
+
+        Args:
+            df (pd.DataFrame): The papers, with "title" and "keywords" columns.
+            similarity_threshold (float, optional): Minimum Jaccard similarity of the title shingles. Defaults to 0.8.
+            num_perm (int, optional): Number of hash functions of the signatures. Defaults to 64.
+            bands (int, optional): Number of LSH bands. Defaults to 16.
+            shingle_size (int, optional): Number of characters of a shingle. Defaults to 4.
+
+        Returns:
+            tuple[pd.DataFrame, int]: The papers without near duplicates and the number
+            of papers removed.
+        """
+        detector = NearDuplicateDetector(
+            normalize=self.parse_keyword,
+            similarity_threshold=similarity_threshold,
+            num_perm=num_perm,
+            bands=bands,
+            shingle_size=shingle_size,
+        )
+        firsts = detector.find(df[self._column_names["title"]].tolist())
+        duplicated = firsts != np.arange(len(df))
+        if not duplicated.any():
+            return df, 0
+
+        keywords = df[self._column_names["keywords"]].tolist()
+        # Dicts keep the keywords in order of first appearance, unlike sets
+        merged_keywords: dict[int, dict[str, None]] = {}
+        for i in np.flatnonzero(duplicated):
+            first = firsts[i]
+            if first not in merged_keywords:
+                merged_keywords[first] = dict.fromkeys(keywords[first])
+            merged_keywords[first].update(dict.fromkeys(keywords[i]))
+        for first, merged in merged_keywords.items():
+            keywords[first] = list(merged)
+
+        df = df.copy()
+        df[self._column_names["keywords"]] = keywords
+        return df[~duplicated], int(duplicated.sum())
+
+    def near_duplicate_index(
+        self,
+        similarity_threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 4,
+    ) -> NearDuplicateIndex:
+        """
+        Returns an empty NearDuplicateIndex that compares the titles as
+        `remove_near_duplicates`, to pass to `append_without_near_duplicates`.
+        """
+        return NearDuplicateIndex(
+            NearDuplicateDetector(
+                normalize=self.parse_keyword,
+                similarity_threshold=similarity_threshold,
+                num_perm=num_perm,
+                bands=bands,
+                shingle_size=shingle_size,
+            )
+        )
+
+    @instrumented(
+        counters=lambda result, *_, **__: {
+            "rows": len(result[0]),
+            "duplicates": result[1],
+        }
+    )
+    def append_without_near_duplicates(
+        self,
+        df: pd.DataFrame,
+        new_papers: pd.DataFrame,
+        index: NearDuplicateIndex,
+        title_index: TitleIndex = None,
+    ) -> tuple[pd.DataFrame, int]:
+        """
+        Appends the new papers to `df`, except the near duplicates of a paper of
+        `df` or of a previous new paper, whose keywords are merged into that
+        paper as in `remove_near_duplicates`. Only the titles of the new papers
+        are hashed, `index` holds those of `df` and is updated.
+
+        Args:
+            df (pd.DataFrame): The papers already in `index`, or None.
+            new_papers (pd.DataFrame): The papers to append, with "title" and "keywords" columns.
+            index (NearDuplicateIndex): Index of the titles of `df`.
+            title_index (TitleIndex, optional): Index whose keyword counts are updated
+            with the merged keywords. Defaults to None.
+
+        Returns:
+            tuple[pd.DataFrame, int]: The papers and the number of new papers removed.
+        """
+        keywords_column = self._column_names["keywords"]
+        start = len(index)
+        firsts = index.add(new_papers[self._column_names["title"]].tolist())
+        duplicated = firsts >= 0
+        keywords = new_papers[keywords_column].tolist()
+        kept_keywords = [keywords[i] for i in np.flatnonzero(~duplicated)]
+
+        # Dicts keep the keywords in order of first appearance, unlike sets
+        merged_keywords: dict[int, dict[str, None]] = {}
+        for i in np.flatnonzero(duplicated):
+            first = int(firsts[i])
+            if first not in merged_keywords:
+                merged_keywords[first] = dict.fromkeys(
+                    kept_keywords[first - start]
+                    if first >= start
+                    else df[keywords_column].iat[first]
+                )
+            merged = merged_keywords[first]
+            if title_index is not None:
+                title_index.update_keyword_counts(
+                    added=[keyword for keyword in keywords[i] if keyword not in merged],
+                    removed=keywords[i],
+                )
+            merged.update(dict.fromkeys(keywords[i]))
+
+        if duplicated.any():
+            for first, merged in merged_keywords.items():
+                if first >= start:
+                    kept_keywords[first - start] = list(merged)
+            new_papers = new_papers[~duplicated].copy()
+            new_papers[keywords_column] = kept_keywords
+        if df is not None and not df.empty:
+            df = pd.concat([df, new_papers])
+        else:
+            df = new_papers
+        column = df.columns.get_loc(keywords_column)
+        for first, merged in merged_keywords.items():
+            if first < start:
+                df.iat[first, column] = list(merged)
+        return df, int(duplicated.sum())
@@ -2,11 +2,222 @@ import sqlite3
 import os
 import pandas as pd
 
+from .connection_pool import ConnectionPool
+from .instrumentation import Instrumentation, instrumented
+from .query_cache import QueryCache, cached_query
+from .query_tracer import QueryTracer
+from .title_index import hash_titles
+
+
+def title_match_query(text: str) -> str:
+    """
+    Turns the terms of a title filter into an FTS5 query: every
+    whitespace-separated term must appear in the title (case and accents are
+    ignored) and a term ending with "*" matches the words that start with it.
+    The terms are quoted, so characters such as "-" or ":" are not operators.
+
+    Args:
+        text (str): The terms, as in "health* covid-19".
+
+    Returns:
+        str: The FTS5 query, as in '"health"* "covid-19"'.
+    """
+    terms = []
+    for term in text.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*")
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if not terms:
+        raise ValueError("The title filter has no terms.")
+    return " ".join(terms)
+
+
+class _SharedConnection(sqlite3.Connection):
+    """
+    Connection to the in-memory copy of the database. It is shared by all the
+    DBHandler methods, so closing it is a no-op until `release` is called.
+    """
+
+    def close(self) -> None:
+        pass
+
+    def release(self) -> None:
+        super().close()
+
 
 class DBHandler:
 
     def __init__(self, db_name: str = "Review.db") -> None:
         self._db_name: str = db_name
+        self._memory_conn: _SharedConnection = None
+        self._memory_dirty: bool = False
+        self._connection_pool: ConnectionPool = None
+        self._instrumentation: Instrumentation = Instrumentation()
+        self._tracer: QueryTracer = QueryTracer()
+        self._query_cache: QueryCache = QueryCache()
+        self._generation: int = 0
+
+    @property
+    def tracer(self) -> QueryTracer:
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer: QueryTracer):
+        self._tracer = tracer
+
+    @property
+    def query_cache(self) -> QueryCache:
+        return self._query_cache
+
+    @query_cache.setter
+    def query_cache(self, query_cache: QueryCache):
+        self._query_cache = query_cache
+
+    @property
+    def generation(self) -> int:
+        """Number of writes made to the database through this handler."""
+        return self._generation
+
+    def _bump_generation(self) -> None:
+        self._generation += 1
+        self._query_cache.clear()
+        if self._memory_conn is not None:
+            self._memory_dirty = True
+
+    def database_version(self) -> tuple:
+        """
+        Returns the version of the database used in the query cache keys: the
+        generation counter plus the modification time and size of the file,
+        so writes made by other processes also invalidate the cached results.
+        """
+        try:
+            stat = os.stat(self._db_name)
+            return self._generation, stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return self._generation, None, None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._memory_conn is not None:
+            return self._memory_conn
+        if self._connection_pool is not None:
+            return self._connection_pool.acquire()
+        return sqlite3.connect(self._db_name)
+
+    def use_connection_pool(self, size: int = 8) -> ConnectionPool:
+        """
+        Makes the handler read-only: every query borrows a connection from a
+        pool of read-only connections, so several threads can query at once.
+        Writes fail with sqlite3.OperationalError.
+
+        Args:
+            size (int, optional): Maximum number of open connections. Defaults to 8.
+
+        Returns:
+            ConnectionPool: The pool.
+        """
+        if self._connection_pool is not None:
+            self._connection_pool.close()
+        self._connection_pool = ConnectionPool(self._db_name, size=size)
+        return self._connection_pool
+
+    @property
+    def connection_pool(self) -> ConnectionPool:
+        return self._connection_pool
+
+    @property
+    def in_memory(self) -> bool:
+        """Whether the queries run against an in-memory copy of the database."""
+        return self._memory_conn is not None
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        """Whether the in-memory copy has writes that are not on disk."""
+        return self._memory_dirty
+
+    def load_into_memory(self, max_megabytes: float = None) -> bool:
+        """
+        Copies the database file into an in-memory SQLite database with the
+        backup API. From then on every query and write of this handler runs
+        against the copy, until `close_memory_database` is called. Writes only
+        reach the file through `save_to_disk`.
+
+        Args:
+            max_megabytes (float, optional): Memory ceiling. Databases bigger than
+            this are kept on disk. Defaults to None (no ceiling).
+
+        Returns:
+            bool: True if the database is now in memory, False if it stays on disk.
+        """
+        if self._memory_conn is not None:
+            return True
+        if not self.is_database_created():
+            return False
+        if (
+            max_megabytes is not None
+            and os.path.getsize(self._db_name) > max_megabytes * 1024 * 1024
+        ):
+            return False
+
+        disk_conn = sqlite3.connect(self._db_name)
+        memory_conn = sqlite3.connect(
+            ":memory:", factory=_SharedConnection, check_same_thread=False
+        )
+        try:
+            disk_conn.backup(memory_conn)
+        except sqlite3.Error:
+            memory_conn.release()
+            raise
+        finally:
+            disk_conn.close()
+        self._memory_conn = memory_conn
+        self._memory_dirty = False
+        return True
+
+    def save_to_disk(self) -> bool:
+        """
+        Writes the in-memory copy back to the database file with the backup API.
+
+        Returns:
+            bool: True if the copy was written, False if the database is not in memory.
+        """
+        if self._memory_conn is None:
+            return False
+        self._memory_conn.commit()
+        disk_conn = sqlite3.connect(self._db_name)
+        try:
+            self._memory_conn.backup(disk_conn)
+        finally:
+            disk_conn.close()
+        self._memory_dirty = False
+        return True
+
+    def close_memory_database(self, save: bool = False) -> None:
+        """
+        Leaves the in-memory mode, optionally writing the copy back to disk
+        first. Unsaved writes are discarded otherwise.
+        """
+        if self._memory_conn is None:
+            return
+        if save and self._memory_dirty:
+            self.save_to_disk()
+        self._memory_conn.release()
+        self._memory_conn = None
+        self._memory_dirty = False
+
+    def _execute(
+        self, cursor: sqlite3.Cursor, sql: str, params: tuple = ()
+    ) -> sqlite3.Cursor:
+        return self._tracer.trace(
+            cursor.connection, sql, params, lambda: cursor.execute(sql, params)
+        )
+
+    def _read_sql(
+        self, conn: sqlite3.Connection, sql: str, params: tuple = ()
+    ) -> pd.DataFrame:
+        return self._tracer.trace(
+            conn, sql, params, lambda: pd.read_sql_query(sql, conn, params=params)
+        )
 
     def limit_query(self, query: str, limit: int = None) -> str:
         if limit is not None and limit > 0:
@@ -18,8 +229,9 @@ class DBHandler:
         return query
 
     def get_unique_years(self, cursor: sqlite3.Cursor) -> list[int]:
-        cursor.execute(
-            "SELECT DISTINCT publication_year FROM Paper ORDER BY publication_year ASC"
+        self._execute(
+            cursor,
+            "SELECT DISTINCT publication_year FROM Paper ORDER BY publication_year ASC",
         )
         years = [int(row[0]) for row in cursor.fetchall()]
         return years
@@ -28,87 +240,280 @@ class DBHandler:
         return os.path.isfile(self._db_name)
 
     def delete_database(self) -> bool:
+        self.close_memory_database()
         if self.is_database_created():
             os.remove(self._db_name)
+            self._bump_generation()
             return True
         return False
 
     def create_database(self) -> None:
-        conn = sqlite3.connect(self._db_name)
+        conn = self._connect()
         cursor = conn.cursor()
 
         # Create Paper table
-        cursor.execute(
+        self._execute(
+            cursor,
             """CREATE TABLE Paper (
                             paper_id INTEGER PRIMARY KEY,
                             title TEXT NOT NULL,
-                            publication_year INTEGER
-                        )"""
+                            publication_year INTEGER,
+                            title_hash INTEGER
+                        )""",
+        )
+        # The title hash is the key used to deduplicate and join the papers
+        self._execute(
+            cursor, "CREATE UNIQUE INDEX Paper_title_hash ON Paper (title_hash)"
         )
 
         # Create KeywordGroup table
-        cursor.execute(
+        self._execute(
+            cursor,
             """CREATE TABLE KeywordGroup (
                         group_id INTEGER PRIMARY KEY,
                         name TEXT NOT NULL,
                         parent_group_id INTEGER,
+                        level INTEGER NOT NULL DEFAULT 0,
                         FOREIGN KEY (parent_group_id) REFERENCES KeywordGroup(group_id)
-                    )"""
+                    )""",
         )
 
         # Create Keyword table
-        cursor.execute(
+        self._execute(
+            cursor,
             """CREATE TABLE Keyword (
                             keyword_id INTEGER PRIMARY KEY,
                             name TEXT NOT NULL,
                             group_id INTEGER,
                             FOREIGN KEY (group_id) REFERENCES KeywordGroup(group_id)
-                        )"""
+                        )""",
         )
 
         # Create Paper_Keyword table
-        cursor.execute(
+        self._execute(
+            cursor,
             """CREATE TABLE Paper_Keyword (
                             paper_id INTEGER,
                             keyword_id INTEGER,
                             PRIMARY KEY (paper_id, keyword_id),
                             FOREIGN KEY (paper_id) REFERENCES Paper(paper_id),
                             FOREIGN KEY (keyword_id) REFERENCES Keyword(keyword_id)
-                        )"""
+                        )""",
         )
 
         # Commit changes and close connection
         conn.commit()
         conn.close()
+        self._bump_generation()
 
+    @instrumented(counters=lambda result, df, *_, **__: {"rows": len(df)})
     def populate_paper_table(self, df: pd.DataFrame):
-        column_names = ["publication_year", "title"]
+        column_names = ["publication_year", "title", "title_hash"]
+        if "title_hash" not in df.columns:
+            df = df.assign(title_hash=hash_titles(df["title"]))
 
         # Connect to the SQLite database
-        conn = sqlite3.connect(self._db_name)
+        conn = self._connect()
 
         # Insert DataFrame records into the Paper table
-        df[column_names].to_sql("Paper", conn, if_exists="append", index=False)
+        self._tracer.trace(
+            conn,
+            "INSERT INTO Paper (publication_year, title, title_hash) -- to_sql",
+            None,
+            lambda: df[column_names].to_sql(
+                "Paper", conn, if_exists="append", index=False
+            ),
+        )
 
         # Commit changes and close connection
         conn.commit()
         conn.close()
+        self._bump_generation()
+
+    @instrumented(counters=lambda result, df, *_, **__: {"rows": len(df)})
+    def append_papers(self, df: pd.DataFrame) -> None:
+        """
+        Upserts a chunk of papers into the Paper table and stages their keywords
+        in the Paper_Keyword_Staging table, because the keywords can only be
+        linked to the Keyword table once the keyword groups exist. Used by the
+        streaming import, so the papers never need to be in memory at once.
+        A paper whose title hash is already in the table is not inserted again,
+        and its keywords are added to the existing paper. The staged keywords
+        are linked by `link_staged_paper_keywords`.
+
+        Args:
+            df (pd.DataFrame): The papers, with "title", "publication_year" and "keywords"
+            columns, and optionally "title_hash".
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        self._execute(
+            cursor,
+            """CREATE TABLE IF NOT EXISTS Paper_Keyword_Staging (
+                            title_hash INTEGER,
+                            keyword TEXT NOT NULL
+                        )""",
+        )
+        title_hashes = (
+            df["title_hash"] if "title_hash" in df.columns else hash_titles(df["title"])
+        ).tolist()
+
+        papers = [
+            (int(year), title, title_hash)
+            for year, title, title_hash in zip(
+                df["publication_year"], df["title"], title_hashes
+            )
+        ]
+        sql = """INSERT INTO Paper (publication_year, title, title_hash) VALUES (?, ?, ?)
+            ON CONFLICT (title_hash) DO NOTHING"""
+        self._tracer.trace(conn, sql, None, lambda: cursor.executemany(sql, papers))
+
+        paper_keywords = (
+            (title_hash, keyword)
+            for title_hash, keywords in zip(title_hashes, df["keywords"])
+            for keyword in keywords
+        )
+        sql = "INSERT INTO Paper_Keyword_Staging (title_hash, keyword) VALUES (?, ?)"
+        self._tracer.trace(
+            conn, sql, None, lambda: cursor.executemany(sql, paper_keywords)
+        )
+
+        conn.commit()
+        conn.close()
+        self._bump_generation()
+
+    @instrumented()
+    def populate_title_index(self) -> None:
+        """
+        Builds the full-text index of the paper titles, the Paper_Title FTS5
+        table, in a single bulk pass over the Paper table. The index keeps
+        no copy of the titles (it reads them from Paper) and a trigger indexes
+        the papers inserted afterwards. Used by the `title_match` filter of
+        the queries.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        self._execute(cursor, "DROP TRIGGER IF EXISTS Paper_Title_insert")
+        self._execute(cursor, "DROP TABLE IF EXISTS Paper_Title")
+        self._execute(
+            cursor,
+            """CREATE VIRTUAL TABLE Paper_Title USING fts5(
+                            title,
+                            content='Paper',
+                            content_rowid='paper_id',
+                            tokenize='unicode61 remove_diacritics 2'
+                        )""",
+        )
+        self._execute(
+            cursor, "INSERT INTO Paper_Title (Paper_Title) VALUES ('rebuild')"
+        )
+        self._execute(
+            cursor,
+            """CREATE TRIGGER Paper_Title_insert AFTER INSERT ON Paper BEGIN
+                INSERT INTO Paper_Title (rowid, title) VALUES (new.paper_id, new.title);
+            END""",
+        )
+
+        conn.commit()
+        conn.close()
+        self._bump_generation()
+
+    def has_title_index(self) -> bool:
+        if not self.is_database_created():
+            return False
+        conn = self._connect()
+        cursor = conn.cursor()
+        index = self._execute(
+            cursor,
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Paper_Title'",
+        ).fetchone()
+        conn.close()
+        return index is not None
+
+    def _title_match_condition(self, title_match: str = None) -> tuple[str, tuple]:
+        """
+        Returns the condition (starting with AND) and parameters that keep the
+        papers whose title matches `title_match` (see `title_match_query`),
+        resolved through the Paper_Title full-text index.
+        """
+        if not title_match:
+            return "", ()
+        return (
+            """AND Paper.paper_id IN (
+                SELECT rowid FROM Paper_Title WHERE Paper_Title MATCH ?
+            )""",
+            (title_match_query(title_match),),
+        )
+
+    def has_staged_paper_keywords(self) -> bool:
+        if not self.is_database_created():
+            return False
+        conn = self._connect()
+        cursor = conn.cursor()
+        staged = self._execute(
+            cursor,
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Paper_Keyword_Staging'",
+        ).fetchone()
+        conn.close()
+        return staged is not None
+
+    @instrumented()
+    def link_staged_paper_keywords(self) -> int:
+        """
+        Fills the Paper_Keyword table from the keywords staged by `append_papers`
+        with a single join on the title hashes and the Keyword table, then drops the staging
+        table. Staged keywords without group are skipped.
+
+        Returns:
+            int: The number of staged keywords that were not found.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        self._execute(
+            cursor, "CREATE INDEX IF NOT EXISTS Keyword_name ON Keyword (name)"
+        )
+        self._execute(
+            cursor,
+            """INSERT OR IGNORE INTO Paper_Keyword (paper_id, keyword_id)
+                SELECT Paper.paper_id, MIN(Keyword.keyword_id)
+                FROM Paper_Keyword_Staging
+                JOIN Paper ON Paper.title_hash = Paper_Keyword_Staging.title_hash
+                JOIN Keyword ON Keyword.name = Paper_Keyword_Staging.keyword
+                GROUP BY Paper.paper_id, Paper_Keyword_Staging.keyword""",
+        )
+        not_found = self._execute(
+            cursor,
+            """SELECT COUNT(*) FROM Paper_Keyword_Staging
+                WHERE keyword NOT IN (SELECT name FROM Keyword)""",
+        ).fetchone()[0]
+        self._execute(cursor, "DROP TABLE Paper_Keyword_Staging")
+
+        conn.commit()
+        conn.close()
+        self._bump_generation()
+        return not_found
 
     def _populate_keyword_group_table(
         self, cursor: sqlite3.Cursor, keyword_semantic_goups: dict[str, list[str]]
     ):
         # Create KeywordGroup table and populate it
-        cursor.execute(
+        self._execute(
+            cursor,
             """CREATE TABLE IF NOT EXISTS KeywordGroup (
                         group_id INTEGER PRIMARY KEY,
                         name TEXT NOT NULL,
                         parent_group_id INTEGER,
+                        level INTEGER NOT NULL DEFAULT 0,
                         FOREIGN KEY (parent_group_id) REFERENCES KeywordGroup(group_id)
-                    )"""
+                    )""",
         )
 
         for group_id, group_name in enumerate(keyword_semantic_goups.keys(), start=1):
-            cursor.execute(
+            self._execute(
+                cursor,
                 """INSERT INTO KeywordGroup (group_id, name) VALUES (?, ?)""",
                 (group_id, group_name),
             )
@@ -117,32 +522,37 @@ class DBHandler:
         self, cursor: sqlite3.Cursor, keyword_semantic_goups: dict[str, list[str]]
     ):
         # Create Keyword table and populate it
-        cursor.execute(
+        self._execute(
+            cursor,
             """CREATE TABLE IF NOT EXISTS Keyword (
                             keyword_id INTEGER PRIMARY KEY,
                             name TEXT NOT NULL,
                             group_id INTEGER,
                             FOREIGN KEY (group_id) REFERENCES KeywordGroup(group_id)
-                        )"""
+                        )""",
         )
 
         for group_name, keywords in keyword_semantic_goups.items():
-            group_id = cursor.execute(
-                """SELECT group_id FROM KeywordGroup WHERE name = ?""", (group_name,)
+            group_id = self._execute(
+                cursor,
+                """SELECT group_id FROM KeywordGroup WHERE name = ?""",
+                (group_name,),
             ).fetchone()[0]
             for keyword in keywords:
-                cursor.execute(
+                self._execute(
+                    cursor,
                     """INSERT INTO Keyword (name, group_id) VALUES (?, ?)""",
                     (keyword, group_id),
                 )
 
     def _clear_keyword_tables(self, cursor: sqlite3.Cursor):
 
-        # Delete all content from KeywordGroup table
-        cursor.execute("DELETE FROM KeywordGroup")
+        # Delete all content from KeywordGroup table and its hierarchy
+        self._execute(cursor, "DELETE FROM KeywordGroup")
+        self._execute(cursor, "DROP TABLE IF EXISTS KeywordGroupClosure")
 
         # Update references in Keyword table
-        cursor.execute("UPDATE Keyword SET group_id = NULL")
+        self._execute(cursor, "UPDATE Keyword SET group_id = NULL")
 
     def _populate_keyword_group_table_updating_keyword_table(
         self, cursor: sqlite3.Cursor, keyword_semantic_goups: dict[str, list[str]]
@@ -151,27 +561,35 @@ class DBHandler:
         # Populate KeywordGroup and update Keyword tables
         for group_name, keywords in keyword_semantic_goups.items():
             # Insert or retrieve group_id for the group name
-            cursor.execute(
-                "SELECT group_id FROM KeywordGroup WHERE name = ?", (group_name,)
+            self._execute(
+                cursor,
+                "SELECT group_id FROM KeywordGroup WHERE name = ?",
+                (group_name,),
             )
             row = cursor.fetchone()
             if row:
                 group_id = row[0]
             else:
-                cursor.execute(
-                    "INSERT INTO KeywordGroup (name) VALUES (?)", (group_name,)
+                self._execute(
+                    cursor, "INSERT INTO KeywordGroup (name) VALUES (?)", (group_name,)
                 )
                 group_id = cursor.lastrowid
 
             # Update the group_id for keywords
             for keyword in keywords:
-                cursor.execute(
+                self._execute(
+                    cursor,
                     "UPDATE Keyword SET group_id = ? WHERE name = ?",
                     (group_id, keyword),
                 )
 
+    @instrumented(
+        counters=lambda result, keyword_semantic_goups, *_, **__: {
+            "groups": len(keyword_semantic_goups)
+        }
+    )
     def regenerate_keyword_tables(self, keyword_semantic_goups: dict[str, list[str]]):
-        conn = sqlite3.connect(self._db_name)
+        conn = self._connect()
         cursor = conn.cursor()
 
         self._clear_keyword_tables(cursor)
@@ -182,9 +600,15 @@ class DBHandler:
         # Commit changes and close connection
         conn.commit()
         conn.close()
+        self._bump_generation()
 
+    @instrumented(
+        counters=lambda result, keyword_semantic_goups, *_, **__: {
+            "groups": len(keyword_semantic_goups)
+        }
+    )
     def populate_keyword_tables(self, keyword_semantic_goups: dict[str, list[str]]):
-        conn = sqlite3.connect(self._db_name)
+        conn = self._connect()
         cursor = conn.cursor()
 
         # Populate KeywordGroup and Keyword tables
@@ -194,24 +618,204 @@ class DBHandler:
         # Commit changes and close connection
         conn.commit()
         conn.close()
+        self._bump_generation()
+
+    @instrumented(
+        counters=lambda result, levels, *_, **__: {
+            "levels": len(levels),
+            "groups": sum(len(set(level.values())) for level in levels),
+        }
+    )
+    def populate_group_hierarchy(self, levels: list[dict[str, str]]) -> None:
+        """
+        Stores the upper levels of the keyword groups, replacing the previous
+        ones. Every parent group is a KeywordGroup row with its level and the
+        `parent_group_id` of its children is set. The KeywordGroupClosure table
+        holds one (ancestor, descendant, depth) row per pair of groups on the
+        same branch, including every group with itself, so the papers of a group
+        at any level are reached with a single indexed join instead of walking
+        the tree.
 
+        Args:
+            levels (list[dict[str, str]]): One dict per upper level, from the lowest to the
+            highest one, mapping the name of every group of the level below to
+            the name of its parent (see `PaperLoader.build_group_hierarchy`).
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        columns = [
+            row[1] for row in self._execute(cursor, "PRAGMA table_info(KeywordGroup)")
+        ]
+        if "level" not in columns:
+            # Databases created before the hierarchy existed
+            self._execute(
+                cursor,
+                "ALTER TABLE KeywordGroup ADD COLUMN level INTEGER NOT NULL DEFAULT 0",
+            )
+        self._execute(cursor, "DELETE FROM KeywordGroup WHERE level > 0")
+        self._execute(cursor, "UPDATE KeywordGroup SET parent_group_id = NULL")
+        self._execute(cursor, "DROP TABLE IF EXISTS KeywordGroupClosure")
+        self._execute(
+            cursor,
+            "CREATE INDEX IF NOT EXISTS KeywordGroup_level ON KeywordGroup (level, name)",
+        )
+
+        for level, parents in enumerate(levels, start=1):
+            sql = "INSERT INTO KeywordGroup (name, level) VALUES (?, ?)"
+            new_groups = [(name, level) for name in dict.fromkeys(parents.values())]
+            self._tracer.trace(
+                conn, sql, None, lambda: cursor.executemany(sql, new_groups)
+            )
+            sql = """UPDATE KeywordGroup SET parent_group_id = (
+                    SELECT Parent.group_id FROM KeywordGroup AS Parent
+                    WHERE Parent.name = ? AND Parent.level = ?
+                ) WHERE name = ? AND level = ?"""
+            links = [
+                (parent, level, child, level - 1) for child, parent in parents.items()
+            ]
+            self._tracer.trace(conn, sql, None, lambda: cursor.executemany(sql, links))
+
+        self._execute(
+            cursor,
+            """CREATE TABLE KeywordGroupClosure (
+                            ancestor_id INTEGER NOT NULL,
+                            descendant_id INTEGER NOT NULL,
+                            depth INTEGER NOT NULL,
+                            PRIMARY KEY (ancestor_id, descendant_id)
+                        ) WITHOUT ROWID""",
+        )
+        self._execute(
+            cursor,
+            """INSERT INTO KeywordGroupClosure (ancestor_id, descendant_id, depth)
+                SELECT group_id, group_id, 0 FROM KeywordGroup""",
+        )
+        # Every pass adds the parents of the ancestors found by the previous one
+        for depth in range(len(levels)):
+            self._execute(
+                cursor,
+                """INSERT INTO KeywordGroupClosure (ancestor_id, descendant_id, depth)
+                    SELECT KeywordGroup.parent_group_id, KeywordGroupClosure.descendant_id, ? + 1
+                    FROM KeywordGroupClosure
+                    JOIN KeywordGroup ON KeywordGroup.group_id = KeywordGroupClosure.ancestor_id
+                    WHERE KeywordGroupClosure.depth = ?
+                    AND KeywordGroup.parent_group_id IS NOT NULL""",
+                (depth, depth),
+            )
+        self._execute(
+            cursor,
+            """CREATE INDEX KeywordGroupClosure_descendant
+                ON KeywordGroupClosure (descendant_id, ancestor_id)""",
+        )
+        self._execute(
+            cursor, "CREATE INDEX IF NOT EXISTS Keyword_group_id ON Keyword (group_id)"
+        )
+        self._execute(
+            cursor,
+            """CREATE INDEX IF NOT EXISTS Paper_Keyword_keyword_id
+                ON Paper_Keyword (keyword_id, paper_id)""",
+        )
+
+        conn.commit()
+        conn.close()
+        self._bump_generation()
+
+    def has_group_hierarchy(self) -> bool:
+        if not self.is_database_created():
+            return False
+        conn = self._connect()
+        cursor = conn.cursor()
+        closure = self._execute(
+            cursor,
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'KeywordGroupClosure'",
+        ).fetchone()
+        conn.close()
+        return closure is not None
+
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
+    def query_group_levels(self) -> pd.DataFrame:
+        """
+        Generates a pandas.DataFrame with the keyword groups of the hierarchy:
+        their "name", "level" and "parent_name" (None at the highest level) columns.
+        """
+        query = """
+            SELECT KeywordGroup.name, KeywordGroup.level, Parent.name AS parent_name
+            FROM KeywordGroup
+            LEFT JOIN KeywordGroup AS Parent ON Parent.group_id = KeywordGroup.parent_group_id
+            ORDER BY KeywordGroup.level DESC, KeywordGroup.name
+        """
+        conn = self._connect()
+        result = self._read_sql(conn, self.build_query(query))
+        conn.close()
+        return result
+
+    def _group_papers_join(
+        self, level: int = 0, parent_group: str = None
+    ) -> tuple[str, str, tuple]:
+        """
+        Returns the FROM clause that joins the keyword groups to their papers,
+        plus the condition and parameters that keep the groups of a level of
+        the hierarchy. Level 0 are the keyword groups. The groups of the upper
+        levels reach the keywords of their descendants through the
+        KeywordGroupClosure table.
+
+        Args:
+            level (int, optional): Level of the groups. Defaults to 0.
+            parent_group (str, optional): Keep only the groups below this group. Defaults to None.
+
+        Returns:
+            tuple[str, str, tuple]: The FROM clause, the condition (starting with AND) and its parameters.
+        """
+        if not level and not parent_group:
+            return (
+                """FROM KeywordGroup
+            JOIN Keyword ON Keyword.group_id = KeywordGroup.group_id
+            JOIN Paper_Keyword ON Keyword.keyword_id = Paper_Keyword.keyword_id
+            JOIN Paper ON Paper_Keyword.paper_id = Paper.paper_id""",
+                "",
+                (),
+            )
+
+        join = """FROM KeywordGroup
+            JOIN KeywordGroupClosure ON KeywordGroupClosure.ancestor_id = KeywordGroup.group_id
+            JOIN Keyword ON Keyword.group_id = KeywordGroupClosure.descendant_id
+            JOIN Paper_Keyword ON Keyword.keyword_id = Paper_Keyword.keyword_id
+            JOIN Paper ON Paper_Keyword.paper_id = Paper.paper_id"""
+        condition = "AND KeywordGroup.level = ?"
+        params = (level,)
+        if parent_group:
+            condition += """
+            AND KeywordGroup.group_id IN (
+                SELECT Below.descendant_id
+                FROM KeywordGroupClosure AS Below
+                JOIN KeywordGroup AS Parent ON Parent.group_id = Below.ancestor_id
+                WHERE Parent.name = ? AND Below.depth > 0
+            )"""
+            params += (parent_group,)
+        return join, condition, params
+
+    @instrumented(counters=lambda result, df, *_, **__: {"rows": len(df)})
     def populate_paper_keyword_table(
         self,
         df: pd.DataFrame,
     ) -> None:
         # Connect to the SQLite database
-        conn = sqlite3.connect(self._db_name)
+        conn = self._connect()
         cursor = conn.cursor()
 
         # Populate Paper_Keyword table
         for paper_id, keywords in enumerate(df["keywords"], start=1):
             for keyword in keywords:
-                keyword_id = cursor.execute(
-                    """SELECT keyword_id FROM Keyword WHERE name = ?""", (keyword,)
+                keyword_id = self._execute(
+                    cursor,
+                    """SELECT keyword_id FROM Keyword WHERE name = ?""",
+                    (keyword,),
                 ).fetchone()
                 if keyword_id:
                     keyword_id = keyword_id[0]
-                    cursor.execute(
+                    self._execute(
+                        cursor,
                         """INSERT INTO Paper_Keyword (paper_id, keyword_id) VALUES (?, ?)""",
                         (paper_id, keyword_id),
                     )
@@ -220,12 +824,15 @@ class DBHandler:
 
         conn.commit()
         conn.close()
+        self._bump_generation()
 
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
     def query_count_unique_papers_per_group(self, limit: int = None) -> pd.DataFrame:
         result: pd.DataFrame = None
 
         # Connect to the SQLite database
-        conn = sqlite3.connect(self._db_name)
+        conn = self._connect()
 
         # SQL query to retrieve the top 30 groups with the most unique papers
         query = """
@@ -241,20 +848,22 @@ class DBHandler:
         query = self.build_query(query, limit)
 
         # Fetch all results
-        result = pd.read_sql_query(query, conn)
+        result = self._read_sql(conn, query)
 
         # Close connection
         conn.close()
 
         return result
 
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
     def query_count_unique_papers_per_group_per_year(
         self, limit: int = None
     ) -> pd.DataFrame:
         result: pd.DataFrame = None
 
         # Connect to the SQLite database
-        conn = sqlite3.connect(self._db_name)
+        conn = self._connect()
         cursor = conn.cursor()
 
         unique_years: list[int] = self.get_unique_years(cursor)
@@ -274,18 +883,20 @@ class DBHandler:
 
         query = self.build_query(query, limit)
 
-        result = pd.read_sql_query(query, conn)
+        result = self._read_sql(conn, query)
 
         # Close connection
         conn.close()
 
         return result
 
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
     def query_tendencies_of_keywords(self, limit: int = None) -> pd.DataFrame:
         result: pd.DataFrame = None
 
         # Connect to the SQLite database
-        conn = sqlite3.connect(self._db_name)
+        conn = self._connect()
         cursor = conn.cursor()
 
         unique_years: list[int] = self.get_unique_years(cursor)
@@ -305,19 +916,24 @@ class DBHandler:
 
         query = self.build_query(query, limit)
 
-        result = pd.read_sql_query(query, conn)
+        result = self._read_sql(conn, query)
 
         # Close connection
         conn.close()
 
         return result
 
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
     def query_top_groups(
         self,
         limit: int = 10,
         year_lower_bound: int = 2024,
         year_upper_bound: int = 2024,
         excluded_keywords: list[str] = None,
+        level: int = 0,
+        parent_group: str = None,
+        title_match: str = None,
     ) -> pd.DataFrame:
         """
         Generates a pandas.DataFrame with the keyword group name ("name" column) and
@@ -330,39 +946,58 @@ class DBHandler:
             year_lower_bound (int, optional): Lower bound of year filtering (number included in the search). Defaults to 2024.
             year_upper_bound (int, optional): Upper bound of year filtering (number included in the search). Defaults to 2024.
             excluded_keywords (list[str], optional): List of excluded keyword groups. Defaults to [].
+            level (int, optional): Level of the group hierarchy, 0 are the keyword groups. Defaults to 0.
+            parent_group (str, optional): Only the groups below this group of the hierarchy. Defaults to None.
+            title_match (str, optional): Only the papers whose title has all these terms
+            (see `title_match_query`), found through the full-text index. Defaults to None.
 
         Returns:
             pd.DataFrame: The pandas.DataFrame with columns "name" for the keyword groups
             and "unique_paper_count" for the number of unique papers per group.
         """
+        if not excluded_keywords:
+            excluded_keywords = []
+
+        join, group_condition, group_params = self._group_papers_join(
+            level, parent_group
+        )
+        title_condition, title_params = self._title_match_condition(title_match)
         query = f"""
             SELECT KeywordGroup.name, COUNT(DISTINCT Paper.paper_id) AS unique_paper_count
-            FROM KeywordGroup
-            JOIN Keyword ON Keyword.group_id = KeywordGroup.group_id
-            JOIN Paper_Keyword ON Keyword.keyword_id = Paper_Keyword.keyword_id
-            JOIN Paper ON Paper_Keyword.paper_id = Paper.paper_id
-            WHERE Paper.publication_year >= {year_lower_bound}
-            AND Paper.publication_year <= {year_upper_bound}
-            AND KeywordGroup.name NOT IN ({', '.join([f'"{group}"' for group in excluded_keywords])})
+            {join}
+            WHERE Paper.publication_year >= ?
+            AND Paper.publication_year <= ?
+            AND KeywordGroup.name NOT IN ({', '.join('?' for _ in excluded_keywords)})
+            {group_condition}
+            {title_condition}
             GROUP BY KeywordGroup.name
             ORDER BY unique_paper_count DESC
         """
-        if not excluded_keywords:
-            excluded_keywords = []
+        params = (
+            year_lower_bound,
+            year_upper_bound,
+            *excluded_keywords,
+            *group_params,
+            *title_params,
+        )
 
         query = self.build_query(query, limit)
 
-        conn = sqlite3.connect(self._db_name)
-        result = pd.read_sql_query(query, conn)
+        conn = self._connect()
+        result = self._read_sql(conn, query, params)
         conn.close()
         return result
 
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
     def query_trends_of_groups(
         self,
         df: pd.DataFrame,
         year_lower_bound: int = 0,
         year_upper_bound: int = 3000,
         excluded_keywords: list[str] = None,
+        level: int = 0,
+        title_match: str = None,
     ) -> pd.DataFrame:
         """
         Generates a pandas.DataFrame with the keyword group name ("name" column), the
@@ -375,6 +1010,9 @@ class DBHandler:
             year_lower_bound (int, optional): Lower bound of year filtering (number included in the search). Defaults to 0.
             year_upper_bound (int, optional): Upper bound of year filtering (number included in the search). Defaults to 3000.
             excluded_keywords (list[str], optional): List of excluded keyword groups. Defaults to [].
+            level (int, optional): Level of the groups of df in the group hierarchy. Defaults to 0.
+            title_match (str, optional): Only the papers whose title has all these terms
+            (see `title_match_query`), found through the full-text index. Defaults to None.
 
         Returns:
             pd.DataFrame: The pandas.DataFrame with columns "name" for the keyword groups,
@@ -384,22 +1022,133 @@ class DBHandler:
         if not excluded_keywords:
             excluded_keywords = []
 
+        groups = [group for group in df["name"] if group not in excluded_keywords]
+
+        join, group_condition, group_params = self._group_papers_join(level)
+        title_condition, title_params = self._title_match_condition(title_match)
         query = f"""
             SELECT KeywordGroup.name, Paper.publication_year, COUNT(DISTINCT Paper.paper_id) AS unique_paper_count
-            FROM KeywordGroup
-            JOIN Keyword ON Keyword.group_id = KeywordGroup.group_id
-            JOIN Paper_Keyword ON Keyword.keyword_id = Paper_Keyword.keyword_id
-            JOIN Paper ON Paper_Keyword.paper_id = Paper.paper_id
-            WHERE KeywordGroup.name IN ({', '.join([f'"{group}"' for group in df['name'] if group not in excluded_keywords])})
-            AND Paper.publication_year >= {year_lower_bound}
-            AND Paper.publication_year <= {year_upper_bound}
+            {join}
+            WHERE KeywordGroup.name IN ({', '.join('?' for _ in groups)})
+            AND Paper.publication_year >= ?
+            AND Paper.publication_year <= ?
+            {group_condition}
+            {title_condition}
             GROUP BY KeywordGroup.name, Paper.publication_year
             ORDER BY unique_paper_count, KeywordGroup.name, Paper.publication_year
         """
+        params = (
+            *groups,
+            year_lower_bound,
+            year_upper_bound,
+            *group_params,
+            *title_params,
+        )
 
         query = self.build_query(query)
 
-        conn = sqlite3.connect(self._db_name)
-        result = pd.read_sql_query(query, conn)
+        conn = self._connect()
+        result = self._read_sql(conn, query, params)
+        conn.close()
+        return result
+
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
+    def query_group_year_counts(
+        self,
+        year_lower_bound: int = 0,
+        year_upper_bound: int = 3000,
+        excluded_keywords: list[str] = None,
+        level: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Generates a pandas.DataFrame with the unique paper count of every keyword
+        group per publication year, in a single query over all the groups (the
+        input of `TrendAnalyzer`).
+
+        Args:
+            year_lower_bound (int, optional): Lower bound of year filtering (number included in the search). Defaults to 0.
+            year_upper_bound (int, optional): Upper bound of year filtering (number included in the search). Defaults to 3000.
+            excluded_keywords (list[str], optional): List of excluded keyword groups. Defaults to [].
+            level (int, optional): Level of the group hierarchy, 0 are the keyword groups. Defaults to 0.
+
+        Returns:
+            pd.DataFrame: The pandas.DataFrame with columns "name" for the keyword groups,
+            "publication_year" for the year of publication and "unique_paper_count" for
+            the number of unique papers per group per year.
+        """
+        if not excluded_keywords:
+            excluded_keywords = []
+
+        join, group_condition, group_params = self._group_papers_join(level)
+        query = f"""
+            SELECT KeywordGroup.name, Paper.publication_year, COUNT(DISTINCT Paper.paper_id) AS unique_paper_count
+            {join}
+            WHERE Paper.publication_year >= ?
+            AND Paper.publication_year <= ?
+            AND KeywordGroup.name NOT IN ({', '.join('?' for _ in excluded_keywords)})
+            {group_condition}
+            GROUP BY KeywordGroup.name, Paper.publication_year
+        """
+        params = (year_lower_bound, year_upper_bound, *excluded_keywords, *group_params)
+
+        query = self.build_query(query)
+
+        conn = self._connect()
+        result = self._read_sql(conn, query, params)
+        conn.close()
+        return result
+
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
+    def query_keyword_groups(self, keywords: list[str], level: int = 0) -> pd.DataFrame:
+        """
+        Generates a pandas.DataFrame with the keyword group ("name" column) of
+        every keyword of `keywords` ("keyword" column) that is in the database,
+        or the ancestor of that group at a `level` of the group hierarchy.
+        """
+        placeholders = ", ".join("?" for _ in keywords)
+        params = tuple(keywords)
+        if not level:
+            query = f"""
+                SELECT Keyword.name AS keyword, KeywordGroup.name
+                FROM Keyword
+                JOIN KeywordGroup ON KeywordGroup.group_id = Keyword.group_id
+                WHERE Keyword.name IN ({placeholders})
+            """
+        else:
+            query = f"""
+                SELECT Keyword.name AS keyword, KeywordGroup.name
+                FROM Keyword
+                JOIN KeywordGroupClosure ON KeywordGroupClosure.descendant_id = Keyword.group_id
+                JOIN KeywordGroup ON KeywordGroup.group_id = KeywordGroupClosure.ancestor_id
+                WHERE Keyword.name IN ({placeholders})
+                AND KeywordGroup.level = ?
+            """
+            params += (level,)
+        conn = self._connect()
+        result = self._read_sql(conn, self.build_query(query), params)
+        conn.close()
+        return result
+
+    @instrumented(counters=lambda result, *_, **__: {"rows": len(result)})
+    @cached_query
+    def query_papers_per_year(
+        self, year_lower_bound: int = 0, year_upper_bound: int = 3000
+    ) -> pd.DataFrame:
+        """
+        Generates a pandas.DataFrame with the number of papers ("paper_count" column)
+        of every publication year ("publication_year" column).
+        """
+        query = """
+            SELECT publication_year, COUNT(*) AS paper_count
+            FROM Paper
+            WHERE publication_year >= ?
+            AND publication_year <= ?
+            GROUP BY publication_year
+            ORDER BY publication_year
+        """
+        conn = self._connect()
+        result = self._read_sql(conn, query, (year_lower_bound, year_upper_bound))
         conn.close()
         return result
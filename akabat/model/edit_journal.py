@@ -0,0 +1,134 @@
+import json
+import os
+
+
+class EditJournal:
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Initialize the EditJournal, an append-only JSON lines file that records the
+        curation operations (merges, renames, bans and unbans) applied on top of a
+        keyword groups snapshot. Every operation is flushed to disk when appended,
+        so a crash only loses the operation being written.
+
+        The first line of the journal stores the checksum of the snapshot it
+        applies to, so a journal is never replayed on top of another snapshot.
+
+        Args:
+            file_path (str): Path to the journal file.
+        """
+        self._file_path: str = file_path
+        self._base_checksum: str = None
+        self._pending: int = 0
+
+    def __len__(self) -> int:
+        """Number of operations appended since the last snapshot."""
+        return self._pending
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the in-memory groups are based on a saved snapshot."""
+        return self._base_checksum is not None
+
+    def start(self, base_checksum: str) -> None:
+        """
+        Truncates the journal and starts recording operations on top of the
+        snapshot with checksum `base_checksum`.
+        """
+        self._base_checksum = base_checksum
+        self._pending = 0
+        self._write_lines([{"op": "base", "checksum": base_checksum}], mode="w")
+
+    def resume(self, base_checksum: str, pending: int) -> None:
+        """
+        Keeps appending to an existing journal whose operations were replayed.
+        A partially written last line (from a crash while appending) is cut
+        off first, so the next operation starts on a line of its own.
+        """
+        self._base_checksum = base_checksum
+        self._pending = pending
+        if not os.path.isfile(self._file_path):
+            return
+        valid_length = self._valid_length()
+        if valid_length < os.path.getsize(self._file_path):
+            with open(self._file_path, "r+b") as f:
+                f.truncate(valid_length)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def stop(self) -> None:
+        """
+        Stops recording operations, e.g. because the groups were regenerated and
+        no longer match the snapshot. The journal file is left untouched.
+        """
+        self._base_checksum = None
+        self._pending = 0
+
+    def append(self, op: str, **arguments) -> bool:
+        """
+        Appends an operation to the journal if it is active.
+
+        Args:
+            op (str): The operation name ("merge", "merge_file", "rename", "ban" or "unban").
+            **arguments: The JSON serializable arguments of the operation.
+
+        Returns:
+            bool: True if the operation was recorded.
+        """
+        if not self.is_active:
+            return False
+        self._write_lines([{"op": op, **arguments}], mode="a")
+        self._pending += 1
+        return True
+
+    def _write_lines(self, entries: list[dict], mode: str) -> None:
+        with open(self._file_path, mode, encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _complete_entries(self):
+        """
+        Yields the entries of the journal and the length of the file up to the
+        end of each one, until the first line that is not complete JSON.
+        """
+        length = 0
+        with open(self._file_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    return
+                length += len(line)
+                yield entry, length
+
+    def _valid_length(self) -> int:
+        length = 0
+        for _, length in self._complete_entries():
+            pass
+        return length
+
+    def read(self) -> tuple[str, list[dict]]:
+        """
+        Reads the journal. A partially written last line (from a crash while
+        appending) is ignored.
+
+        Returns:
+            tuple[str, list[dict]]: The checksum of the base snapshot (None if the
+            journal does not exist) and the list of operations.
+        """
+        if not os.path.isfile(self._file_path):
+            return None, []
+
+        entries = [entry for entry, _ in self._complete_entries()]
+
+        if not entries or entries[0].get("op") != "base":
+            return None, []
+        return entries[0].get("checksum"), entries[1:]
@@ -0,0 +1,209 @@
+import cProfile
+import functools
+import json
+import os
+import re
+import sys
+import time
+
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes() -> int:
+    """
+    Returns the peak resident set size of the current process since it
+    started, in bytes, or None if it is not available in this platform
+    (Windows has no resource module).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Instrumentation:
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        profile: bool = False,
+        profile_folder: str = None,
+    ) -> None:
+        """
+        Initialize the Instrumentation, which records the wall time, CPU time,
+        peak RSS growth and counters (rows, keywords...) of every stage, as well
+        as cache hits and misses. When disabled, every method is a cheap no-op.
+
+        The peak RSS is a high-water mark of the whole process, so a stage
+        records how much it raised it ("peak_rss_growth_bytes"): a stage that
+        stays below the peak of a previous stage records 0.
+
+        Args:
+            enabled (bool, optional): Record the stages. Defaults to False.
+            profile (bool, optional): Dump a cProfile file per top-level stage. Defaults to False.
+            profile_folder (str, optional): Folder of the cProfile dumps. Defaults to None.
+        """
+        self.enabled: bool = enabled
+        self.profile: bool = profile
+        self.profile_folder: str = profile_folder
+        self._records: list[dict] = []
+        self._stack: list[dict] = []
+        self._caches: dict[str, dict[str, int]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager that records a stage. It yields the stage record so
+        counters can be added with `count`.
+
+        Args:
+            name (str): The stage name, e.g. "PaperLoader.import_csv".
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        record = {
+            "stage": name,
+            "parent": self._stack[-1]["stage"] if self._stack else None,
+            "counters": {},
+        }
+        profiler = None
+        if self.profile and not self._stack:
+            profiler = cProfile.Profile()
+
+        self._stack.append(record)
+        peak_rss_start = peak_rss_bytes()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["wall_time_s"] = time.perf_counter() - wall_start
+            record["cpu_time_s"] = time.process_time() - cpu_start
+            peak_rss_end = peak_rss_bytes()
+            record["peak_rss_growth_bytes"] = (
+                max(0, peak_rss_end - peak_rss_start)
+                if peak_rss_start is not None and peak_rss_end is not None
+                else None
+            )
+            self._stack.pop()
+            self._records.append(record)
+            if profiler is not None:
+                self._dump_profile(name, profiler)
+
+    def _dump_profile(self, name: str, profiler: cProfile.Profile) -> None:
+        folder = self.profile_folder or "."
+        os.makedirs(folder, exist_ok=True)
+        file_name = re.sub(r"[^\w.-]+", "_", name)
+        profiler.dump_stats(f"{folder}/{len(self._records):03d}_{file_name}.prof")
+
+    def count(self, **counters: int) -> None:
+        """Adds counters (e.g. rows=100) to the innermost running stage."""
+        if not self.enabled or not self._stack:
+            return
+        stage_counters = self._stack[-1]["counters"]
+        for key, value in counters.items():
+            stage_counters[key] = stage_counters.get(key, 0) + value
+
+    def cache_event(self, cache_name: str, hit: bool) -> None:
+        if not self.enabled:
+            return
+        cache = self._caches.setdefault(cache_name, {"hits": 0, "misses": 0})
+        cache["hits" if hit else "misses"] += 1
+
+    def summary(self) -> list[dict]:
+        """
+        Aggregates the records by stage name.
+
+        Returns:
+            list[dict]: One dict per stage with the number of calls, total wall and
+            CPU times, maximum peak RSS growth and summed counters.
+        """
+        stages: dict[str, dict] = {}
+        for record in self._records:
+            stage = stages.setdefault(
+                record["stage"],
+                {
+                    "stage": record["stage"],
+                    "calls": 0,
+                    "wall_time_s": 0.0,
+                    "cpu_time_s": 0.0,
+                    "peak_rss_growth_bytes": None,
+                    "counters": {},
+                },
+            )
+            stage["calls"] += 1
+            stage["wall_time_s"] += record["wall_time_s"]
+            stage["cpu_time_s"] += record["cpu_time_s"]
+            if record["peak_rss_growth_bytes"] is not None:
+                stage["peak_rss_growth_bytes"] = max(
+                    stage["peak_rss_growth_bytes"] or 0,
+                    record["peak_rss_growth_bytes"],
+                )
+            for key, value in record["counters"].items():
+                stage["counters"][key] = stage["counters"].get(key, 0) + value
+        return list(stages.values())
+
+    def report(self) -> dict:
+        caches = {}
+        for cache_name, cache in self._caches.items():
+            lookups = cache["hits"] + cache["misses"]
+            caches[cache_name] = {
+                **cache,
+                "hit_rate": cache["hits"] / lookups if lookups else None,
+            }
+        return {
+            "summary": self.summary(),
+            "caches": caches,
+            "stages": self._records,
+        }
+
+    def write_report(self, file_path: str) -> None:
+        """Writes the run report as JSON."""
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4)
+
+    def reset(self) -> None:
+        self._records = []
+        self._caches = {}
+
+
+def instrumented(stage_name: str = None, counters=None):
+    """
+    Decorator that records a method as a stage of the `_instrumentation`
+    attribute of its instance, if the instrumentation is enabled.
+
+    Args:
+        stage_name (str, optional): The stage name. Defaults to "ClassName.method_name".
+        counters (Callable[..., dict], optional): Called with the result and the
+        arguments of the method, returns the counters of the stage. Defaults to None.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instrumentation: Instrumentation = getattr(self, "_instrumentation", None)
+            if instrumentation is None or not instrumentation.enabled:
+                return method(self, *args, **kwargs)
+
+            name = stage_name or f"{type(self).__name__}.{method.__name__}"
+            with instrumentation.stage(name):
+                result = method(self, *args, **kwargs)
+                if counters is not None:
+                    instrumentation.count(**counters(result, *args, **kwargs))
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,153 @@
+class UnionFind:
+
+    def __init__(self, size: int = 0) -> None:
+        """
+        Initialize a disjoint-set forest with `size` singleton sets, with union
+        by size and path halving.
+
+        Args:
+            size (int, optional): Number of initial elements. Defaults to 0.
+        """
+        self._parent: list[int] = list(range(size))
+        self._size: list[int] = [1] * size
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def add(self) -> int:
+        """Adds a new singleton set and returns its element."""
+        self._parent.append(len(self._parent))
+        self._size.append(1)
+        return len(self._parent) - 1
+
+    def find(self, element: int) -> int:
+        parent = self._parent
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, a: int, b: int) -> int:
+        """Joins the sets of `a` and `b` and returns the root of the joined set."""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+        return root_a
+
+
+class KeywordGroupIndex:
+
+    def __init__(self, groups: dict[str, list[str]] = None) -> None:
+        """
+        Initialize the KeywordGroupIndex, the group membership structure behind
+        `Data.unique_keywords_groups`. It keeps a keyword to group index and
+        merges groups with a union-find, so applying thousands of merges costs
+        near-linear time instead of rebuilding the group lists on each merge.
+
+        Args:
+            groups (dict[str, list[str]], optional): Keyword groups with the group name as key
+            and the list of keywords as value. Defaults to None.
+        """
+        self._sets: UnionFind = UnionFind()
+        self._slot_by_name: dict[str, int] = {}
+        self._name_by_root: dict[int, str] = {}
+        self._members: dict[int, list[str]] = {}
+        self._slot_by_keyword: dict[str, int] = {}
+        self._overlapping: bool = False
+        for name, keywords in (groups or {}).items():
+            slot = self._sets.add()
+            self._slot_by_name[name] = slot
+            self._name_by_root[slot] = name
+            self._members[slot] = list(dict.fromkeys(keywords))
+            for keyword in self._members[slot]:
+                if self._slot_by_keyword.setdefault(keyword, slot) != slot:
+                    self._overlapping = True
+
+    def __len__(self) -> int:
+        return len(self._slot_by_name)
+
+    def __contains__(self, group_name: str) -> bool:
+        return group_name in self._slot_by_name
+
+    def group_names(self) -> list[str]:
+        return list(self._slot_by_name)
+
+    def keywords_of(self, group_name: str) -> list[str]:
+        return self._members[self._slot_by_name[group_name]]
+
+    def group_of(self, keyword: str) -> str:
+        """
+        Returns the name of the group that contains `keyword`, or None.
+        """
+        slot = self._slot_by_keyword.get(keyword)
+        if slot is None:
+            return None
+        return self._name_by_root[self._sets.find(slot)]
+
+    def merge(self, group_names: list[str], new_group_name: str) -> None:
+        """
+        Merges the groups into a new group named `new_group_name`. If a group
+        called `new_group_name` already exists, it is merged too. Merging a
+        single group renames it.
+
+        Args:
+            group_names (list[str]): The names of the groups to merge. All of them must exist.
+            new_group_name (str): The name of the resulting group.
+        """
+        names = list(dict.fromkeys(group_names))
+        if new_group_name in self._slot_by_name and new_group_name not in names:
+            names.append(new_group_name)
+
+        roots = [self._slot_by_name.pop(name) for name in names]
+        # Keep the biggest member list and extend it with the smaller ones
+        roots.sort(key=lambda root: len(self._members[root]), reverse=True)
+        members = self._members.pop(roots[0])
+        del self._name_by_root[roots[0]]
+        for root in roots[1:]:
+            members.extend(self._members.pop(root))
+            del self._name_by_root[root]
+        if self._overlapping:
+            members = list(dict.fromkeys(members))
+
+        # A fresh slot keeps the merged group last, like a new dict key
+        new_root = self._sets.add()
+        for root in roots:
+            new_root = self._sets.union(new_root, root)
+        self._slot_by_name[new_group_name] = new_root
+        self._name_by_root[new_root] = new_group_name
+        self._members[new_root] = members
+
+    def apply_merges(self, merges: dict[str, list[str]]) -> list[str]:
+        """
+        Applies a list of merges in order. A merge may use the names produced
+        by previous merges. Merges that reference missing groups are skipped.
+
+        Args:
+            merges (dict[str, list[str]]): The new group names as keys and the names of
+            the groups to merge as values.
+
+        Returns:
+            list[str]: The missing group names of the skipped merges.
+        """
+        missing = []
+        for new_group_name, group_names in merges.items():
+            missing_names = [name for name in group_names if name not in self]
+            if missing_names or not group_names:
+                missing.extend(missing_names)
+                continue
+            self.merge(group_names, new_group_name)
+        return missing
+
+    def to_dict(self) -> dict[str, list[str]]:
+        """
+        Returns the keyword groups with the group name as key and the list of
+        keywords as value.
+        """
+        return {
+            name: list(self._members[slot]) for name, slot in self._slot_by_name.items()
+        }
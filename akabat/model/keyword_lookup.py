@@ -0,0 +1,180 @@
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+class KeywordLookup:
+
+    def __init__(self, names: list[str] = None, gram_size: int = 3) -> None:
+        """
+        Initialize the KeywordLookup, an in-memory index over keywords or keyword
+        group names that supports prefix completion and typo-tolerant suggestions.
+        A sorted list answers prefix queries with bisect and a character n-gram
+        index reduces the edit distance checks to a few candidates.
+
+        Args:
+            names (list[str], optional): The names to index. Defaults to None.
+            gram_size (int, optional): Size of the character n-grams. Defaults to 3.
+        """
+        self._gram_size: int = gram_size
+        self._sorted_names: list[str] = []
+        self._grams: dict[str, set[str]] = {}
+        self._by_length: dict[int, set[str]] = {}
+        if names:
+            self.rebuild(names)
+
+    def __len__(self) -> int:
+        return len(self._sorted_names)
+
+    def __contains__(self, name: str) -> bool:
+        i = bisect_left(self._sorted_names, name)
+        return i < len(self._sorted_names) and self._sorted_names[i] == name
+
+    def _name_grams(self, name: str) -> set[str]:
+        padded = f"${name}$"
+        return {
+            padded[i : i + self._gram_size]
+            for i in range(max(1, len(padded) - self._gram_size + 1))
+        }
+
+    def rebuild(self, names: list[str]) -> None:
+        """
+        Replaces all the indexed names.
+
+        Args:
+            names (list[str]): The names to index.
+        """
+        self._sorted_names = sorted(set(names))
+        self._grams = {}
+        self._by_length = {}
+        for name in self._sorted_names:
+            self._index_name(name)
+
+    def _index_name(self, name: str) -> None:
+        for gram in self._name_grams(name):
+            self._grams.setdefault(gram, set()).add(name)
+        self._by_length.setdefault(len(name), set()).add(name)
+
+    def add(self, name: str) -> None:
+        if name in self:
+            return
+        insort(self._sorted_names, name)
+        self._index_name(name)
+
+    def remove(self, name: str) -> None:
+        i = bisect_left(self._sorted_names, name)
+        if i == len(self._sorted_names) or self._sorted_names[i] != name:
+            return
+        del self._sorted_names[i]
+        for gram in self._name_grams(name):
+            names = self._grams.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._grams[gram]
+        self._by_length[len(name)].discard(name)
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Returns the indexed names that start with `prefix`, in alphabetical order.
+
+        Args:
+            prefix (str): The beginning of the name.
+            limit (int, optional): Maximum number of names returned. Defaults to 10.
+
+        Returns:
+            list[str]: The names starting with `prefix`.
+        """
+        completions = []
+        i = bisect_left(self._sorted_names, prefix)
+        while i < len(self._sorted_names) and len(completions) < limit:
+            name = self._sorted_names[i]
+            if not name.startswith(prefix):
+                break
+            completions.append(name)
+            i += 1
+        return completions
+
+    @staticmethod
+    def edit_distance(a: str, b: str, max_distance: int) -> int:
+        """
+        Computes the Levenshtein distance between `a` and `b`, giving up as soon
+        as it is known to be greater than `max_distance`.
+
+        Returns:
+            int: The edit distance, or `max_distance + 1` if it is greater than `max_distance`.
+        """
+        if abs(len(a) - len(b)) > max_distance:
+            return max_distance + 1
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, start=1):
+            current = [i] + [0] * len(b)
+            for j, char_b in enumerate(b, start=1):
+                current[j] = min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            if min(current) > max_distance:
+                return max_distance + 1
+            previous = current
+        return min(previous[-1], max_distance + 1)
+
+    def _candidates(self, query: str, max_distance: int) -> set[str]:
+        query_grams = self._name_grams(query)
+        # Each edit destroys at most `gram_size` n-grams of the query
+        min_shared = len(query_grams) - max_distance * self._gram_size
+        if min_shared <= 0:
+            candidates = set()
+            for length in range(
+                len(query) - max_distance, len(query) + max_distance + 1
+            ):
+                candidates.update(self._by_length.get(length, ()))
+            return candidates
+
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._grams.get(gram, ()))
+        return {name for name, count in shared.items() if count >= min_shared}
+
+    def suggest(
+        self, query: str, max_distance: int = 2, limit: int = 10
+    ) -> list[tuple[str, int]]:
+        """
+        Returns the indexed names within `max_distance` edits of `query`.
+
+        Args:
+            query (str): The (possibly misspelled) name.
+            max_distance (int, optional): Maximum Levenshtein distance. Defaults to 2.
+            limit (int, optional): Maximum number of suggestions. Defaults to 10.
+
+        Returns:
+            list[tuple[str, int]]: (name, edit distance) tuples sorted by distance and name.
+        """
+        suggestions = []
+        for name in self._candidates(query, max_distance):
+            distance = self.edit_distance(query, name, max_distance)
+            if distance <= max_distance:
+                suggestions.append((name, distance))
+        suggestions.sort(key=lambda suggestion: (suggestion[1], suggestion[0]))
+        return suggestions[:limit]
+
+    def lookup(self, query: str, max_distance: int = 2, limit: int = 10) -> list[str]:
+        """
+        Returns the prefix completions of `query` followed by the typo suggestions
+        that are not already completions.
+
+        Args:
+            query (str): The beginning of a name or a misspelled name.
+            max_distance (int, optional): Maximum Levenshtein distance of the suggestions. Defaults to 2.
+            limit (int, optional): Maximum number of names returned. Defaults to 10.
+
+        Returns:
+            list[str]: The matching names.
+        """
+        names = self.complete(query, limit)
+        for name, _ in self.suggest(query, max_distance, limit):
+            if len(names) >= limit:
+                break
+            if name not in names:
+                names.append(name)
+        return names
@@ -0,0 +1,184 @@
+import numpy as np
+
+from sklearn.cluster import MiniBatchKMeans
+
+
+class KeywordSearchIndex:
+
+    def __init__(
+        self,
+        exact_search_limit: int = 200_000,
+        block_size: int = 16_384,
+        n_probe: int = 16,
+        random_state: int = 0,
+    ) -> None:
+        """
+        Initialize the KeywordSearchIndex. Queries are answered with the cosine
+        similarity between the query embedding and the indexed embeddings.
+
+        Args:
+            exact_search_limit (int, optional): Maximum number of indexed items searched exactly. Bigger
+            indexes use an approximate inverted file index. Defaults to 200_000.
+            block_size (int, optional): Number of rows multiplied at once in the exact search. Defaults to 16_384.
+            n_probe (int, optional): Number of inverted lists visited per query in the approximate search. Defaults to 16.
+            random_state (int, optional): Seed of the inverted file clustering. Defaults to 0.
+        """
+        self._exact_search_limit: int = exact_search_limit
+        self._block_size: int = block_size
+        self._n_probe: int = n_probe
+        self._random_state: int = random_state
+        self._names: list[str] = []
+        self._embeddings: np.ndarray = None
+        self._centroids: np.ndarray = None
+        self._inverted_lists: list[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def is_approximate(self) -> bool:
+        return self._centroids is not None
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim == 1:
+            embeddings = embeddings.reshape(1, -1)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return embeddings / norms
+
+    def build(self, names: list[str], embeddings: np.ndarray) -> None:
+        """
+        Indexes the names with their embeddings.
+
+        Args:
+            names (list[str]): The names of the indexed items (keywords or keyword groups).
+            embeddings (np.ndarray): A matrix with one embedding row per name.
+        """
+        self._names = list(names)
+        self._embeddings = self._normalize(embeddings)
+        self._centroids = None
+        self._inverted_lists = None
+
+        if len(self._names) > self._exact_search_limit:
+            n_lists = int(np.sqrt(len(self._names)))
+            rng = np.random.default_rng(self._random_state)
+            sample_size = min(len(self._names), n_lists * 64)
+            sample = rng.choice(len(self._names), size=sample_size, replace=False)
+            kmeans = MiniBatchKMeans(
+                n_clusters=n_lists,
+                batch_size=4096,
+                n_init=1,
+                random_state=self._random_state,
+            )
+            kmeans.fit(self._embeddings[sample])
+            self._centroids = self._normalize(kmeans.cluster_centers_)
+
+            # Assign every item to the list whose centroid is the most similar
+            labels = np.empty(len(self._names), dtype=np.int64)
+            for start in range(0, len(self._names), self._block_size):
+                block = self._embeddings[start : start + self._block_size]
+                labels[start : start + len(block)] = np.argmax(
+                    block @ self._centroids.T, axis=1
+                )
+            order = np.argsort(labels, kind="stable")
+            bounds = np.searchsorted(labels[order], np.arange(n_lists + 1))
+            self._inverted_lists = [
+                order[bounds[i] : bounds[i + 1]] for i in range(n_lists)
+            ]
+
+    def build_from_groups(
+        self,
+        groups: dict[str, list[str]],
+        keywords: list[str],
+        embeddings: np.ndarray,
+    ) -> None:
+        """
+        Indexes the keyword groups, representing each group by the normalized
+        mean of the embeddings of its keywords.
+
+        Args:
+            groups (dict[str, list[str]]): The keyword groups.
+            keywords (list[str]): The keywords of the `embeddings` rows.
+            embeddings (np.ndarray): A matrix with one embedding row per keyword.
+        """
+        embeddings = self._normalize(embeddings)
+        keyword_rows = {keyword: row for row, keyword in enumerate(keywords)}
+        names = []
+        centroids = []
+        for group_name, group_keywords in groups.items():
+            rows = [keyword_rows[k] for k in group_keywords if k in keyword_rows]
+            if rows:
+                names.append(group_name)
+                centroids.append(embeddings[rows].mean(axis=0))
+        if centroids:
+            self.build(names, np.vstack(centroids))
+        else:
+            self.build([], np.empty((0, embeddings.shape[1]), dtype=np.float32))
+
+    def _top_k(self, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, scores.shape[1])
+        columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, columns, axis=1)
+        return columns, top_scores
+
+    def _exact_search(
+        self, queries: np.ndarray, k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self._names), self._block_size):
+            block = self._embeddings[start : start + self._block_size]
+            columns, scores = self._top_k(queries @ block.T, k)
+            best_rows = np.hstack([best_rows, columns + start])
+            best_scores = np.hstack([best_scores, scores])
+            columns, best_scores = self._top_k(best_scores, k)
+            best_rows = np.take_along_axis(best_rows, columns, axis=1)
+        return best_rows, best_scores
+
+    def _approximate_search(
+        self, queries: np.ndarray, k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        n_probe = min(self._n_probe, len(self._centroids))
+        probes, _ = self._top_k(queries @ self._centroids.T, n_probe)
+        all_rows = []
+        all_scores = []
+        for query, query_probes in zip(queries, probes):
+            candidates = np.concatenate([self._inverted_lists[p] for p in query_probes])
+            scores = self._embeddings[candidates] @ query
+            columns, top_scores = self._top_k(scores.reshape(1, -1), k)
+            all_rows.append(candidates[columns[0]])
+            all_scores.append(top_scores[0])
+        return all_rows, all_scores
+
+    def search(
+        self, query_embeddings: np.ndarray, k: int = 10
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Finds the `k` indexed items most similar to each query embedding.
+
+        Args:
+            query_embeddings (np.ndarray): One query embedding or a matrix with one query per row.
+            k (int, optional): Number of results per query. Defaults to 10.
+
+        Returns:
+            list[list[tuple[str, float]]]: For each query, a list of (name, cosine similarity)
+            tuples sorted from the most to the least similar.
+        """
+        queries = self._normalize(query_embeddings)
+        if not self._names or k <= 0:
+            return [[] for _ in queries]
+
+        if self.is_approximate:
+            rows, scores = self._approximate_search(queries, k)
+        else:
+            rows, scores = self._exact_search(queries, k)
+
+        results = []
+        for query_rows, query_scores in zip(rows, scores):
+            order = np.argsort(-query_scores, kind="stable")
+            results.append(
+                [(self._names[query_rows[i]], float(query_scores[i])) for i in order]
+            )
+        return results
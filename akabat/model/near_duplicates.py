@@ -0,0 +1,345 @@
+import re
+
+import numpy as np
+
+from .keyword_groups import UnionFind
+
+_DIGITS = re.compile(r"\d+")
+
+
+class NearDuplicateDetector:
+
+    def __init__(
+        self,
+        normalize=None,
+        similarity_threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 4,
+        seed: int = 0,
+    ) -> None:
+        """
+        Initialize the NearDuplicateDetector, which finds the titles that are
+        the same paper written differently (casing, punctuation, accents, a
+        trailing period or a small typo) in sub-quadratic time:
+
+        1. The titles are normalized and the equal ones are joined directly.
+        2. A MinHash signature of the character shingles of every distinct
+           normalized title is computed with vectorized universal hashing.
+        3. The signatures are split in bands, and titles that share a band
+           are candidates (locality sensitive hashing).
+        4. Candidates are joined only if the Jaccard similarity of their
+           shingle sets reaches `similarity_threshold` and they have the same
+           numbers.
+
+        Args:
+            normalize (Callable[[str], str], optional): Normalizes a title. Defaults to None (lowercase).
+            similarity_threshold (float, optional): Minimum Jaccard similarity of the shingles of two duplicates. Defaults to 0.8.
+            num_perm (int, optional): Number of hash functions of the signatures. Defaults to 64.
+            bands (int, optional): Number of LSH bands, it must divide `num_perm`. Defaults to 16.
+            shingle_size (int, optional): Number of characters of a shingle. Defaults to 4.
+            seed (int, optional): Seed of the hash functions. Defaults to 0.
+        """
+        if num_perm % bands != 0:
+            raise ValueError("The number of bands must divide num_perm.")
+        self._normalize = normalize or str.lower
+        self.similarity_threshold: float = similarity_threshold
+        self.num_perm: int = num_perm
+        self.bands: int = bands
+        self.shingle_size: int = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd multipliers for multiply-shift hashing modulo 2**64
+        self._multipliers: np.ndarray = rng.integers(
+            1, 2**63, size=num_perm, dtype=np.uint64
+        ) * np.uint64(2) + np.uint64(1)
+        self._increments: np.ndarray = rng.integers(
+            0, 2**63, size=num_perm, dtype=np.uint64
+        )
+        self._band_multipliers: np.ndarray = rng.integers(
+            1, 2**63, size=num_perm // bands, dtype=np.uint64
+        )
+
+    def _shingles(self, title: str) -> set[str]:
+        title = title.ljust(self.shingle_size)
+        return {
+            title[i : i + self.shingle_size]
+            for i in range(len(title) - self.shingle_size + 1)
+        }
+
+    def _shingle_hashes(self, titles: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Hashes the character shingles of all the titles at once with a
+        polynomial rolling hash over their concatenated UTF-8 bytes.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The shingle hashes of all the titles
+            (uint64) and the offset of the first shingle of every title.
+        """
+        k = self.shingle_size
+        encoded = [title.encode("utf-8").ljust(k) for title in titles]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+        rolling = np.zeros(len(buffer) - k + 1, dtype=np.uint64)
+        for j in range(k):
+            rolling = (
+                rolling * np.uint64(1_000_003) + buffer[j : len(buffer) - k + 1 + j]
+            )
+
+        # Shingles crossing the boundary of two titles are skipped
+        counts = lengths - k + 1
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        positions = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        hashes = rolling[positions]
+        # Spread the bits before the multiply-shift hashing
+        hashes ^= hashes >> np.uint64(31)
+        hashes *= np.uint64(0x9E3779B97F4A7C15)
+        hashes ^= hashes >> np.uint64(29)
+        return hashes, offsets
+
+    def signatures(self, titles: list[str], block_size: int = 1 << 17) -> np.ndarray:
+        """
+        Computes the MinHash signatures of normalized titles.
+
+        Args:
+            titles (list[str]): The normalized titles.
+            block_size (int, optional): Approximate number of shingles hashed at once,
+            which bounds the temporary memory. Defaults to 1 << 17.
+
+        Returns:
+            np.ndarray: A (len(titles), num_perm) uint32 matrix.
+        """
+        hashes, offsets = self._shingle_hashes(titles)
+        signatures = np.empty((len(titles), self.num_perm), dtype=np.uint32)
+        first = 0
+        while first < len(titles):
+            last = int(np.searchsorted(offsets, offsets[first] + block_size, "right"))
+            last = min(max(last - 1, first + 1), len(titles))
+            block = hashes[offsets[first] : offsets[last]]
+            # One row per hash function, so the minimum runs over contiguous memory
+            values = (
+                (
+                    self._multipliers[:, None] * block[None, :]
+                    + self._increments[:, None]
+                )
+                >> np.uint64(32)
+            ).astype(np.uint32)
+            signatures[first:last] = np.minimum.reduceat(
+                values, offsets[first:last] - offsets[first], axis=1
+            ).T
+            first = last
+        return signatures
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        Hashes every band of the signatures, titles with an equal band key
+        are LSH candidates.
+
+        Returns:
+            np.ndarray: A (len(signatures), bands) uint64 matrix.
+        """
+        rows = self.num_perm // self.bands
+        keys = np.empty((len(signatures), self.bands), dtype=np.uint64)
+        for band in range(self.bands):
+            keys[:, band] = (
+                signatures[:, band * rows : (band + 1) * rows].astype(np.uint64)
+                * self._band_multipliers[None, :]
+            ).sum(axis=1)
+        return keys
+
+    def _candidate_pairs(self, signatures: np.ndarray) -> np.ndarray:
+        n = len(signatures)
+        band_keys = self.band_keys(signatures)
+        pairs = []
+        for band in range(self.bands):
+            keys = band_keys[:, band]
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            bucket_starts = np.flatnonzero(
+                np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]])
+            )
+            bucket_sizes = np.diff(np.concatenate([bucket_starts, [n]]))
+            shared = bucket_sizes > 1
+            if not shared.any():
+                continue
+
+            # Every title of a bucket is compared with the first one, so the
+            # number of pairs is linear. Each band has other buckets, so a group
+            # of duplicates gets several anchors.
+            starts, sizes = bucket_starts[shared], bucket_sizes[shared]
+            anchors = np.repeat(starts, sizes - 1)
+            members = anchors + (
+                np.arange(len(anchors))
+                - np.repeat(np.cumsum(sizes - 1) - (sizes - 1), sizes - 1)
+                + 1
+            )
+            pairs.append(np.stack([order[anchors], order[members]], axis=1))
+
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        pairs = np.sort(np.concatenate(pairs), axis=1)
+        return np.unique(pairs, axis=0)
+
+    def find(self, titles: list[str]) -> np.ndarray:
+        """
+        Finds the near-duplicated titles.
+
+        Args:
+            titles (list[str]): The titles.
+
+        Returns:
+            np.ndarray: For every title, the index of the first title of its group
+            of duplicates (its own index if it has no duplicate).
+        """
+        sets = UnionFind(len(titles))
+        first_by_normalized: dict[str, int] = {}
+        distinct: list[int] = []
+        normalized: list[str] = []
+        for i, title in enumerate(titles):
+            title = self._normalize(str(title))
+            normalized.append(title)
+            if not title:
+                continue
+            first = first_by_normalized.setdefault(title, i)
+            if first == i:
+                distinct.append(i)
+            else:
+                sets.union(first, i)
+
+        if len(distinct) > 1:
+            distinct_titles = [normalized[i] for i in distinct]
+            signatures = self.signatures(distinct_titles)
+            pairs = self._candidate_pairs(signatures)
+
+            # Titles that only differ in a number ("part 1", "part 2") are different papers
+            numbers = np.fromiter(
+                (hash(tuple(_DIGITS.findall(title))) for title in distinct_titles),
+                dtype=np.int64,
+                count=len(distinct_titles),
+            )
+            pairs = pairs[numbers[pairs[:, 0]] == numbers[pairs[:, 1]]]
+            # The share of equal signature values estimates the Jaccard similarity,
+            # so the pairs far below the threshold are not verified
+            estimates = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(
+                axis=1
+            )
+            pairs = pairs[estimates >= self.similarity_threshold - 0.2]
+
+            for a, b in pairs:
+                a, b = distinct[a], distinct[b]
+                if sets.find(a) == sets.find(b):
+                    continue
+                shingles_a = self._shingles(normalized[a])
+                shingles_b = self._shingles(normalized[b])
+                similarity = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+                if similarity >= self.similarity_threshold:
+                    sets.union(a, b)
+
+        roots = np.fromiter(
+            (sets.find(i) for i in range(len(titles))),
+            dtype=np.int64,
+            count=len(titles),
+        )
+        firsts = np.full(len(titles), len(titles), dtype=np.int64)
+        np.minimum.at(firsts, roots, np.arange(len(titles)))
+        return firsts[roots]
+
+
+class NearDuplicateIndex:
+
+    def __init__(self, detector: NearDuplicateDetector) -> None:
+        """
+        Initialize the NearDuplicateIndex, the LSH band buckets of the titles of
+        a corpus without near duplicates. It is kept next to the corpus, so only
+        the signatures of a new import are computed and looked up, instead of
+        finding the near duplicates of the whole corpus again.
+
+        Papers are identified by their position in the corpus. The near
+        duplicates are never added, so the positions are those of the corpus
+        once they are dropped. Unlike `NearDuplicateDetector.find`, a new title
+        similar to two papers of the corpus does not join them.
+
+        Args:
+            detector (NearDuplicateDetector): Normalizes, hashes and compares the titles.
+        """
+        self._detector: NearDuplicateDetector = detector
+        self._size: int = 0
+        self._first_by_normalized: dict[str, int] = {}
+        self._normalized_by_position: dict[int, str] = {}
+        # For every band, the position of the first paper of every band key
+        self._buckets: list[dict[int, int]] = [{} for _ in range(detector.bands)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _similar(self, title: str, band_keys: list[int]) -> int:
+        detector = self._detector
+        numbers = _DIGITS.findall(title)
+        shingles = None
+        checked = set()
+        for band, key in enumerate(band_keys):
+            position = self._buckets[band].get(key)
+            if position is None or position in checked:
+                continue
+            checked.add(position)
+            other = self._normalized_by_position[position]
+            if _DIGITS.findall(other) != numbers:
+                continue
+            if shingles is None:
+                shingles = detector._shingles(title)
+            other_shingles = detector._shingles(other)
+            similarity = len(shingles & other_shingles) / len(shingles | other_shingles)
+            if similarity >= detector.similarity_threshold:
+                return position
+        return None
+
+    def add(self, titles: list[str]) -> np.ndarray:
+        """
+        Appends the titles to the corpus, except the near duplicates of a paper
+        of the corpus or of a previous title of `titles`.
+
+        Args:
+            titles (list[str]): The titles of the new papers.
+
+        Returns:
+            np.ndarray: For every title, the position of the paper it is a near
+            duplicate of, or -1 if it was appended (at the next position).
+        """
+        detector = self._detector
+        normalized = [detector._normalize(str(title)) for title in titles]
+        # Only the titles that are not already in the corpus are hashed
+        distinct = list(
+            dict.fromkeys(
+                title
+                for title in normalized
+                if title and title not in self._first_by_normalized
+            )
+        )
+        row_by_title = {title: row for row, title in enumerate(distinct)}
+        band_keys = (
+            detector.band_keys(detector.signatures(distinct))
+            if distinct
+            else np.empty((0, detector.bands), dtype=np.uint64)
+        )
+
+        firsts = np.full(len(titles), -1, dtype=np.int64)
+        for i, title in enumerate(normalized):
+            first = None
+            if title:
+                first = self._first_by_normalized.get(title)
+                if first is None:
+                    keys = band_keys[row_by_title[title]].tolist()
+                    first = self._similar(title, keys)
+                    if first is None:
+                        self._first_by_normalized[title] = self._size
+                        self._normalized_by_position[self._size] = title
+                        for band, key in enumerate(keys):
+                            self._buckets[band].setdefault(key, self._size)
+                    else:
+                        self._first_by_normalized[title] = first
+            if first is None:
+                self._size += 1
+            else:
+                firsts[i] = first
+        return firsts
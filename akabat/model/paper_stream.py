@@ -0,0 +1,121 @@
+from .bibliography import (
+    is_bibliography_file,
+    iter_bibliography_records,
+    records_to_frames,
+)
+from .title_index import TitleIndex
+
+
+class PaperStream:
+
+    def __init__(
+        self,
+        paper_loader,
+        file_paths: list[str],
+        excluded_keywords_at_csv_import: list[str],
+        excluded_starting_by_keywords_at_csv_import: list[str],
+        import_columns_names: dict[str, str],
+        chunk_size: int = 50_000,
+        keyword_separator: str = ";",
+        separator: str = ",",
+        header: int = 0,
+        title_index: TitleIndex = None,
+        engine: str = "c",
+    ) -> None:
+        """
+        Initialize the PaperStream, an iterable over the papers of several CSV,
+        BibTeX or RIS files read in chunks, so the peak memory depends on `chunk_size` and not
+        on the size of the corpus. Every chunk is normalized like `import_csv`
+        and the papers whose title was already seen (in this chunk, in a
+        previous one or in `title_index`) are dropped. Only the title hashes
+        and the keyword counts are kept across chunks.
+
+        Args:
+            paper_loader (PaperLoader): The loader that normalizes the chunks.
+            file_paths (list[str]): The CSV, BibTeX (.bib) or RIS (.ris) files, read in order.
+            excluded_keywords_at_csv_import (list[str]): Keywords dropped at import.
+            excluded_starting_by_keywords_at_csv_import (list[str]): Prefixes of the keywords dropped at import.
+            import_columns_names (dict[str, str]): Names of the "title", "publication_year"
+            and "keywords" columns in the CSV files.
+            chunk_size (int, optional): Number of rows read at once. Defaults to 50_000.
+            keyword_separator (str, optional): The character that separates keywords. Defaults to ";".
+            separator (str, optional): The CSV separator. Defaults to ",".
+            header (int, optional): The row of the CSV header. Defaults to 0.
+            title_index (TitleIndex, optional): Index of the titles already imported,
+            updated in place. Defaults to None (empty).
+            engine (str, optional): The CSV parser, see `PaperLoader.read_csv`. Defaults to "c".
+        """
+        self._paper_loader = paper_loader
+        self._file_paths: list[str] = file_paths
+        self._excluded_keywords_at_csv_import: list[str] = (
+            excluded_keywords_at_csv_import
+        )
+        self._excluded_starting_by_keywords_at_csv_import: list[str] = (
+            excluded_starting_by_keywords_at_csv_import
+        )
+        self._import_columns_names: dict[str, str] = import_columns_names
+        self._chunk_size: int = chunk_size
+        self._keyword_separator: str = keyword_separator
+        self._separator: str = separator
+        self._header: int = header
+        self._title_index: TitleIndex = (
+            title_index if title_index is not None else TitleIndex()
+        )
+        self._engine: str = engine
+        self._rows: int = 0
+        self._duplicates: int = 0
+
+    @property
+    def rows(self) -> int:
+        """Number of papers yielded so far."""
+        return self._rows
+
+    @property
+    def duplicates(self) -> int:
+        """Number of duplicated papers dropped so far."""
+        return self._duplicates
+
+    @property
+    def title_index(self) -> TitleIndex:
+        return self._title_index
+
+    def unique_keywords(self) -> list[str]:
+        """The keywords sorted by number of papers, as `PaperLoader.get_unique_keywords`."""
+        return self._title_index.unique_keywords()
+
+    def _read_chunks(self):
+        for file_path in self._file_paths:
+            if is_bibliography_file(file_path):
+                # The records are parsed one at a time and grouped in chunks
+                yield from records_to_frames(
+                    iter_bibliography_records(file_path),
+                    self._import_columns_names,
+                    chunk_size=self._chunk_size,
+                    keyword_separator=self._keyword_separator,
+                )
+                continue
+            yield from self._paper_loader.iter_csv_chunks(
+                file_path,
+                self._import_columns_names,
+                chunk_size=self._chunk_size,
+                separator=self._separator,
+                header=self._header,
+                engine=self._engine,
+            )
+
+    def __iter__(self):
+        for chunk in self._read_chunks():
+            if chunk.empty:
+                continue
+            chunk = self._paper_loader.normalize_csv(
+                chunk,
+                excluded_keywords_at_csv_import=self._excluded_keywords_at_csv_import,
+                excluded_starting_by_keywords_at_csv_import=self._excluded_starting_by_keywords_at_csv_import,
+                import_columns_names=self._import_columns_names,
+                keyword_separator=self._keyword_separator,
+            )
+            chunk, duplicates = self._title_index.add(chunk)
+            self._duplicates += duplicates
+            self._rows += len(chunk)
+            if not chunk.empty:
+                yield chunk.reset_index(drop=True)
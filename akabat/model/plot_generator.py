@@ -1,9 +1,178 @@
+import hashlib
+import json
+import os
+import time
+
+import matplotlib
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
 from matplotlib.axes import Axes
 from matplotlib.figure import Figure
 
+from .data_handler import CheckpointHandler
+from .db_handler import DBHandler
+
+
+def plot_cache_key(df: pd.DataFrame, render_parameters: dict) -> str:
+    """
+    Returns the content address of a plot: a hash of the plotted DataFrame,
+    the render parameters and the plotting library versions.
+    """
+    sha256 = hashlib.sha256()
+    sha256.update(json.dumps(list(df.columns)).encode("utf-8"))
+    sha256.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    sha256.update(
+        json.dumps(
+            {
+                **render_parameters,
+                "matplotlib": matplotlib.__version__,
+                "seaborn": sns.__version__,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+    return sha256.hexdigest()
+
+
+class PlotManifest:
+
+    def __init__(self, plot_folder: str) -> None:
+        """
+        Initialize the PlotManifest, the record of the inputs that produced each
+        image of a plot folder, stored as "manifest.json" in the folder. It is
+        the index of the plot cache: a plot is not rendered again while its
+        cache key and the checksum of its image still match the manifest.
+
+        Args:
+            plot_folder (str): The folder of the plots.
+        """
+        self._file_path: str = f"{plot_folder}/manifest.json"
+        self._entries: dict[str, dict] = (
+            CheckpointHandler.load_from_json_file(self._file_path) or {}
+        )
+
+    @property
+    def entries(self) -> dict[str, dict]:
+        return self._entries
+
+    def get(self, save_file_path: str) -> dict:
+        return self._entries.get(os.path.basename(save_file_path))
+
+    def record(self, entry: dict) -> None:
+        self._entries[entry["file"]] = {
+            key: value for key, value in entry.items() if key != "rendered"
+        }
+
+    def save(self) -> None:
+        CheckpointHandler.write_to_json_file(self._entries, self._file_path)
+
+
+def render_trends_plot(
+    db_name: str,
+    save_file_path: str,
+    title: str,
+    limit: int = 10,
+    year_lower_bound: int = 2023,
+    year_upper_bound: int = 2024,
+    excluded_keywords: list[str] = None,
+    width: int = 12,
+    height: int = 8,
+    level: int = 0,
+    parent_group: str = None,
+    title_match: str = None,
+    cached_entry: dict = None,
+) -> dict:
+    """
+    Queries the top groups of the database and saves their trends line plot
+    without showing it, unless `cached_entry` shows that the file already holds
+    the same plot. It is a module function so it can run in a worker process.
+    The groups are taken from `level` of the group hierarchy, so a plot can
+    roll the keyword groups up to their parents or drill down into the
+    groups below `parent_group`, and `title_match` restricts the papers to the
+    titles with those terms.
+
+    Returns:
+        dict: The manifest entry of the plot, with the keys "file", "key",
+        "image_sha256", "inputs" and "rendered_at", plus "rendered" (False if the
+        render was skipped).
+    """
+    if not excluded_keywords:
+        excluded_keywords = []
+
+    db_handler = DBHandler(db_name)
+    df_top = db_handler.query_top_groups(
+        limit=limit,
+        year_lower_bound=year_lower_bound,
+        year_upper_bound=year_upper_bound,
+        excluded_keywords=excluded_keywords,
+        level=level,
+        parent_group=parent_group,
+        title_match=title_match,
+    )
+    df_trends = db_handler.query_trends_of_groups(
+        df_top, level=level, title_match=title_match
+    )
+
+    render_parameters = {
+        "title": title,
+        "excluded_keywords": sorted(excluded_keywords),
+        "width": width,
+        "height": height,
+    }
+    key = plot_cache_key(df_trends, render_parameters)
+    if (
+        cached_entry
+        and cached_entry.get("key") == key
+        and os.path.isfile(save_file_path)
+        and CheckpointHandler.file_checksum(save_file_path)
+        == cached_entry.get("image_sha256")
+    ):
+        return {**cached_entry, "rendered": False}
+
+    def write(temp_path: str) -> None:
+        PlotGenerator().generate_trends_lineplot(
+            df=df_trends,
+            title=title,
+            x_label="Publication Year",
+            y_label="Number of Papers",
+            excluded_keywords=excluded_keywords,
+            save_file_path=temp_path,
+            width=width,
+            height=height,
+            show=False,
+        )
+
+    CheckpointHandler._atomic_write(save_file_path, write)
+    return {
+        "file": os.path.basename(save_file_path),
+        "key": key,
+        "image_sha256": CheckpointHandler.file_checksum(save_file_path),
+        "inputs": {
+            "db_name": db_name,
+            "limit": limit,
+            "year_lower_bound": year_lower_bound,
+            "year_upper_bound": year_upper_bound,
+            "level": level,
+            "parent_group": parent_group,
+            "title_match": title_match,
+            "groups": list(df_top["name"]),
+            "rows": len(df_trends),
+            **render_parameters,
+        },
+        "rendered_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rendered": True,
+    }
+
+
+def _plot_folder(save_file_path: str) -> str:
+    return os.path.dirname(save_file_path) or "."
+
+
+def _render_trends_plot_spec(db_name: str, spec: dict) -> str:
+    return render_trends_plot(db_name=db_name, **spec)
+
 
 class PlotGenerator:
 
@@ -17,6 +186,7 @@ class PlotGenerator:
         save_file_path: str = None,
         width: int = 12,
         height: int = 8,
+        show: bool = True,
     ):
         """
         Given a pandas.DataFrame with "name", "publication_year" and "unique_paper_count"
@@ -33,22 +203,33 @@ class PlotGenerator:
             save_file_path (str, optional): Path of the resulting plot file. Defaults to None.
             width (int, optional): Width size of the resulting figure. Defaults to 12.
             height (int, optional): Height size of the resulting figure. Defaults to 8.
+            show (bool, optional): Show the figure with pyplot, which blocks until the window is closed.
+            If False, the figure is only saved and no GUI backend is used. Defaults to True.
         """
         if not excluded_keywords:
             excluded_keywords = []
 
         df_filtered = df[~df["name"].isin(excluded_keywords)]
 
-        _: Figure = plt.figure(figsize=(width, height))
+        if show:
+            fig: Figure = plt.figure(figsize=(width, height))
+        else:
+            # Not registered with pyplot, so no GUI backend is needed and the
+            # figure is freed as soon as it is no longer referenced
+            fig: Figure = Figure(figsize=(width, height))
         ax: Axes = sns.lineplot(
-            data=df_filtered, x="publication_year", y="unique_paper_count", hue="name"
+            data=df_filtered,
+            x="publication_year",
+            y="unique_paper_count",
+            hue="name",
+            ax=fig.add_subplot(),
         )
 
         ax.set_title(title)
         ax.set_xlabel(x_label)
         ax.set_ylabel(y_label)
 
-        plt.xticks(rotation=45)
+        ax.tick_params(axis="x", labelrotation=45)
 
         # Set x-axis ticks to integers
         ax.set_xticks(df["publication_year"].unique())
@@ -56,9 +237,136 @@ class PlotGenerator:
 
         ax.legend(title="Areas of research", bbox_to_anchor=(1.02, 1), loc="upper left")
 
-        plt.tight_layout()  # it is important to run when figure and legend are created
+        fig.tight_layout()  # it is important to run when figure and legend are created
 
         if save_file_path:
-            plt.savefig(save_file_path, bbox_inches="tight")
+            fig.savefig(save_file_path, bbox_inches="tight", format="png")
+
+        if show:
+            plt.show()
+            plt.close(fig)
+
+    def generate_emerging_topics_barplot(
+        self,
+        df: pd.DataFrame,
+        title: str,
+        metric: str = "emergence_score",
+        limit: int = 20,
+        save_file_path: str = None,
+        width: int = 12,
+        height: int = 8,
+        show: bool = True,
+    ):
+        """
+        Given the ranking of `TrendAnalyzer.analyze`, this function plots a horizontal
+        bar chart of the `limit` keyword groups with the highest `metric`, annotated
+        with the growth rate of their share.
+
+        Args:
+            df (pd.DataFrame): The pandas.DataFrame returned by `TrendAnalyzer.analyze`.
+            title (str): Title of the resulting plot.
+            metric (str, optional): The plotted column. Defaults to "emergence_score".
+            limit (int, optional): Number of keyword groups. Defaults to 20.
+            save_file_path (str, optional): Path of the resulting plot file. Defaults to None.
+            width (int, optional): Width size of the resulting figure. Defaults to 12.
+            height (int, optional): Height size of the resulting figure. Defaults to 8.
+            show (bool, optional): Show the figure with pyplot, which blocks until the window is closed.
+            If False, the figure is only saved and no GUI backend is used. Defaults to True.
+        """
+        df_top = df.nlargest(limit, metric)
+
+        if show:
+            fig: Figure = plt.figure(figsize=(width, height))
+        else:
+            fig: Figure = Figure(figsize=(width, height))
+        ax: Axes = sns.barplot(
+            data=df_top,
+            x=metric,
+            y="name",
+            orient="h",
+            ax=fig.add_subplot(),
+        )
+        for patch, growth_rate in zip(ax.patches, df_top["growth_rate"]):
+            ax.annotate(
+                f"{growth_rate:+.0%}",
+                (patch.get_width(), patch.get_y() + patch.get_height() / 2),
+                xytext=(4, 0),
+                textcoords="offset points",
+                va="center",
+                fontsize="small",
+            )
+
+        ax.set_title(title)
+        ax.set_xlabel(metric.replace("_", " ").capitalize())
+        ax.set_ylabel("Areas of research")
+
+        fig.tight_layout()
+
+        if save_file_path:
+            fig.savefig(save_file_path, bbox_inches="tight", format="png")
+
+        if show:
+            plt.show()
+            plt.close(fig)
+
+    def render_trends_plots(
+        self,
+        db_name: str,
+        specs: list[dict],
+        max_workers: int = None,
+        use_cache: bool = True,
+    ) -> list[dict]:
+        """
+        Renders a batch of trends line plots straight to their files, without
+        showing them, spread across a process pool. Each worker queries the
+        database itself and its figures never reach the pyplot state, so
+        nothing needs a display and no figure is kept alive. Plots whose
+        query result and render parameters match the manifest of their folder
+        are skipped, and the manifests are updated with the rendered plots.
+
+        Args:
+            db_name (str): Path of the SQLite database.
+            specs (list[dict]): One dict per plot with the keyword arguments of `render_trends_plot`
+            ("save_file_path", "title", "limit", "year_lower_bound", "year_upper_bound",
+            "excluded_keywords", "width", "height", "level", "parent_group" and "title_match").
+            max_workers (int, optional): Number of worker processes. Defaults to None (one per CPU).
+            use_cache (bool, optional): Skip the plots that did not change. Defaults to True.
+
+        Returns:
+            list[dict]: The manifest entries of the plots, in the order of `specs`.
+            Their "rendered" key is False for the skipped plots.
+        """
+        if not specs:
+            return []
+
+        manifests: dict[str, PlotManifest] = {}
+        for spec in specs:
+            folder = _plot_folder(spec["save_file_path"])
+            if folder not in manifests:
+                manifests[folder] = PlotManifest(folder)
+        if use_cache:
+            specs = [
+                {
+                    **spec,
+                    "cached_entry": manifests[_plot_folder(spec["save_file_path"])].get(
+                        spec["save_file_path"]
+                    ),
+                }
+                for spec in specs
+            ]
+
+        if max_workers == 1 or len(specs) == 1:
+            entries = [_render_trends_plot_spec(db_name, spec) for spec in specs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(_render_trends_plot_spec, db_name, spec)
+                    for spec in specs
+                ]
+                entries = [future.result() for future in futures]
 
-        plt.show()
+        for spec, entry in zip(specs, entries):
+            manifests[_plot_folder(spec["save_file_path"])].record(entry)
+        for manifest in manifests.values():
+            manifest.save()
+        return entries
@@ -0,0 +1,132 @@
+import functools
+import inspect
+import threading
+
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class QueryCache:
+
+    def __init__(
+        self, enabled: bool = True, max_entries: int = 128, max_megabytes: float = 64
+    ) -> None:
+        """
+        Initialize the QueryCache, a least recently used cache of query result
+        DataFrames bounded by number of entries and by memory. It is thread
+        safe, so concurrent readers can share it.
+
+        Args:
+            enabled (bool, optional): Cache the query results. Defaults to True.
+            max_entries (int, optional): Maximum number of cached results. Defaults to 128.
+            max_megabytes (float, optional): Maximum memory used by the cached results. Defaults to 64.
+        """
+        self.enabled: bool = enabled
+        self.max_entries: int = max_entries
+        self.max_bytes: int = int(max_megabytes * 1024 * 1024)
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> pd.DataFrame:
+        """
+        Returns a copy of the cached result of `key`, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return entry[0].copy()
+
+    def put(self, key, df: pd.DataFrame) -> None:
+        """
+        Caches a copy of `df`, evicting the least recently used results to stay
+        within the bounds. Results bigger than the memory bound are not cached.
+        """
+        if not self.enabled:
+            return
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        df = df.copy()
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": self._hits / lookups if lookups else None,
+        }
+
+
+def _normalize_argument(value):
+    # Group lists are filters, so their order and duplicates do not change the result
+    if isinstance(value, pd.DataFrame):
+        if "name" in value.columns:
+            return ("names", tuple(sorted(set(map(str, value["name"])))))
+        return ("hash", pd.util.hash_pandas_object(value).sum())
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(set(map(str, value))))
+    return value
+
+
+def cached_query(method):
+    """
+    Decorator that caches the DataFrame returned by a DBHandler query method
+    in the `_query_cache` of its instance. The cache key is built from the
+    method name, its normalized arguments (defaults applied, lists treated as
+    sets and DataFrames by their "name" column) and the database version.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache: QueryCache = getattr(self, "_query_cache", None)
+        if cache is None or not cache.enabled:
+            return method(self, *args, **kwargs)
+
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        key = (
+            method.__name__,
+            tuple(
+                (name, _normalize_argument(value))
+                for name, value in list(arguments.arguments.items())[1:]
+            ),
+            self.database_version(),
+        )
+        result = cache.get(key)
+        self._instrumentation.cache_event("query results", hit=result is not None)
+        if result is None:
+            result = method(self, *args, **kwargs)
+            cache.put(key, result)
+        return result
+
+    return wrapper
@@ -0,0 +1,148 @@
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+
+class QueryTracer:
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        slow_query_threshold_ms: float = 100.0,
+        explain: bool = True,
+        max_slow_queries: int = 100,
+    ) -> None:
+        """
+        Initialize the QueryTracer, which times the SQL statements run by the
+        DBHandler, keeps a log of the slow ones with their bound parameters and
+        captures their EXPLAIN QUERY PLAN output to flag full table scans.
+
+        Args:
+            enabled (bool, optional): Trace the statements. Defaults to False.
+            slow_query_threshold_ms (float, optional): Statements slower than this are logged. Defaults to 100.0.
+            explain (bool, optional): Capture the query plan of the slow SELECT statements. Defaults to True.
+            max_slow_queries (int, optional): Maximum number of slow statements kept in the log. Defaults to 100.
+        """
+        self.enabled: bool = enabled
+        self.slow_query_threshold_ms: float = slow_query_threshold_ms
+        self.explain: bool = explain
+        self.max_slow_queries: int = max_slow_queries
+        self._statements: dict[str, dict] = {}
+        self._slow_queries: list[dict] = []
+
+    @staticmethod
+    def _normalize(sql: str) -> str:
+        return re.sub(r"\s+", " ", sql).strip()
+
+    @staticmethod
+    def full_scans(plan: list[str]) -> list[str]:
+        """
+        Returns the tables that the query plan reads with a full scan (a SCAN
+        step that does not use an index).
+        """
+        tables = []
+        for detail in plan:
+            match = re.match(r"SCAN (?:TABLE )?(\w+)", detail)
+            if match and "INDEX" not in detail:
+                tables.append(match.group(1))
+        return tables
+
+    def explain_query_plan(
+        self, conn: sqlite3.Connection, sql: str, params: tuple = ()
+    ) -> list[str]:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [row[-1] for row in rows]
+
+    def trace(self, conn: sqlite3.Connection, sql: str, params, run):
+        """
+        Runs `run()`, which executes `sql`, recording its duration.
+
+        Args:
+            conn (sqlite3.Connection): The connection that runs the statement.
+            sql (str): The SQL statement.
+            params: The bound parameters of the statement.
+            run (Callable[[], Any]): Executes the statement.
+
+        Returns:
+            The result of `run()`.
+        """
+        if not self.enabled:
+            return run()
+
+        start = time.perf_counter()
+        result = run()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        normalized_sql = self._normalize(sql)
+        statement = self._statements.setdefault(
+            normalized_sql,
+            {"sql": normalized_sql, "calls": 0, "total_ms": 0.0, "max_ms": 0.0},
+        )
+        statement["calls"] += 1
+        statement["total_ms"] += elapsed_ms
+        statement["max_ms"] = max(statement["max_ms"], elapsed_ms)
+
+        if (
+            elapsed_ms >= self.slow_query_threshold_ms
+            and len(self._slow_queries) < self.max_slow_queries
+        ):
+            plan = []
+            if self.explain and normalized_sql.upper().startswith(("SELECT", "WITH")):
+                plan = self.explain_query_plan(conn, sql, params or ())
+            self._slow_queries.append(
+                {
+                    "sql": normalized_sql,
+                    "params": list(params) if params else [],
+                    "elapsed_ms": elapsed_ms,
+                    "query_plan": plan,
+                    "full_scans": self.full_scans(plan),
+                }
+            )
+        return result
+
+    @property
+    def slow_queries(self) -> list[dict]:
+        return self._slow_queries
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Returns a pandas.DataFrame with one row per distinct statement and the
+        columns "sql", "calls", "total_ms", "mean_ms", "max_ms", "slow_calls"
+        and "full_scans", sorted by total time.
+        """
+        slow_calls: dict[str, int] = {}
+        full_scans: dict[str, set[str]] = {}
+        for slow_query in self._slow_queries:
+            slow_calls[slow_query["sql"]] = slow_calls.get(slow_query["sql"], 0) + 1
+            full_scans.setdefault(slow_query["sql"], set()).update(
+                slow_query["full_scans"]
+            )
+
+        rows = [
+            {
+                **statement,
+                "mean_ms": statement["total_ms"] / statement["calls"],
+                "slow_calls": slow_calls.get(sql, 0),
+                "full_scans": ", ".join(sorted(full_scans.get(sql, ()))),
+            }
+            for sql, statement in self._statements.items()
+        ]
+        df = pd.DataFrame(
+            rows,
+            columns=[
+                "sql",
+                "calls",
+                "total_ms",
+                "mean_ms",
+                "max_ms",
+                "slow_calls",
+                "full_scans",
+            ],
+        )
+        return df.sort_values("total_ms", ascending=False, ignore_index=True)
+
+    def reset(self) -> None:
+        self._statements = {}
+        self._slow_queries = []
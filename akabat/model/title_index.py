@@ -0,0 +1,127 @@
+import hashlib
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalizes a title for deduplication: casing, repeated spaces and a
+    trailing period do not make two titles different.
+    """
+    return " ".join(str(title).casefold().split()).rstrip(".")
+
+
+def hash_title(title: str) -> int:
+    """
+    Returns a 64-bit hash of a normalized paper title, used as the key of the
+    papers to deduplicate and join them without comparing the titles. It fits
+    a signed SQLite INTEGER.
+    """
+    digest = hashlib.blake2b(
+        normalize_title(title).encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def hash_titles(titles: pd.Series) -> pd.Series:
+    """Returns the `hash_title` of every title as an int64 pandas.Series."""
+    return pd.Series(
+        np.fromiter(map(hash_title, titles), dtype=np.int64, count=len(titles)),
+        index=titles.index,
+    )
+
+
+class TitleIndex:
+
+    def __init__(self, df: pd.DataFrame = None) -> None:
+        """
+        Initialize the TitleIndex, the set of title hashes of a corpus along with
+        the number of papers of every keyword. It is kept next to the corpus, so
+        a new import is deduplicated and counted in O(new papers) instead of
+        concatenating and deduplicating the whole corpus again.
+
+        Args:
+            df (pd.DataFrame, optional): The papers already in the corpus, with
+            "title" and "keywords" columns. Defaults to None.
+        """
+        self._hashes: set[int] = set()
+        self._keyword_counts: Counter = Counter()
+        if df is not None:
+            self.add(df)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, title: str) -> bool:
+        return hash_title(title) in self._hashes
+
+    def contains_hash(self, title_hash: int) -> bool:
+        return int(title_hash) in self._hashes
+
+    def add(self, df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+        """
+        Adds the papers whose title is not in the index (keeping the first of
+        the repeated titles of `df`) and counts their keywords.
+
+        Args:
+            df (pd.DataFrame): The papers, with "title" (or "title_hash") and "keywords" columns.
+
+        Returns:
+            tuple[pd.DataFrame, int]: The new papers and the number of duplicated papers dropped.
+        """
+        if "title_hash" in df.columns:
+            hashes = df["title_hash"]
+        else:
+            hashes = hash_titles(df["title"])
+        seen = self._hashes
+        new = ~hashes.duplicated() & ~hashes.map(seen.__contains__).astype(bool)
+        seen.update(hashes[new])
+        df = df[new.values]
+        for keywords in df["keywords"]:
+            self._keyword_counts.update(keywords)
+        return df, int((~new).sum())
+
+    def update_keyword_counts(
+        self, added: list[str] = (), removed: list[str] = ()
+    ) -> None:
+        """
+        Updates the keyword counts after the keyword lists of the corpus changed
+        (e.g. when a near duplicate was merged into another paper). The title
+        hashes are kept, so the titles of the merged papers still count as
+        imported.
+
+        Args:
+            added (list[str], optional): Keywords that a paper got. Defaults to ().
+            removed (list[str], optional): Keywords that a paper lost (or of a dropped paper). Defaults to ().
+        """
+        self._keyword_counts.update(added)
+        self._keyword_counts.subtract(removed)
+        for keyword in removed:
+            if self._keyword_counts.get(keyword, 1) <= 0:
+                del self._keyword_counts[keyword]
+
+    def keyword_counts(self, excluded_keywords: list[str] = None) -> pd.Series:
+        """
+        Returns the number of papers of every keyword, sorted in descending order
+        as `PaperLoader.get_keyword_counts` (ties in order of first appearance).
+        """
+        if not excluded_keywords:
+            excluded_keywords = []
+        excluded_keywords = set(excluded_keywords)
+        counts = [
+            (keyword, count)
+            for keyword, count in self._keyword_counts.most_common()
+            if keyword not in excluded_keywords
+        ]
+        return pd.Series(
+            [count for _, count in counts],
+            index=[keyword for keyword, _ in counts],
+            dtype="int64",
+        )
+
+    def unique_keywords(self, excluded_keywords: list[str] = None) -> list[str]:
+        """The keywords sorted by number of papers, as `PaperLoader.get_unique_keywords`."""
+        return list(self.keyword_counts(excluded_keywords).index)
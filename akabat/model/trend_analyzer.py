@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+TREND_METRICS = ("growth_rate", "slope", "burst_score", "emergence_score")
+
+
+class TrendAnalyzer:
+
+    def __init__(self, window: int = 5, min_papers: int = 5) -> None:
+        """
+        Initialize the TrendAnalyzer, which finds the emerging keyword groups
+        from their number of papers per year. The counts are laid out in a
+        dense group×year matrix and every metric is computed for all the
+        groups at once with NumPy:
+
+        - share: the papers of the group in a year divided by the papers of
+          that year, so the growth of the whole field is not a trend.
+        - growth_rate: relative change of the mean share of the last `window`
+          years against the `window` years before.
+        - slope: least squares slope of the share over the last `window` years.
+        - burst_score: how many standard deviations the mean share of the last
+          `window` years is above the mean share of the earlier years.
+        - emergence_score: mean of the percentile ranks of the three metrics.
+
+        Args:
+            window (int, optional): Number of recent years. Defaults to 5.
+            min_papers (int, optional): Groups with fewer papers are skipped. Defaults to 5.
+        """
+        if window < 1:
+            raise ValueError("The window must be at least one year.")
+        self.window: int = window
+        self.min_papers: int = min_papers
+
+    def count_matrix(
+        self, df_counts: pd.DataFrame, years: np.ndarray = None
+    ) -> tuple[pd.Index, np.ndarray, np.ndarray]:
+        """
+        Builds the dense group×year matrix of paper counts.
+
+        Args:
+            df_counts (pd.DataFrame): The "name", "publication_year" and "unique_paper_count"
+            columns, as returned by `DBHandler.query_group_year_counts`.
+            years (np.ndarray, optional): The years of the columns. Defaults to every
+            year from the first to the last year of `df_counts`.
+
+        Returns:
+            tuple[pd.Index, np.ndarray, np.ndarray]: The group names (rows), the years
+            (columns) and the int64 count matrix.
+        """
+        codes, names = pd.factorize(df_counts["name"])
+        publication_years = df_counts["publication_year"].to_numpy(dtype=np.int64)
+        if years is None:
+            if len(publication_years) == 0:
+                years = np.empty(0, dtype=np.int64)
+            else:
+                years = np.arange(publication_years.min(), publication_years.max() + 1)
+        # The counts of the years that are not columns are left out
+        if len(years):
+            year_indexes = np.minimum(
+                np.searchsorted(years, publication_years), len(years) - 1
+            )
+            known = years[year_indexes] == publication_years
+        else:
+            year_indexes = np.zeros(len(publication_years), dtype=np.int64)
+            known = np.zeros(len(publication_years), dtype=bool)
+
+        cells = codes[known] * len(years) + year_indexes[known]
+        matrix = np.bincount(
+            cells,
+            weights=df_counts["unique_paper_count"].to_numpy()[known],
+            minlength=len(names) * len(years),
+        )
+        return names, years, matrix.astype(np.int64).reshape(len(names), len(years))
+
+    def analyze(
+        self,
+        df_counts: pd.DataFrame,
+        papers_per_year: pd.DataFrame = None,
+        rank_by: str = "emergence_score",
+    ) -> pd.DataFrame:
+        """
+        Ranks the keyword groups by how much they are growing.
+
+        Args:
+            df_counts (pd.DataFrame): The "name", "publication_year" and "unique_paper_count"
+            columns, as returned by `DBHandler.query_group_year_counts`.
+            papers_per_year (pd.DataFrame, optional): The "publication_year" and "paper_count"
+            columns, as returned by `DBHandler.query_papers_per_year`. Defaults to None
+            (the sum of the group counts of every year).
+            rank_by (str, optional): The metric that sorts the groups, one of TREND_METRICS.
+            Defaults to "emergence_score".
+
+        Returns:
+            pd.DataFrame: One row per group with the columns "name", "total_paper_count",
+            "recent_paper_count", "recent_share", "previous_share", "growth_rate", "slope",
+            "burst_score" and "emergence_score", sorted by `rank_by` in descending order.
+        """
+        if rank_by not in TREND_METRICS:
+            raise ValueError(f"Unknown trend metric: {rank_by}")
+        names, years, counts = self.count_matrix(df_counts)
+
+        if papers_per_year is not None:
+            year_totals = (
+                papers_per_year.set_index("publication_year")["paper_count"]
+                .reindex(years, fill_value=0)
+                .to_numpy(dtype=np.float64)
+            )
+        else:
+            year_totals = counts.sum(axis=0).astype(np.float64)
+        shares = np.divide(
+            counts,
+            year_totals,
+            out=np.zeros(counts.shape, dtype=np.float64),
+            where=year_totals > 0,
+        )
+        # Share of a single paper, which smooths the ratios of small groups
+        alpha = (
+            1 / year_totals[year_totals > 0].mean() if (year_totals > 0).any() else 1
+        )
+
+        # The recent years are at most half of the years
+        window = min(self.window, max(len(years) // 2, 1))
+        recent = shares[:, -window:]
+        previous = shares[:, -2 * window : -window]
+        baseline = shares[:, :-window]
+
+        recent_share = recent.mean(axis=1) if recent.shape[1] else np.zeros(len(names))
+        previous_share = (
+            previous.mean(axis=1) if previous.shape[1] else np.zeros(len(names))
+        )
+        growth_rate = (recent_share + alpha) / (previous_share + alpha) - 1
+
+        steps = np.arange(recent.shape[1]) - (recent.shape[1] - 1) / 2
+        slope = (
+            recent @ steps / (steps @ steps)
+            if recent.shape[1] > 1
+            else np.zeros(len(names))
+        )
+
+        if baseline.shape[1]:
+            burst_score = (recent_share - baseline.mean(axis=1)) / (
+                baseline.std(axis=1) + alpha
+            )
+        else:
+            burst_score = np.zeros(len(names))
+
+        result = pd.DataFrame(
+            {
+                "name": names,
+                "total_paper_count": counts.sum(axis=1),
+                "recent_paper_count": counts[:, -window:].sum(axis=1),
+                "recent_share": recent_share,
+                "previous_share": previous_share,
+                "growth_rate": growth_rate,
+                "slope": slope,
+                "burst_score": burst_score,
+            }
+        )
+        result = result[result["total_paper_count"] >= self.min_papers]
+        result = result.assign(
+            emergence_score=result[["growth_rate", "slope", "burst_score"]]
+            .rank(pct=True)
+            .mean(axis=1)
+        )
+        return result.sort_values(
+            [rank_by, "total_paper_count"], ascending=False, kind="stable"
+        ).reset_index(drop=True)
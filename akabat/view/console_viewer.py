@@ -1,5 +1,7 @@
 import os
 
+import pandas as pd
+
 
 class ConsoleViewer:
     def __init__(self) -> None:
@@ -45,6 +47,9 @@ class ConsoleViewer:
     def ask_keyword(self, prompt: str = "Enter the keyword: ") -> str:
         return self.validate_user_input(prompt)
 
+    def ask_search_query(self, prompt: str = "Search similar keywords to: ") -> str:
+        return self.validate_user_input(prompt)
+
     def ask_number_clusters(
         self,
         prompt: str = "Number of keywords groups (0 to apply distance threshold): ",
@@ -54,6 +59,18 @@ class ConsoleViewer:
     def ask_distance_threshold(self, prompt: str = "Distance threshold: ") -> int:
         return self.validate_float_user_input(prompt)
 
+    def ask_distance_thresholds(
+        self,
+        prompt: str = "Enter the distance thresholds separated by a comma (empty for defaults). Example: 1.5, 1.9, 2.5\nThresholds: ",
+    ) -> list[float]:
+        return self.validate_float_list_user_input(prompt)
+
+    def ask_cluster_counts(
+        self,
+        prompt: str = "Enter the numbers of keywords groups separated by a comma (empty to skip). Example: 100, 500\nNumbers of groups: ",
+    ) -> list[int]:
+        return [int(number) for number in self.validate_float_list_user_input(prompt)]
+
     def ask_keyword_groups(
         self,
         prompt: str = "Enter the groups separated by a comma. Example: federated learning, machine learning\nGroups to merge: ",
@@ -85,6 +102,20 @@ class ConsoleViewer:
                     break
         return user_number
 
+    def validate_float_list_user_input(self, prompt: str) -> list[float]:
+        user_numbers = None
+        while user_numbers is None:
+            user_input = self.validate_user_input(prompt)
+            if not user_input:  # [exit] or empty
+                return []
+            try:
+                user_numbers = [
+                    float(number) for number in user_input.split(",") if number.strip()
+                ]
+            except ValueError:
+                user_numbers = None
+        return user_numbers
+
     def validate_user_input(self, prompt: str) -> str:
         user_input = input(prompt)
         if user_input != "[exit]":
@@ -93,3 +124,73 @@ class ConsoleViewer:
 
     def display_non_valid_option(self, menu: dict[str, str]) -> None:
         print(f"Please, choose a valid option ID from 0 to {len(menu) - 1}.")
+
+    def display_threshold_sweep(self, df: pd.DataFrame, recommended: dict) -> None:
+        print(df.to_string(index=False))
+        if recommended:
+            print(f"Recommended {recommended['parameter']}: {recommended['value']}")
+        else:
+            print("No candidate produced at least two keywords groups.")
+
+    def display_query_summary(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        df = df.round(2)
+        df["sql"] = df["sql"].str.slice(0, 60)
+        print("DATABASE QUERIES:")
+        print(df.to_string(index=False, justify="left"))
+
+    def display_search_results(
+        self,
+        keyword_results: list[tuple[str, float]],
+        group_results: list[tuple[str, float]],
+    ) -> None:
+        print("SIMILAR KEYWORDS:")
+        for keyword, similarity in keyword_results:
+            print(f" {similarity:.3f}  {keyword}")
+        if group_results:
+            print("SIMILAR KEYWORDS GROUPS:")
+            for group, similarity in group_results:
+                print(f" {similarity:.3f}  {group}")
+
+    def display_suggestions(self, name: str, suggestions: list[str]) -> None:
+        if suggestions:
+            print(f"{name} not found. Did you mean: {', '.join(suggestions)}?")
+        else:
+            print(f"{name} not found.")
+
+    def display_lookup_results(self, keywords: list[str], groups: list[str]) -> None:
+        print("KEYWORDS:")
+        for keyword in keywords:
+            print(f" {keyword}")
+        print("KEYWORDS GROUPS:")
+        for group in groups:
+            print(f" {group}")
+
+    def display_emerging_topics(self, df: pd.DataFrame, rank_by: str) -> None:
+        if df.empty:
+            print("No keyword group has enough papers.")
+            return
+        print(f"EMERGING KEYWORDS GROUPS (by {rank_by}):")
+        print(df.round(4).to_string(index=False))
+
+    def display_preview_report(self, report: dict) -> None:
+        print(
+            f"PREVIEW: {report['papers']} papers ({report['fraction']:.1%} sample) "
+            f"in {report['seconds']:.1f} s"
+        )
+        if report["full_run"] is None:
+            print("No full run database to compare with.")
+            return
+        for plot in report["plots"]:
+            groups = "groups"
+            if plot["level"]:
+                groups = f"level {plot['level']} groups"
+            if plot["parent_group"]:
+                groups += f" of {plot['parent_group']}"
+            print(
+                f"Top {plot['limit']} {groups} {plot['year_lower_bound']}-{plot['year_upper_bound']}: "
+                f"{plot['overlap']:.0%} in the top {plot['limit']} of the full run, "
+                f"mean share error {plot['mean_share_error']:.2%}"
+            )
+            print(pd.DataFrame(plot["groups"]).round(4).to_string(index=False))
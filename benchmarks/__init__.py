@@ -0,0 +1 @@
+"""Benchmarks of the AKABAT pipeline on synthetic bibliographic corpora."""
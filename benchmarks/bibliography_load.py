@@ -0,0 +1,154 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from akabat.model import PaperLoader
+from akabat.model.bibliography import iter_bibtex_records, iter_ris_records
+
+from .corpus import generate_corpus
+from .run_benchmarks import (
+    COLUMN_NAMES,
+    EXCLUDED_KEYWORDS_AT_CSV_IMPORT,
+    EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT,
+)
+
+
+def _csv_records(csv_path: str, chunk_size: int = 50_000):
+    for chunk in pd.read_csv(
+        csv_path, usecols=list(COLUMN_NAMES.values()), chunksize=chunk_size
+    ):
+        for title, year, keywords in zip(
+            chunk[COLUMN_NAMES["title"]],
+            chunk[COLUMN_NAMES["publication_year"]],
+            chunk[COLUMN_NAMES["keywords"]].fillna(""),
+        ):
+            yield str(title), int(year), [k for k in keywords.split(";") if k]
+
+
+def write_bibtex(csv_path: str, bib_path: str) -> int:
+    """Writes the papers of a corpus CSV file as a BibTeX file, returns the number of entries."""
+    entries = 0
+    with open(bib_path, "w", encoding="utf-8") as file:
+        for title, year, keywords in _csv_records(csv_path):
+            title = title.replace("{", "").replace("}", "")
+            file.write(
+                f"@article{{paper{entries},\n"
+                f"  author = {{Doe, J. and Roe, R.}},\n"
+                f"  title = {{{title}}},\n"
+                f"  year = {year},\n"
+                f"  keywords = {{{'; '.join(keywords)}}},\n"
+                f"}}\n\n"
+            )
+            entries += 1
+    return entries
+
+
+def write_ris(csv_path: str, ris_path: str) -> int:
+    """Writes the papers of a corpus CSV file as a RIS file, returns the number of records."""
+    records = 0
+    with open(ris_path, "w", encoding="utf-8") as file:
+        for title, year, keywords in _csv_records(csv_path):
+            file.write("TY  - JOUR\nAU  - Doe, J.\nAU  - Roe, R.\n")
+            file.write(f"TI  - {title}\nPY  - {year}\n")
+            for keyword in keywords:
+                file.write(f"KW  - {keyword}\n")
+            file.write("ER  - \n\n")
+            records += 1
+    return records
+
+
+def measure_parser(reader, file_paths: list[str]) -> dict:
+    """Records per second of a bibliography reader alone."""
+    start = time.perf_counter()
+    records = sum(1 for file_path in file_paths for _ in reader(file_path))
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(file_path) for file_path in file_paths)
+    return {
+        "records": records,
+        "seconds": elapsed,
+        "records_per_second": records / elapsed,
+        "megabytes_per_second": size / 2**20 / elapsed,
+    }
+
+
+def measure_stream(folder: str, chunk_size: int) -> dict:
+    """Records per second of the whole streaming import (parse, normalize and deduplicate)."""
+    loader = PaperLoader()
+    stream = loader.stream_csvs(
+        folder,
+        excluded_keywords_at_csv_import=EXCLUDED_KEYWORDS_AT_CSV_IMPORT,
+        excluded_starting_by_keywords_at_csv_import=EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT,
+        import_columns_names=COLUMN_NAMES,
+        chunk_size=chunk_size,
+    )
+    start = time.perf_counter()
+    for _ in stream:
+        pass
+    elapsed = time.perf_counter() - start
+    records = stream.rows + stream.duplicates
+    return {
+        "records": records,
+        "papers": stream.rows,
+        "duplicates": stream.duplicates,
+        "seconds": elapsed,
+        "records_per_second": records / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Throughput of the BibTeX and RIS importers against the CSV import."
+    )
+    parser.add_argument(
+        "--papers", type=int, default=200_000, help="Size of the synthetic corpus."
+    )
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmarks/results/bibliography_load.json")
+    args = parser.parse_args()
+
+    work_folder = tempfile.mkdtemp(prefix="akabat_bibliography_")
+    results = {"papers": args.papers, "chunk_size": args.chunk_size}
+    try:
+        folders = {name: f"{work_folder}/{name}" for name in ("csv", "bib", "ris")}
+        summary = generate_corpus(
+            args.papers, folders["csv"], column_names=COLUMN_NAMES, seed=args.seed
+        )
+        os.makedirs(folders["bib"])
+        os.makedirs(folders["ris"])
+        for csv_path in summary["files"]:
+            name = os.path.splitext(os.path.basename(csv_path))[0]
+            write_bibtex(csv_path, f"{folders['bib']}/{name}.bib")
+            write_ris(csv_path, f"{folders['ris']}/{name}.ris")
+
+        for name, reader in (("bib", iter_bibtex_records), ("ris", iter_ris_records)):
+            file_paths = [
+                f"{folders[name]}/{file_path}"
+                for file_path in sorted(os.listdir(folders[name]))
+            ]
+            results[f"{name}_parser"] = measure_parser(reader, file_paths)
+        for name, folder in folders.items():
+            results[f"{name}_stream"] = measure_stream(folder, args.chunk_size)
+
+        for name, run in results.items():
+            if isinstance(run, dict):
+                print(
+                    f"{name:<11} {run['records']:>9} records  "
+                    f"{run['seconds']:7.2f} s  {run['records_per_second']:10.0f} records/s"
+                )
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
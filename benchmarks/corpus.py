@@ -0,0 +1,406 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+MODIFIERS = [
+    "federated",
+    "deep",
+    "reinforcement",
+    "transfer",
+    "machine",
+    "semantic",
+    "distributed",
+    "edge",
+    "cloud",
+    "quantum",
+    "explainable",
+    "trustworthy",
+    "privacy preserving",
+    "secure",
+    "multi agent",
+    "graph",
+    "neural",
+    "large",
+    "generative",
+    "adversarial",
+    "autonomous",
+    "smart",
+    "mobile",
+    "wireless",
+    "blockchain based",
+    "energy efficient",
+    "real time",
+    "self supervised",
+    "contrastive",
+    "probabilistic",
+    "bayesian",
+    "evolutionary",
+    "swarm",
+    "collaborative",
+    "decentralized",
+    "hierarchical",
+    "robust",
+    "fair",
+    "interpretable",
+    "low power",
+    "embedded",
+    "vehicular",
+    "industrial",
+    "medical",
+    "clinical",
+    "social",
+    "urban",
+    "agricultural",
+    "financial",
+    "cyber physical",
+    "digital",
+    "natural language",
+    "computer",
+    "sparse",
+    "online",
+    "continual",
+    "meta",
+    "few shot",
+    "zero shot",
+    "causal",
+]
+
+HEADS = [
+    "learning",
+    "networks",
+    "computing",
+    "systems",
+    "optimization",
+    "security",
+    "privacy",
+    "intelligence",
+    "agents",
+    "models",
+    "vision",
+    "processing",
+    "analytics",
+    "inference",
+    "communication",
+    "sensing",
+    "robotics",
+    "scheduling",
+    "recommendation",
+    "detection",
+    "classification",
+    "segmentation",
+    "forecasting",
+    "control",
+    "planning",
+    "simulation",
+    "authentication",
+    "encryption",
+    "consensus",
+    "caching",
+    "offloading",
+    "aggregation",
+    "compression",
+    "personalization",
+    "generalization",
+    "attacks",
+    "defenses",
+    "benchmarks",
+    "datasets",
+    "transformers",
+    "embeddings",
+    "clustering",
+    "retrieval",
+    "reasoning",
+    "negotiation",
+    "coordination",
+    "monitoring",
+    "diagnosis",
+    "healthcare",
+    "cities",
+    "grids",
+    "vehicles",
+    "drones",
+    "satellites",
+    "sensors",
+    "devices",
+    "things",
+    "twins",
+    "markets",
+    "governance",
+    "ethics",
+    "regulation",
+    "trust",
+    "reputation",
+    "incentives",
+    "auctions",
+    "games",
+    "protocols",
+    "architectures",
+    "frameworks",
+    "platforms",
+    "services",
+    "applications",
+    "evaluation",
+    "surveys",
+    "challenges",
+    "testbeds",
+    "hardware",
+    "accelerators",
+    "memory",
+]
+
+ACCENTED = {"e": "é", "a": "á", "o": "ó", "u": "ü", "i": "í", "n": "ñ"}
+
+TITLE_TEMPLATES = [
+    "Towards {a} for {b}",
+    "A survey on {a} and {b}",
+    "{A}: challenges and opportunities in {b}",
+    "On the use of {a} in {b}",
+    "Improving {a} with {b}",
+    "{A}-based {b} for {c}",
+    "Scalable {a} for {b} in {c}",
+    "An empirical study of {a} under {b}",
+    "Rethinking {a}: lessons from {b}",
+    "{A} meets {b}: a {c} perspective",
+]
+
+
+def build_vocabulary(size: int, rng: np.random.Generator) -> list[str]:
+    """
+    Builds `size` distinct keywords from modifier and head words, like
+    "privacy preserving federated learning". Two-word keywords come first, so
+    the most frequent keywords are the short ones.
+    """
+    pairs = [f"{modifier} {head}" for modifier in MODIFIERS for head in HEADS]
+    rng.shuffle(pairs)
+    vocabulary = pairs[:size]
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        first, second = rng.choice(len(MODIFIERS), size=2, replace=False)
+        keyword = f"{MODIFIERS[first]} {MODIFIERS[second]} {rng.choice(HEADS)}"
+        if keyword not in seen:
+            seen.add(keyword)
+            vocabulary.append(keyword)
+    return vocabulary
+
+
+def vocabulary_size(n_papers: int) -> int:
+    """Unique keywords grow sublinearly with the corpus: ~950 for 1k papers, ~30k for 1M."""
+    return max(200, int(30 * n_papers**0.5))
+
+
+def _decorate(keyword: str, rng: np.random.Generator) -> str:
+    """
+    Writes a keyword the way it appears in real exports: capitalized, with
+    hyphens, accents, "&" or stray punctuation. The AKABAT keyword
+    normalization maps most of the variants back to the same keyword.
+    """
+    roll = rng.random()
+    if roll < 0.25:
+        keyword = keyword.title()
+    elif roll < 0.30:
+        keyword = keyword.upper()
+    roll = rng.random()
+    if roll < 0.10:
+        keyword = keyword.replace(" ", "-", 1)
+    elif roll < 0.13:
+        keyword = keyword.replace(" and ", " & ")
+    elif roll < 0.15:
+        keyword = keyword + "."
+    elif roll < 0.17:
+        keyword = "".join(
+            ACCENTED.get(c, c) if rng.random() < 0.3 else c for c in keyword
+        )
+    if rng.random() < 0.05:
+        keyword = f" {keyword}  "
+    return keyword
+
+
+def _title(keywords: list[str], rng: np.random.Generator) -> str:
+    template = TITLE_TEMPLATES[rng.integers(len(TITLE_TEMPLATES))]
+    a, b, c = (keywords * 3)[:3]
+    return template.format(a=a, b=b, c=c, A=a.capitalize())
+
+
+def _vary_title(title: str, rng: np.random.Generator) -> str:
+    # How the same title differs between two bibliographic databases
+    variation = rng.integers(4)
+    if variation == 0:
+        return title.upper()
+    if variation == 1:
+        return f"{title}."
+    if variation == 2:
+        return title.replace(" ", "  ").replace(":", " -")
+    return title.lower().replace("e", "é", 1)
+
+
+def generate_corpus(
+    n_papers: int,
+    output_folder: str,
+    column_names: dict[str, str] = None,
+    n_files: int = None,
+    duplicate_rate: float = 0.05,
+    near_duplicate_rate: float = 0.0,
+    first_year: int = 1995,
+    last_year: int = 2024,
+    keywords_per_paper: float = 5.0,
+    zipf_exponent: float = 1.1,
+    seed: int = 0,
+    chunk_size: int = 50_000,
+) -> dict:
+    """
+    Writes a deterministic synthetic bibliographic corpus as CSV files in the
+    `csv_import_column_names` layout of the preferences. Keyword frequencies
+    follow a Zipf law, keywords carry accents, punctuation and casing
+    variants, publication years grow exponentially over the span and a
+    fraction of the papers are duplicated (as in overlapping exports). The
+    papers are generated in chunks, so 1M papers fit in memory comfortably.
+
+    Args:
+        n_papers (int): Number of papers, duplicates included.
+        output_folder (str): Folder of the CSV files.
+        column_names (dict[str, str], optional): The "title", "publication_year" and "keywords" CSV headers. Defaults to the Scopus/Zotero headers of the example preferences.
+        n_files (int, optional): Number of CSV files. Defaults to one per 100k papers.
+        duplicate_rate (float, optional): Fraction of papers that repeat a previous title. Defaults to 0.05.
+        near_duplicate_rate (float, optional): Fraction of the duplicates whose title is written
+        differently (casing, punctuation or accents). Defaults to 0.0.
+        first_year (int, optional): First publication year. Defaults to 1995.
+        last_year (int, optional): Last publication year. Defaults to 2024.
+        keywords_per_paper (float, optional): Mean number of keywords per paper. Defaults to 5.0.
+        zipf_exponent (float, optional): Exponent of the keyword frequency skew. Defaults to 1.1.
+        seed (int, optional): Seed of the generator. Defaults to 0.
+        chunk_size (int, optional): Papers generated per chunk. Defaults to 50_000.
+
+    Returns:
+        dict: The corpus summary with the keys "files", "papers", "duplicates",
+        "near_duplicates" and "vocabulary_size".
+    """
+    if not column_names:
+        column_names = {
+            "title": "Title",
+            "publication_year": "Publication Year",
+            "keywords": "Manual Tags",
+        }
+    if not n_files:
+        n_files = max(1, -(-n_papers // 100_000))
+
+    rng = np.random.default_rng(seed)
+    vocabulary = build_vocabulary(vocabulary_size(n_papers), rng)
+    ranks = np.arange(1, len(vocabulary) + 1)
+    keyword_probabilities = 1 / (ranks + 2.7) ** zipf_exponent
+    keyword_probabilities /= keyword_probabilities.sum()
+
+    years = np.arange(first_year, last_year + 1)
+    year_probabilities = 1.12 ** (years - first_year)
+    year_probabilities /= year_probabilities.sum()
+
+    os.makedirs(output_folder, exist_ok=True)
+    file_paths = [f"{output_folder}/corpus_{i + 1:03d}.csv" for i in range(n_files)]
+    for file_path in file_paths:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    papers_per_file = -(-n_papers // n_files)
+    previous: list[tuple[str, int, str]] = []
+    duplicates = 0
+    near_duplicates = 0
+    written = 0
+    while written < n_papers:
+        size = min(chunk_size, n_papers - written)
+        counts = np.maximum(1, rng.poisson(keywords_per_paper, size=size))
+        keyword_ids = rng.choice(
+            len(vocabulary), size=int(counts.sum()), p=keyword_probabilities
+        )
+        paper_years = rng.choice(years, size=size, p=year_probabilities)
+        duplicated = rng.random(size) < duplicate_rate
+
+        rows = []
+        offset = 0
+        for i in range(size):
+            if duplicated[i] and previous:
+                title, year, keywords = previous[rng.integers(len(previous))]
+                if near_duplicate_rate and rng.random() < near_duplicate_rate:
+                    title = _vary_title(title, rng)
+                    near_duplicates += 1
+                rows.append((title, year, keywords))
+                duplicates += 1
+            else:
+                paper_keywords = [
+                    vocabulary[k] for k in keyword_ids[offset : offset + counts[i]]
+                ]
+                keywords = [_decorate(keyword, rng) for keyword in paper_keywords]
+                if rng.random() < 0.02:
+                    keywords.append("[FE] Full Text")
+                if rng.random() < 0.01:
+                    keywords.append("xmlns:xlink")
+                title = f"{_title(paper_keywords, rng)} ({written + i})"
+                rows.append((title, int(paper_years[i]), ";".join(keywords)))
+                # Keep a bounded pool of candidates to duplicate
+                if len(previous) < 10_000:
+                    previous.append(rows[-1])
+                else:
+                    previous[rng.integers(len(previous))] = rows[-1]
+            offset += counts[i]
+
+        df = pd.DataFrame(
+            rows,
+            columns=[
+                column_names["title"],
+                column_names["publication_year"],
+                column_names["keywords"],
+            ],
+        )
+        # Real exports carry more columns than the imported ones
+        df.insert(1, "Author", "Doe, J.; Roe, R.")
+        file_indexes = (written + np.arange(size)) // papers_per_file
+        for file_index, part in df.groupby(file_indexes, sort=True):
+            file_path = file_paths[file_index]
+            part.to_csv(
+                file_path,
+                mode="a",
+                header=not os.path.exists(file_path),
+                index=False,
+            )
+        written += size
+
+    return {
+        "files": file_paths,
+        "papers": n_papers,
+        "duplicates": duplicates,
+        "near_duplicates": near_duplicates,
+        "vocabulary_size": len(vocabulary),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic bibliographic corpus as CSV files."
+    )
+    parser.add_argument("papers", type=int, help="Number of papers.")
+    parser.add_argument("output_folder", help="Folder of the CSV files.")
+    parser.add_argument("--files", type=int, default=None, help="Number of CSV files.")
+    parser.add_argument(
+        "--near-duplicate-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of the duplicates with a differently written title.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    summary = generate_corpus(
+        args.papers,
+        args.output_folder,
+        n_files=args.files,
+        near_duplicate_rate=args.near_duplicate_rate,
+        seed=args.seed,
+    )
+    print(
+        f"{summary['papers']} papers ({summary['duplicates']} duplicates, "
+        f"{summary['vocabulary_size']} distinct keywords) in {len(summary['files'])} files."
+    )
+
+
+if __name__ == "__main__":
+    main()
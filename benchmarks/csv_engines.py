@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from akabat.model import PaperLoader
+from akabat.model.data_handler import CSV_ENGINES, pa
+
+from .corpus import generate_corpus
+from .run_benchmarks import (
+    COLUMN_NAMES,
+    EXCLUDED_KEYWORDS_AT_CSV_IMPORT,
+    EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT,
+)
+
+COMPRESSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def compress(file_path: str, compression: str) -> str:
+    """Writes a compressed copy of a file next to it, returns its path."""
+    compressed_path = f"{file_path}{COMPRESSIONS[compression]}"
+    with open(file_path, "rb") as source, pa.output_stream(
+        compressed_path, compression=compression
+    ) as target:
+        shutil.copyfileobj(source, target, 1 << 20)
+    return compressed_path
+
+
+def measure_engine(loader: PaperLoader, file_path: str, engine: str) -> dict:
+    """Times reading the imported columns and the whole import of a file with an engine."""
+    start = time.perf_counter()
+    rows = len(loader.read_csv(file_path, COLUMN_NAMES, engine=engine))
+    read_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loader.import_csv(
+        file_path,
+        excluded_keywords_at_csv_import=EXCLUDED_KEYWORDS_AT_CSV_IMPORT,
+        excluded_starting_by_keywords_at_csv_import=EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT,
+        import_columns_names=COLUMN_NAMES,
+        engine=engine,
+    )
+    import_seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "file_megabytes": os.path.getsize(file_path) / 2**20,
+        "read_seconds": read_seconds,
+        "read_rows_per_second": rows / read_seconds,
+        "import_seconds": import_seconds,
+        "import_rows_per_second": rows / import_seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compares the CSV engines on plain and compressed exports."
+    )
+    parser.add_argument(
+        "--papers", type=int, default=500_000, help="Size of the synthetic corpus."
+    )
+    parser.add_argument("--engines", nargs="+", default=list(CSV_ENGINES))
+    parser.add_argument(
+        "--compressions", nargs="+", default=list(COMPRESSIONS), choices=COMPRESSIONS
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmarks/results/csv_engines.json")
+    args = parser.parse_args()
+
+    if pa is None:
+        parser.error("The benchmark requires pyarrow.")
+    work_folder = tempfile.mkdtemp(prefix="akabat_csv_engines_")
+    results = {"papers": args.papers, "cpu_count": os.cpu_count(), "runs": []}
+    try:
+        summary = generate_corpus(
+            args.papers,
+            work_folder,
+            column_names=COLUMN_NAMES,
+            n_files=1,
+            seed=args.seed,
+        )
+        csv_path = summary["files"][0]
+        loader = PaperLoader()
+        for compression in args.compressions:
+            file_path = (
+                csv_path if compression == "none" else compress(csv_path, compression)
+            )
+            for engine in args.engines:
+                run = {
+                    "compression": compression,
+                    "engine": engine,
+                    **measure_engine(loader, file_path, engine),
+                }
+                results["runs"].append(run)
+                print(
+                    f"{compression:<5} {engine:<8} "
+                    f"{run['file_megabytes']:7.1f} MB  "
+                    f"read {run['read_seconds']:6.2f} s "
+                    f"({run['read_rows_per_second']:9.0f} rows/s)  "
+                    f"import {run['import_seconds']:6.2f} s "
+                    f"({run['import_rows_per_second']:8.0f} rows/s)"
+                )
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import re
+import zlib
+
+import numpy as np
+
+
+class HashingEncoder:
+
+    def __init__(self, dimensions: int = 256) -> None:
+        """
+        Initialize the HashingEncoder, a deterministic offline replacement of the
+        sentence transformer model for benchmarks. It hashes the words and
+        character trigrams of each text into a signed bag-of-features vector,
+        so keywords that share words or spelling end up close to each other.
+
+        Args:
+            dimensions (int, optional): Length of the embeddings. Defaults to 256.
+        """
+        self.dimensions: int = dimensions
+
+    def _features(self, text: str) -> list[str]:
+        words = re.findall(r"\w+", text.lower())
+        trigrams = [
+            padded[i : i + 3]
+            for padded in (f"#{word}#" for word in words)
+            for i in range(len(padded) - 2)
+        ]
+        return words + trigrams
+
+    def encode(self, texts: list[str], **_) -> np.ndarray:
+        """
+        Encodes the texts, with the same call signature as
+        `SentenceTransformer.encode`.
+
+        Returns:
+            np.ndarray: A float32 matrix with one L2 normalized row per text.
+        """
+        embeddings = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 1 else -1.0
+                embeddings[row, (digest >> 1) % self.dimensions] += sign
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms == 0, 1, norms)
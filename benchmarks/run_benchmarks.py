@@ -0,0 +1,438 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from akabat.model import (
+    DBHandler,
+    PaperLoader,
+    PlotGenerator,
+    QueryCache,
+    TrendAnalyzer,
+)
+
+from .corpus import generate_corpus
+from .offline_encoder import HashingEncoder
+
+
+COLUMN_NAMES = {
+    "title": "Title",
+    "publication_year": "Publication Year",
+    "keywords": "Manual Tags",
+}
+EXCLUDED_KEYWORDS_AT_CSV_IMPORT = ["[fe] full text", "nan"]
+EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT = ["xmlns"]
+
+
+def measure(func, repeat: int = 1, setup=None):
+    """
+    Runs `func` `repeat` times (calling `setup` before each run, untimed).
+
+    Returns:
+        tuple[dict, Any]: The timings ("best_s", "mean_s" and "runs") and the
+        result of the last run.
+    """
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "best_s": min(timings),
+        "mean_s": sum(timings) / len(timings),
+        "runs": len(timings),
+    }, result
+
+
+def run_size(
+    n_papers: int,
+    work_folder: str,
+    repeat: int,
+    grouping_keywords: int,
+    distance_threshold: float,
+    seed: int,
+) -> dict:
+    """
+    Runs every benchmark on a synthetic corpus of `n_papers` papers.
+
+    Returns:
+        dict: The timings of every benchmark by name.
+    """
+    results = {}
+    csv_folder = f"{work_folder}/csv"
+    db_name = f"{work_folder}/Review.db"
+
+    results["generate corpus"], corpus = measure(
+        lambda: generate_corpus(
+            n_papers, csv_folder, column_names=COLUMN_NAMES, seed=seed
+        )
+    )
+    print(
+        f"  {corpus['papers']} papers, {corpus['duplicates']} duplicates, "
+        f"{corpus['vocabulary_size']} distinct keywords"
+    )
+
+    loader = PaperLoader()
+    loader._transformer_model = HashingEncoder()
+
+    results["import csvs"], csvs = measure(
+        lambda: loader.import_csvs(
+            folder_path=csv_folder,
+            excluded_keywords_at_csv_import=EXCLUDED_KEYWORDS_AT_CSV_IMPORT,
+            excluded_starting_by_keywords_at_csv_import=EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT,
+            import_columns_names=COLUMN_NAMES,
+        ),
+        repeat,
+    )
+    results["merge csvs"], (papers, _) = measure(
+        lambda: loader.merge_csvs(csvs), repeat
+    )
+    results["near duplicates"], _ = measure(
+        lambda: loader.remove_near_duplicates(papers), repeat
+    )
+
+    raw_keywords = pd.read_csv(corpus["files"][0], usecols=[COLUMN_NAMES["keywords"]])[
+        COLUMN_NAMES["keywords"]
+    ].astype(str)
+    results["normalize keywords"], _ = measure(
+        lambda: [
+            loader.create_keywords(
+                keyword_list=keyword_list,
+                keyword_separator=";",
+                excluded_keywords_at_csv_import=EXCLUDED_KEYWORDS_AT_CSV_IMPORT,
+                excluded_starting_by_keywords_at_csv_import=EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT,
+            )
+            for keyword_list in raw_keywords
+        ],
+        repeat,
+    )
+
+    results["unique keywords"], unique_keywords = measure(
+        lambda: loader.get_unique_keywords(papers), repeat
+    )
+
+    # Ward clustering needs quadratic memory, so only the most frequent keywords
+    # are grouped and the rest become singleton groups
+    grouped_keywords = unique_keywords[:grouping_keywords]
+    results["encode keywords"], _ = measure(
+        lambda: loader.encode_keywords(grouped_keywords),
+        repeat,
+        setup=lambda: loader.set_cached_embeddings([], None),
+    )
+    results["group keywords"], groups = measure(
+        lambda: loader.group_keywords_by_semantic_similarity(
+            grouped_keywords, distance_threshold=distance_threshold
+        ),
+        repeat,
+    )
+    groups = dict(groups)
+    for keyword in unique_keywords[grouping_keywords:]:
+        groups.setdefault(keyword, []).append(keyword)
+
+    db_handler = DBHandler(db_name)
+    # The query benchmarks time SQLite, the cached path is timed on its own
+    db_handler.query_cache = QueryCache(enabled=False)
+
+    def reset_database() -> None:
+        db_handler.delete_database()
+        db_handler.create_database()
+
+    def reset_keyword_tables() -> None:
+        reset_database()
+        db_handler.populate_paper_table(papers)
+
+    def reset_paper_keyword_table() -> None:
+        reset_keyword_tables()
+        db_handler.populate_keyword_tables(groups)
+
+    results["populate paper table"], _ = measure(
+        lambda: db_handler.populate_paper_table(papers), repeat, reset_database
+    )
+    results["populate keyword tables"], _ = measure(
+        lambda: db_handler.populate_keyword_tables(groups),
+        repeat,
+        reset_keyword_tables,
+    )
+    results["populate paper keyword table"], _ = measure(
+        lambda: db_handler.populate_paper_keyword_table(papers),
+        repeat,
+        reset_paper_keyword_table,
+    )
+
+    year_upper_bound = int(papers["publication_year"].max())
+    year_lower_bound = year_upper_bound - 9
+    results["query count unique papers per group"], _ = measure(
+        lambda: db_handler.query_count_unique_papers_per_group(limit=10), repeat
+    )
+    results["query count unique papers per group per year"], _ = measure(
+        lambda: db_handler.query_count_unique_papers_per_group_per_year(limit=10),
+        repeat,
+    )
+    results["query tendencies of keywords"], _ = measure(
+        lambda: db_handler.query_tendencies_of_keywords(limit=10), repeat
+    )
+    results["query top groups"], df_top = measure(
+        lambda: db_handler.query_top_groups(
+            limit=10,
+            year_lower_bound=year_lower_bound,
+            year_upper_bound=year_upper_bound,
+        ),
+        repeat,
+    )
+    results["query trends of groups"], df_trends = measure(
+        lambda: db_handler.query_trends_of_groups(df_top), repeat
+    )
+
+    results["populate title index"], _ = measure(
+        db_handler.populate_title_index, repeat
+    )
+    # A word of the most common group, so the filter keeps a fraction of the papers
+    title_match = df_top["name"].iloc[0].split()[0]
+    results["query top groups title match"], df_top_title = measure(
+        lambda: db_handler.query_top_groups(
+            limit=10,
+            year_lower_bound=year_lower_bound,
+            year_upper_bound=year_upper_bound,
+            title_match=title_match,
+        ),
+        repeat,
+    )
+    results["query trends of groups title match"], _ = measure(
+        lambda: db_handler.query_trends_of_groups(
+            df_top_title, title_match=title_match
+        ),
+        repeat,
+    )
+
+    memory_db_handler = DBHandler(db_name)
+    memory_db_handler.query_cache = QueryCache(enabled=False)
+    memory_db_handler.load_into_memory()
+    results["query top groups in memory"], _ = measure(
+        lambda: memory_db_handler.query_top_groups(
+            limit=10,
+            year_lower_bound=year_lower_bound,
+            year_upper_bound=year_upper_bound,
+        ),
+        repeat,
+    )
+    results["query trends of groups in memory"], _ = measure(
+        lambda: memory_db_handler.query_trends_of_groups(df_top), repeat
+    )
+    memory_db_handler.close_memory_database()
+
+    cached_db_handler = DBHandler(db_name)
+    cached_db_handler.query_trends_of_groups(df_top)
+    results["query trends of groups cached"], _ = measure(
+        lambda: cached_db_handler.query_trends_of_groups(df_top), repeat
+    )
+
+    results["query group year counts"], df_counts = measure(
+        lambda: db_handler.query_group_year_counts(), repeat
+    )
+    papers_per_year = db_handler.query_papers_per_year()
+    results["emerging topics"], _ = measure(
+        lambda: TrendAnalyzer().analyze(df_counts, papers_per_year), repeat
+    )
+    # The analysis must stay fast for large taxonomies: 50k groups x 40 years
+    rng = np.random.default_rng(seed)
+    large_counts = rng.poisson(rng.gamma(0.5, 3, size=(50_000, 1)), size=(50_000, 40))
+    group_indexes, year_indexes = np.nonzero(large_counts)
+    df_large_counts = pd.DataFrame(
+        {
+            "name": group_indexes.astype(str),
+            "publication_year": 1985 + year_indexes,
+            "unique_paper_count": large_counts[group_indexes, year_indexes],
+        }
+    )
+    results["emerging topics 50k groups"], _ = measure(
+        lambda: TrendAnalyzer().analyze(df_large_counts), repeat
+    )
+
+    def render_plot() -> None:
+        PlotGenerator().generate_trends_lineplot(
+            df=df_trends,
+            title=f"Trends in {year_lower_bound}-{year_upper_bound}",
+            x_label="Publication Year",
+            y_label="Number of Papers",
+            save_file_path=f"{work_folder}/trends.png",
+            show=False,
+        )
+
+    results["render trends plot"], _ = measure(render_plot, repeat)
+
+    plot_specs = [
+        {
+            "save_file_path": f"{work_folder}/n{limit}_trends_in_{lower}-{year_upper_bound}.png",
+            "title": f"Trends of Top {limit} Groups of Keywords",
+            "limit": limit,
+            "year_lower_bound": lower,
+            "year_upper_bound": year_upper_bound,
+        }
+        for limit in (5, 10)
+        for lower in range(year_upper_bound - 9, year_upper_bound + 1)
+    ]
+    results["render trends plots batch"], _ = measure(
+        lambda: PlotGenerator().render_trends_plots(
+            db_name, plot_specs, use_cache=False
+        ),
+        repeat,
+    )
+    results["render trends plots batch cached"], _ = measure(
+        lambda: PlotGenerator().render_trends_plots(db_name, plot_specs), repeat
+    )
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float, min_delta: float = 0.01
+) -> list[str]:
+    """
+    Compares the best timings of two benchmark runs.
+
+    Args:
+        results (dict): The current run.
+        baseline (dict): The run to compare with.
+        tolerance (float): Allowed slowdown ratio, e.g. 0.2 for 20%.
+        min_delta (float, optional): Slowdowns shorter than this (in seconds) are timing noise. Defaults to 0.01.
+
+    Returns:
+        list[str]: The benchmarks slower than the baseline beyond the tolerance.
+    """
+    regressions = []
+    print(f"\nComparison with {baseline.get('commit')} ({baseline.get('date')}):")
+    for size, benchmarks in results["sizes"].items():
+        baseline_benchmarks = baseline.get("sizes", {}).get(size, {})
+        for name, timing in benchmarks.items():
+            if name not in baseline_benchmarks:
+                continue
+            before = baseline_benchmarks[name]["best_s"]
+            after = timing["best_s"]
+            ratio = after / before if before > 0 else float("inf")
+            flag = ""
+            if ratio > 1 + tolerance and after - before > min_delta:
+                flag = "  REGRESSION"
+                regressions.append(f"{size} papers: {name}")
+            print(
+                f"  {size:>8} {name:<46} {before:9.3f}s -> {after:9.3f}s  x{ratio:.2f}{flag}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the AKABAT pipeline on synthetic corpora."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Corpus sizes in papers (up to 1M).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark.")
+    parser.add_argument(
+        "--grouping-keywords",
+        type=int,
+        default=5_000,
+        help="Number of most frequent keywords clustered in the grouping benchmark.",
+    )
+    parser.add_argument("--distance-threshold", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Results JSON file. Defaults to benchmarks/results/<commit>.json.",
+    )
+    parser.add_argument(
+        "--baseline", default=None, help="Results JSON file to compare with."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown ratio before flagging a regression.",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.01,
+        help="Slowdowns shorter than this (in seconds) are not flagged.",
+    )
+    parser.add_argument(
+        "--work-folder", default=None, help="Folder of the corpora and databases."
+    )
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "grouping_keywords": args.grouping_keywords,
+        "seed": args.seed,
+        "sizes": {},
+    }
+
+    work_folder = args.work_folder or tempfile.mkdtemp(prefix="akabat_benchmarks_")
+    try:
+        for n_papers in args.sizes:
+            print(f"Benchmarking {n_papers} papers")
+            size_folder = f"{work_folder}/{n_papers}"
+            os.makedirs(size_folder, exist_ok=True)
+            benchmarks = run_size(
+                n_papers,
+                size_folder,
+                args.repeat,
+                args.grouping_keywords,
+                args.distance_threshold,
+                args.seed,
+            )
+            for name, timing in benchmarks.items():
+                print(f"  {name:<46} {timing['best_s']:9.3f}s")
+            results["sizes"][str(n_papers)] = benchmarks
+    finally:
+        if not args.work_folder:
+            shutil.rmtree(work_folder, ignore_errors=True)
+
+    output = args.output or f"benchmarks/results/{commit or 'results'}.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved in {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regressions found.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
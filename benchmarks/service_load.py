@@ -0,0 +1,204 @@
+import argparse
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+from akabat.controller import QueryService
+from akabat.model import DBHandler, PaperLoader, QueryCache
+
+from .corpus import generate_corpus
+from .offline_encoder import HashingEncoder
+from .run_benchmarks import (
+    COLUMN_NAMES,
+    EXCLUDED_KEYWORDS_AT_CSV_IMPORT,
+    EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT,
+)
+
+
+def build_database(n_papers: int, work_folder: str, seed: int = 0) -> str:
+    """
+    Builds a review database from a synthetic corpus, grouping the 2000 most
+    frequent keywords with the offline encoder.
+
+    Returns:
+        str: The path of the database.
+    """
+    csv_folder = f"{work_folder}/csv"
+    db_name = f"{work_folder}/Review.db"
+    generate_corpus(n_papers, csv_folder, column_names=COLUMN_NAMES, seed=seed)
+
+    loader = PaperLoader()
+    loader._transformer_model = HashingEncoder()
+    csvs = loader.import_csvs(
+        folder_path=csv_folder,
+        excluded_keywords_at_csv_import=EXCLUDED_KEYWORDS_AT_CSV_IMPORT,
+        excluded_starting_by_keywords_at_csv_import=EXCLUDED_STARTING_BY_KEYWORDS_AT_CSV_IMPORT,
+        import_columns_names=COLUMN_NAMES,
+    )
+    papers, _ = loader.merge_csvs(csvs)
+    unique_keywords = loader.get_unique_keywords(papers)
+    groups = dict(
+        loader.group_keywords_by_semantic_similarity(
+            unique_keywords[:2000], distance_threshold=1.0
+        )
+    )
+    for keyword in unique_keywords[2000:]:
+        groups.setdefault(keyword, []).append(keyword)
+
+    db_handler = DBHandler(db_name)
+    db_handler.delete_database()
+    db_handler.create_database()
+    db_handler.populate_paper_table(papers)
+    db_handler.populate_keyword_tables(groups)
+    db_handler.populate_paper_keyword_table(papers)
+    return db_name
+
+
+def request_mix(distinct: int, seed: int = 0) -> list[str]:
+    """
+    Returns `distinct` request paths mixing the top groups, top trends and
+    count endpoints over several limits, year windows and exclusions.
+    """
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(distinct):
+        lower = int(rng.integers(1995, 2024))
+        parameters = {
+            "limit": int(rng.choice([5, 10, 20])),
+            "from": lower,
+            "to": int(rng.integers(lower, 2025)),
+        }
+        endpoint = ["/groups/top", "/groups/top/trends", "/groups/count"][i % 3]
+        if endpoint == "/groups/count":
+            parameters = {"limit": parameters["limit"]}
+        paths.append(f"{endpoint}?{urlencode(parameters)}")
+    return paths
+
+
+def run_load(address: str, paths: list[str], concurrency: int, duration: float) -> dict:
+    """
+    Sends the requests from `concurrency` client threads, each with its own
+    keep-alive connection, for `duration` seconds.
+
+    Returns:
+        dict: The number of requests and errors, the throughput and the latency percentiles.
+    """
+    netloc = urlsplit(address).netloc
+    latencies: list[list[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    deadline = time.perf_counter() + duration
+
+    def client(index: int) -> None:
+        conn = http.client.HTTPConnection(netloc, timeout=60)
+        rng = np.random.default_rng(index)
+        while time.perf_counter() < deadline:
+            path = paths[rng.integers(len(paths))]
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[index] += 1
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(netloc, timeout=60)
+                continue
+            latencies[index].append(time.perf_counter() - start)
+        conn.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = np.array([latency for client in latencies for latency in client])
+    if len(all_latencies) == 0:
+        all_latencies = np.array([np.nan])
+    return {
+        "requests": int(np.isfinite(all_latencies).sum()),
+        "errors": int(sum(errors)),
+        "throughput_rps": float(np.isfinite(all_latencies).sum() / elapsed),
+        "latency_p50_ms": float(np.percentile(all_latencies, 50) * 1000),
+        "latency_p95_ms": float(np.percentile(all_latencies, 95) * 1000),
+        "latency_p99_ms": float(np.percentile(all_latencies, 99) * 1000),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Throughput and latency benchmark of the HTTP query service."
+    )
+    parser.add_argument(
+        "--db", default=None, help="Existing database. Defaults to a synthetic one."
+    )
+    parser.add_argument(
+        "--papers", type=int, default=10_000, help="Size of the synthetic corpus."
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run.")
+    parser.add_argument(
+        "--distinct", type=int, default=50, help="Number of distinct requests."
+    )
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--output", default="benchmarks/results/service_load.json")
+    args = parser.parse_args()
+
+    work_folder = None
+    db_name = args.db
+    if db_name is None:
+        work_folder = tempfile.mkdtemp(prefix="akabat_service_")
+        print(f"Building a database of {args.papers} papers")
+        db_name = build_database(args.papers, work_folder)
+
+    results = {"db": args.db, "papers": args.papers, "runs": []}
+    paths = request_mix(args.distinct)
+    try:
+        for cached in (False, True):
+            for concurrency in args.concurrency:
+                service = QueryService(
+                    db_name,
+                    port=0,
+                    pool_size=args.pool_size,
+                    response_cache_megabytes=32 if cached else 0,
+                    query_cache=QueryCache(enabled=cached),
+                )
+                service.start()
+                try:
+                    run = run_load(service.address, paths, concurrency, args.duration)
+                finally:
+                    service.shutdown()
+                run = {"cached": cached, "concurrency": concurrency, **run}
+                results["runs"].append(run)
+                print(
+                    f"cached={cached!s:<5} concurrency={concurrency:<3} "
+                    f"{run['throughput_rps']:9.1f} req/s  "
+                    f"p50 {run['latency_p50_ms']:8.2f} ms  "
+                    f"p95 {run['latency_p95_ms']:8.2f} ms  "
+                    f"p99 {run['latency_p99_ms']:8.2f} ms  "
+                    f"errors {run['errors']}"
+                )
+    finally:
+        if work_folder:
+            shutil.rmtree(work_folder, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,7 @@ setup(
     url="https://github.com/FranEnguix/akabat",
     packages=find_packages(include=["akabat", "akabat.*"]),
     install_requires=requirements,
+    entry_points={"console_scripts": ["akabat=akabat.__main__:main"]},
     license="MIT license",
     zip_safe=False,
     keywords="akabat",
@@ -0,0 +1,28 @@
+from akabat.model.bibliography import iter_bibtex_records
+
+BIBTEX = r"""
+@comment{An "unbalanced quote}
+@article{a, title={One}, year=2021} @article{b, title={Two}, year=2022}
+@inproceedings{c,
+  title = "Braces {a} } b in quotes",
+  year = {2020},
+  keywords = {x; y}
+}
+@book(d, title = "Parentheses ( in quotes", year = 2019) @misc{e,
+  title = {Spans {L}ines},
+  year = 2018}
+@article{f, title = {No year}}
+"""
+
+
+def test_entries_sharing_lines_and_quoted_delimiters(tmp_path):
+    file_path = tmp_path / "papers.bib"
+    file_path.write_text(BIBTEX, encoding="utf-8")
+
+    assert list(iter_bibtex_records(str(file_path))) == [
+        ("One", 2021, []),
+        ("Two", 2022, []),
+        ("Braces a b in quotes", 2020, ["x", "y"]),
+        ("Parentheses ( in quotes", 2019, []),
+        ("Spans Lines", 2018, []),
+    ]
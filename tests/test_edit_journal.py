@@ -0,0 +1,39 @@
+from akabat.model.edit_journal import EditJournal
+
+
+def test_resume_after_torn_write_keeps_later_operations(tmp_path):
+    journal = EditJournal(str(tmp_path / "keyword_groups.journal.jsonl"))
+    journal.start("checksum")
+    journal.append("ban", group="a")
+    # A crash while appending leaves a partial last line
+    with open(journal.file_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "ban", "gro')
+
+    base_checksum, operations = journal.read()
+    assert base_checksum == "checksum"
+    assert operations == [{"op": "ban", "group": "a"}]
+
+    journal.resume(base_checksum, len(operations))
+    journal.append("ban", group="b")
+    journal.append("rename", group="b", name="c")
+
+    assert journal.read() == (
+        "checksum",
+        [
+            {"op": "ban", "group": "a"},
+            {"op": "ban", "group": "b"},
+            {"op": "rename", "group": "b", "name": "c"},
+        ],
+    )
+
+
+def test_line_without_newline_is_not_replayed(tmp_path):
+    journal = EditJournal(str(tmp_path / "keyword_groups.journal.jsonl"))
+    journal.start("checksum")
+    with open(journal.file_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "ban", "group": "a"}')
+
+    assert journal.read() == ("checksum", [])
+    journal.resume("checksum", 0)
+    journal.append("ban", group="b")
+    assert journal.read() == ("checksum", [{"op": "ban", "group": "b"}])
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from akabat.model import PaperLoader, TitleIndex
+
+
+def _papers(rows):
+    return pd.DataFrame(
+        {
+            "title": [title for title, _ in rows],
+            "keywords": [keywords for _, keywords in rows],
+        }
+    )
+
+
+def test_append_matches_removing_from_the_whole_corpus():
+    old = _papers(
+        [
+            ("Deep learning for protein folding", ["deep learning", "proteins"]),
+            ("A survey of graph neural networks", ["graphs"]),
+            ("Query optimization in column stores, part 1", ["databases"]),
+        ]
+    )
+    new = _papers(
+        [
+            ("Deep-Learning for Protein Folding", ["folding"]),
+            ("Query optimization in column stores, part 2", ["databases"]),
+            ("A survey of graph neural network", ["graphs", "survey"]),
+            ("Federated learning on edge devices", ["edge"]),
+            ("Federated learning on edge devices!", ["privacy"]),
+        ]
+    )
+    loader = PaperLoader()
+    index = loader.near_duplicate_index()
+    title_index = TitleIndex(old)
+    papers, removed = loader.append_without_near_duplicates(None, old, index)
+    papers, removed = loader.append_without_near_duplicates(
+        papers, title_index.add(new)[0], index, title_index=title_index
+    )
+
+    expected, expected_removed = loader.remove_near_duplicates(pd.concat([old, new]))
+    assert removed == expected_removed == 3
+    assert papers["title"].tolist() == expected["title"].tolist()
+    assert papers["keywords"].tolist() == expected["keywords"].tolist()
+    assert papers["keywords"].tolist()[0] == ["deep learning", "proteins", "folding"]
+    # The old corpus is not modified
+    assert old["keywords"].tolist()[0] == ["deep learning", "proteins"]
+    assert title_index.keyword_counts().to_dict() == {
+        "databases": 2,
+        "deep learning": 1,
+        "proteins": 1,
+        "graphs": 1,
+        "folding": 1,
+        "survey": 1,
+        "edge": 1,
+        "privacy": 1,
+    }